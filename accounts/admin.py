@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import Usuario
+from .models import Usuario, SolicitacaoVerificacao
 
 
 @admin.register(Usuario)
@@ -30,4 +30,38 @@ class UsuarioAdmin(UserAdmin):
     readonly_fields = ('date_joined', 'last_login')
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related()
\ No newline at end of file
+        return super().get_queryset(request).select_related()
+
+
+@admin.register(SolicitacaoVerificacao)
+class SolicitacaoVerificacaoAdmin(admin.ModelAdmin):
+    """Admin para o modelo SolicitacaoVerificacao"""
+    
+    list_display = ('nome_organizacao', 'usuario', 'cnpj', 'status', 'data_solicitacao', 'data_processamento')
+    list_filter = ('status',)
+    search_fields = ('nome_organizacao', 'cnpj', 'usuario__nome', 'usuario__email')
+    ordering = ('-data_solicitacao',)
+    autocomplete_fields = ('usuario',)
+    
+    readonly_fields = ('data_solicitacao', 'data_processamento', 'documento_sha256')
+    actions = ['aprovar', 'rejeitar']
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('usuario')
+    
+    @admin.action(description="Aprovar e verificar as ONGs selecionadas")
+    def aprovar(self, request, queryset):
+        total = 0
+        for solicitacao in queryset.filter(status='Pendente').select_related('usuario'):
+            solicitacao.status = 'Aprovada'
+            solicitacao.save(update_fields=['status'])
+            # save() do usuário para disparar os signals (cache e cards dos pets)
+            solicitacao.usuario.verificado = True
+            solicitacao.usuario.save(update_fields=['verificado'])
+            total += 1
+        self.message_user(request, f'{total} solicitação(ões) aprovada(s).')
+    
+    @admin.action(description="Rejeitar as solicitações selecionadas")
+    def rejeitar(self, request, queryset):
+        total = queryset.filter(status='Pendente').update(status='Rejeitada')
+        self.message_user(request, f'{total} solicitação(ões) rejeitada(s).')
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        from meu_novo_amigo_pet import metricas
+        from . import signals  # noqa: F401
+        from .limite_login import publicar_metricas
+        metricas.registrar_coletor(publicar_metricas)
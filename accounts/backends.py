@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+
+def chave_usuario(user_id):
+    return f'accounts:usuario:{user_id}'
+
+
+def invalidar_usuario(user_id):
+    """Remove o usuário do cache usado pelo UsuarioCacheBackend"""
+    caches[settings.USUARIO_CACHE_ALIAS].delete(chave_usuario(user_id))
+
+
+def invalidar_usuarios(user_ids):
+    """invalidar_usuario para vários usuários de uma vez"""
+    caches[settings.USUARIO_CACHE_ALIAS].delete_many([chave_usuario(user_id) for user_id in user_ids])
+
+
+class UsuarioCacheBackend(ModelBackend):
+    """
+    ModelBackend que guarda por alguns segundos o usuário carregado da sessão,
+    evitando uma query na tabela usuario a cada requisição autenticada.
+    """
+
+    def get_user(self, user_id):
+        cache = caches[settings.USUARIO_CACHE_ALIAS]
+        chave = chave_usuario(user_id)
+        usuario = cache.get(chave)
+        if usuario is None:
+            usuario = super().get_user(user_id)
+            if usuario is not None:
+                cache.set(chave, usuario, settings.USUARIO_CACHE_TIMEOUT)
+        return usuario
@@ -1,11 +1,44 @@
+import math
+
 from django import forms
-from django.contrib.auth.forms import UserCreationForm, UserChangeForm
+from django.contrib.auth.forms import AuthenticationForm, UserCreationForm, UserChangeForm
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 
+from .limite_login import registrar_falha, registrar_sucesso, segundos_bloqueado
+
 Usuario = get_user_model()
 
 
+class LoginForm(AuthenticationForm):
+    """AuthenticationForm que recusa contas e IPs bloqueados antes de conferir a senha"""
+    
+    error_messages = {
+        **AuthenticationForm.error_messages,
+        'bloqueado': "Muitas tentativas de login. Tente novamente em %(minutos)s minuto(s).",
+    }
+    
+    def clean(self):
+        username = self.cleaned_data.get('username')
+        if self.request is not None:
+            restante = segundos_bloqueado(self.request, username)
+            if restante:
+                raise ValidationError(
+                    self.error_messages['bloqueado'],
+                    code='bloqueado',
+                    params={'minutos': math.ceil(restante / 60)},
+                )
+        cleaned_data = super().clean()
+        if self.request is not None and self.user_cache is not None:
+            registrar_sucesso(self.request, username)
+        return cleaned_data
+    
+    def get_invalid_login_error(self):
+        if self.request is not None:
+            registrar_falha(self.request, self.cleaned_data.get('username'))
+        return super().get_invalid_login_error()
+
+
 class UsuarioRegistrationForm(UserCreationForm):
     """Formulário de cadastro de usuário"""
     
@@ -0,0 +1,154 @@
+"""
+Limite de tentativas de login por conta e por IP.
+
+Cada falha de senha soma 1 em janelas deslizantes (aproximadas por dois
+baldes fixos: o atual e o anterior, ponderado pelo tempo que ainda falta
+para ele sair da janela) guardadas no cache compartilhado entre os workers.
+Ao passar do limite, a conta ou o IP fica bloqueado por um tempo que dobra a
+cada novo bloqueio nas últimas 24 horas.
+
+O bloqueio é conferido antes de o backend calcular o hash da senha, então
+uma rajada de tentativas bloqueadas custa só leituras do cache, e não o
+PBKDF2 de cada tentativa.
+
+As contagens usam o incr do cache, atômico no SQLiteCache do cache
+compartilhado: falhas simultâneas em workers diferentes não se perdem.
+
+O IP é o de middleware.ip_cliente: atrás de um proxy reverso, o endereço do
+proxy precisa estar em PROXIES_CONFIAVEIS. Quando o IP do cliente é
+desconhecido (conexão de loopback sem proxy configurado) só o limite por
+conta vale: um balde único para todos os clientes deixaria um atacante
+bloquear o login do site inteiro.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from meu_novo_amigo_pet import metricas
+from meu_novo_amigo_pet.middleware import ip_cliente
+
+logger = logging.getLogger(__name__)
+
+HISTORICO_BLOQUEIOS_SEGUNDOS = 60 * 60 * 24
+
+eventos_login = metricas.contador(
+    'login_eventos_total', 'Falhas de senha, bloqueios aplicados e tentativas rejeitadas por bloqueio', ('evento',),
+)
+
+_lock = threading.Lock()
+_estatisticas = {
+    'falhas': 0,
+    'bloqueios_conta': 0,
+    'bloqueios_ip': 0,
+    'rejeitadas_conta': 0,
+    'rejeitadas_ip': 0,
+}
+
+
+def _config():
+    return {
+        'janela': getattr(settings, 'LOGIN_JANELA_SEGUNDOS', 15 * 60),
+        'conta': getattr(settings, 'LOGIN_LIMITE_POR_CONTA', 5),
+        'ip': getattr(settings, 'LOGIN_LIMITE_POR_IP', 30),
+        'bloqueio_base': getattr(settings, 'LOGIN_BLOQUEIO_BASE_SEGUNDOS', 60),
+        'bloqueio_maximo': getattr(settings, 'LOGIN_BLOQUEIO_MAXIMO_SEGUNDOS', 60 * 60),
+    }
+
+
+def _cache():
+    return caches[getattr(settings, 'LOGIN_LIMITE_CACHE_ALIAS', 'compartilhado')]
+
+
+def _contar(chave):
+    with _lock:
+        _estatisticas[chave] += 1
+
+
+def _identificadores(request, conta):
+    """{'conta': chave, 'ip': chave}; a conta é normalizada e guardada como hash"""
+    identificadores = {}
+    ip = ip_cliente(request)
+    if ip:
+        identificadores['ip'] = ip
+    if conta:
+        identificadores['conta'] = hashlib.sha256(conta.strip().lower().encode()).hexdigest()[:32]
+    return {tipo: f'accounts:login:{tipo}:{valor}' for tipo, valor in identificadores.items()}
+
+
+def segundos_bloqueado(request, conta):
+    """Segundos restantes do bloqueio da conta ou do IP (0 se nenhum estiver bloqueado)"""
+    chaves = _identificadores(request, conta)
+    bloqueios = _cache().get_many([f'{chave}:bloqueio' for chave in chaves.values()])
+    agora = time.time()
+    restante = 0
+    for tipo, chave in chaves.items():
+        ate = bloqueios.get(f'{chave}:bloqueio')
+        if ate and ate > agora:
+            restante = max(restante, ate - agora)
+            _contar(f'rejeitadas_{tipo}')
+    return math.ceil(restante)
+
+
+def _janela_deslizante(cache, chave, janela, agora):
+    """Soma 1 ao balde atual e devolve a contagem estimada na janela"""
+    balde = int(agora // janela)
+    atual = f'{chave}:{balde}'
+    try:
+        contagem = cache.incr(atual)
+    except ValueError:
+        # Primeira falha do balde; se outro worker criou o balde antes, soma nele
+        contagem = 1 if cache.add(atual, 1, janela * 2) else cache.incr(atual)
+    anterior = cache.get(f'{chave}:{balde - 1}', 0)
+    peso_anterior = 1 - (agora % janela) / janela
+    return contagem + anterior * peso_anterior
+
+
+def _bloquear(cache, chave, config, agora):
+    """Bloqueia com duração exponencial; devolve a duração em segundos"""
+    historico = f'{chave}:bloqueios'
+    anteriores = cache.get(historico, 0)
+    duracao = min(config['bloqueio_base'] * 2 ** anteriores, config['bloqueio_maximo'])
+    cache.set(f'{chave}:bloqueio', agora + duracao, duracao)
+    cache.set(historico, anteriores + 1, HISTORICO_BLOQUEIOS_SEGUNDOS)
+    return duracao
+
+
+def registrar_falha(request, conta):
+    """Conta uma senha errada para a conta e para o IP, bloqueando se passar do limite"""
+    config = _config()
+    cache = _cache()
+    agora = time.time()
+    _contar('falhas')
+    for tipo, chave in _identificadores(request, conta).items():
+        if _janela_deslizante(cache, chave, config['janela'], agora) >= config[tipo]:
+            duracao = _bloquear(cache, chave, config, agora)
+            _contar(f'bloqueios_{tipo}')
+            # Recomeça a contagem para o próximo bloqueio exigir novas falhas
+            balde = int(agora // config['janela'])
+            cache.delete_many([f'{chave}:{balde}', f'{chave}:{balde - 1}'])
+            logger.warning('Login bloqueado por %ss (%s)', duracao, tipo)
+
+
+def registrar_sucesso(request, conta):
+    """Login certo zera as falhas e o histórico de bloqueios da conta"""
+    chave = _identificadores(request, conta).get('conta')
+    if chave:
+        balde = int(time.time() // _config()['janela'])
+        _cache().delete_many([f'{chave}:{balde}', f'{chave}:{balde - 1}', f'{chave}:bloqueios'])
+
+
+def estatisticas_login():
+    """Falhas de senha, bloqueios aplicados e tentativas rejeitadas neste processo"""
+    with _lock:
+        return dict(_estatisticas)
+
+
+def publicar_metricas():
+    """Coletor de métricas (ver metricas.py) com os totais deste processo"""
+    for evento, total in estatisticas_login().items():
+        eventos_login.definir(total, evento=evento)
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SolicitacaoVerificacao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome_organizacao', models.CharField(max_length=255, verbose_name='Nome da organização')),
+                ('cnpj', models.CharField(max_length=18, verbose_name='CNPJ')),
+                ('endereco', models.TextField(verbose_name='Endereço completo')),
+                ('telefone_organizacao', models.CharField(max_length=20, verbose_name='Telefone da organização')),
+                ('site', models.URLField(blank=True, null=True, verbose_name='Site da organização')),
+                ('descricao_atividades', models.TextField(verbose_name='Descrição das atividades')),
+                ('documento', models.FileField(blank=True, null=True, upload_to='verificacoes/', verbose_name='Documento comprobatório')),
+                ('documento_sha256', models.CharField(blank=True, help_text='Preenchido pelo processamento em segundo plano', max_length=64, null=True, verbose_name='SHA-256 do documento')),
+                ('status', models.CharField(choices=[('Pendente', 'Pendente'), ('Aprovada', 'Aprovada'), ('Rejeitada', 'Rejeitada')], default='Pendente', max_length=20, verbose_name='Status')),
+                ('data_solicitacao', models.DateTimeField(auto_now_add=True, verbose_name='Data da solicitação')),
+                ('data_processamento', models.DateTimeField(blank=True, null=True, verbose_name='Data do processamento')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='solicitacoes_verificacao', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Solicitação de Verificação',
+                'verbose_name_plural': 'Solicitações de Verificação',
+                'db_table': 'solicitacao_verificacao',
+                'ordering': ['-data_solicitacao'],
+            },
+        ),
+    ]
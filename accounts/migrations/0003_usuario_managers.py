@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:44
+
+import accounts.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_solicitacao_verificacao'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='usuario',
+            managers=[
+                ('objects', accounts.models.UsuarioManager()),
+            ],
+        ),
+    ]
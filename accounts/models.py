@@ -1,8 +1,37 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
 
+from meu_novo_amigo_pet.identidade import MapaIdentidadeMixin
 
-class Usuario(AbstractUser):
+
+class UsuarioQuerySet(models.QuerySet):
+    """
+    update() e bulk_update() não disparam o post_save que tira o usuário do
+    cache do UsuarioCacheBackend: sem isso, desativar ou rebaixar contas em
+    lote só valeria para as sessões abertas depois de USUARIO_CACHE_TIMEOUT.
+    """
+    
+    def update(self, **kwargs):
+        # backends importa o ModelBackend, que depende do modelo já carregado
+        from .backends import invalidar_usuarios
+        user_ids = list(self.values_list('pk', flat=True))
+        total = super().update(**kwargs)
+        invalidar_usuarios(user_ids)
+        return total
+    
+    def bulk_update(self, objs, fields, batch_size=None):
+        from .backends import invalidar_usuarios
+        objs = list(objs)
+        total = super().bulk_update(objs, fields, batch_size=batch_size)
+        invalidar_usuarios([obj.pk for obj in objs])
+        return total
+
+
+class UsuarioManager(UserManager.from_queryset(UsuarioQuerySet)):
+    pass
+
+
+class Usuario(MapaIdentidadeMixin, AbstractUser):
     """Modelo customizado de usuário para a plataforma Meu Novo Amigo Pet"""
     
     TIPO_CONTA_CHOICES = [
@@ -27,6 +56,8 @@ class Usuario(AbstractUser):
     )
     data_criacao = models.DateTimeField(auto_now_add=True, verbose_name="Data de criação")
     
+    objects = UsuarioManager()
+    
     # Campos do AbstractUser que vamos usar
     email = models.EmailField(unique=True, verbose_name="E-mail")
     first_name = None  # Não usaremos
@@ -51,4 +82,61 @@ class Usuario(AbstractUser):
         return self.nome
     
     def get_short_name(self):
-        return self.nome.split()[0] if self.nome else self.email
\ No newline at end of file
+        return self.nome.split()[0] if self.nome else self.email
+
+
+class SolicitacaoVerificacao(models.Model):
+    """Solicitação de verificação enviada por uma ONG"""
+    
+    STATUS_CHOICES = [
+        ('Pendente', 'Pendente'),
+        ('Aprovada', 'Aprovada'),
+        ('Rejeitada', 'Rejeitada'),
+    ]
+    
+    usuario = models.ForeignKey(
+        Usuario,
+        on_delete=models.CASCADE,
+        related_name='solicitacoes_verificacao',
+        verbose_name="Usuário"
+    )
+    nome_organizacao = models.CharField(max_length=255, verbose_name="Nome da organização")
+    cnpj = models.CharField(max_length=18, verbose_name="CNPJ")
+    endereco = models.TextField(verbose_name="Endereço completo")
+    telefone_organizacao = models.CharField(max_length=20, verbose_name="Telefone da organização")
+    site = models.URLField(blank=True, null=True, verbose_name="Site da organização")
+    descricao_atividades = models.TextField(verbose_name="Descrição das atividades")
+    documento = models.FileField(
+        upload_to='verificacoes/',
+        blank=True,
+        null=True,
+        verbose_name="Documento comprobatório"
+    )
+    documento_sha256 = models.CharField(
+        max_length=64,
+        blank=True,
+        null=True,
+        verbose_name="SHA-256 do documento",
+        help_text="Preenchido pelo processamento em segundo plano"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='Pendente',
+        verbose_name="Status"
+    )
+    data_solicitacao = models.DateTimeField(auto_now_add=True, verbose_name="Data da solicitação")
+    data_processamento = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name="Data do processamento"
+    )
+    
+    class Meta:
+        verbose_name = "Solicitação de Verificação"
+        verbose_name_plural = "Solicitações de Verificação"
+        db_table = 'solicitacao_verificacao'
+        ordering = ['-data_solicitacao']
+    
+    def __str__(self):
+        return f"{self.nome_organizacao} ({self.status})"
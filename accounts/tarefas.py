@@ -0,0 +1,30 @@
+import hashlib
+
+from django.core.mail import mail_admins
+from django.utils import timezone
+
+from tarefas.fila import tarefa
+from .models import SolicitacaoVerificacao
+
+
+@tarefa(prioridade=5)
+def processar_solicitacao_verificacao(solicitacao_id):
+    """Calcula o hash do documento enviado e avisa os administradores"""
+    solicitacao = SolicitacaoVerificacao.objects.select_related('usuario').get(pk=solicitacao_id)
+    
+    if solicitacao.documento:
+        digest = hashlib.sha256()
+        with solicitacao.documento.open('rb') as documento:
+            for chunk in documento.chunks():
+                digest.update(chunk)
+        solicitacao.documento_sha256 = digest.hexdigest()
+    
+    solicitacao.data_processamento = timezone.now()
+    solicitacao.save(update_fields=['documento_sha256', 'data_processamento'])
+    
+    mail_admins(
+        f'Nova solicitação de verificação: {solicitacao.nome_organizacao}',
+        f'{solicitacao.usuario} solicitou a verificação da ONG '
+        f'"{solicitacao.nome_organizacao}" (CNPJ {solicitacao.cnpj}).\n'
+        f'Documento anexado: {"sim" if solicitacao.documento else "não"}',
+    )
@@ -1,3 +1,108 @@
-from django.test import TestCase
+import shutil
+import tempfile
+import threading
+from pathlib import Path
 
-# Create your tests here.
+from django.core.cache import caches
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from . import limite_login
+from .backends import UsuarioCacheBackend
+from .models import Usuario
+
+
+class LimiteLoginTests(SimpleTestCase):
+    """Contagem das falhas de login no cache compartilhado (SQLite)"""
+
+    def setUp(self):
+        pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, pasta, ignore_errors=True)
+        configuracao = override_settings(
+            CACHES={'default': {
+                'BACKEND': 'meu_novo_amigo_pet.cache_sqlite.SQLiteCache',
+                'LOCATION': Path(pasta) / 'cache.sqlite3',
+            }},
+            LOGIN_LIMITE_CACHE_ALIAS='default',
+            LOGIN_LIMITE_POR_CONTA=5,
+            LOGIN_LIMITE_POR_IP=30,
+            PROXIES_CONFIAVEIS=['10.0.0.1'],
+        )
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        self.cache = caches['default']
+
+    def requisicao(self, remote_addr='203.0.113.5', encaminhado=None):
+        meta = {'REMOTE_ADDR': remote_addr}
+        if encaminhado:
+            meta['HTTP_X_FORWARDED_FOR'] = encaminhado
+        return RequestFactory().post('/accounts/login/', **meta)
+
+    def test_falhas_simultaneas_nao_se_perdem(self):
+        agora = 1_000_000.0
+        janela = 900
+
+        def falhar():
+            for _ in range(50):
+                limite_login._janela_deslizante(self.cache, 'teste', janela, agora)
+
+        trabalhadores = [threading.Thread(target=falhar) for _ in range(8)]
+        for trabalhador in trabalhadores:
+            trabalhador.start()
+        for trabalhador in trabalhadores:
+            trabalhador.join()
+        self.assertEqual(self.cache.get(f'teste:{int(agora // janela)}'), 8 * 50)
+
+    def test_conta_bloqueada_ao_atingir_o_limite(self):
+        requisicao = self.requisicao()
+        for _ in range(4):
+            limite_login.registrar_falha(requisicao, 'Fulano@Exemplo.com')
+        self.assertEqual(limite_login.segundos_bloqueado(requisicao, 'fulano@exemplo.com'), 0)
+        limite_login.registrar_falha(requisicao, 'fulano@exemplo.com ')
+        self.assertGreater(limite_login.segundos_bloqueado(requisicao, 'fulano@exemplo.com'), 0)
+        # Outra conta no mesmo IP continua liberada
+        self.assertEqual(limite_login.segundos_bloqueado(requisicao, 'outro@exemplo.com'), 0)
+
+    @override_settings(LOGIN_LIMITE_POR_CONTA=1000, LOGIN_LIMITE_POR_IP=3)
+    def test_ip_do_cliente_atras_do_proxy(self):
+        for conta in ('a@exemplo.com', 'b@exemplo.com', 'c@exemplo.com'):
+            limite_login.registrar_falha(self.requisicao('10.0.0.1', '198.51.100.7'), conta)
+        self.assertGreater(limite_login.segundos_bloqueado(self.requisicao('10.0.0.1', '198.51.100.7'), None), 0)
+        # Outro cliente atrás do mesmo proxy tem o seu próprio balde
+        self.assertEqual(limite_login.segundos_bloqueado(self.requisicao('10.0.0.1', '198.51.100.8'), None), 0)
+        # Um X-Forwarded-For forjado pelo cliente não escapa do bloqueio
+        forjado = self.requisicao('10.0.0.1', '192.0.2.1, 198.51.100.7')
+        self.assertGreater(limite_login.segundos_bloqueado(forjado, None), 0)
+        # Sem passar pelo proxy confiável o cabeçalho é ignorado
+        direto = self.requisicao('198.51.100.9', '198.51.100.7')
+        self.assertEqual(limite_login.segundos_bloqueado(direto, None), 0)
+
+    @override_settings(PROXIES_CONFIAVEIS=[], LOGIN_LIMITE_POR_CONTA=1000, LOGIN_LIMITE_POR_IP=3)
+    def test_proxy_nao_configurado_nao_bloqueia_todos_os_clientes(self):
+        # Todos chegam pelo proxy local com o mesmo IP
+        for indice in range(5):
+            limite_login.registrar_falha(self.requisicao('127.0.0.1', f'198.51.100.{indice}'), f'{indice}@exemplo.com')
+        self.assertEqual(limite_login.segundos_bloqueado(self.requisicao('127.0.0.1'), 'vitima@exemplo.com'), 0)
+
+
+@override_settings(USUARIO_CACHE_ALIAS='default')
+class UsuarioCacheBackendTests(TestCase):
+    """Usuário da sessão em cache e sua invalidação"""
+
+    def setUp(self):
+        caches['default'].clear()
+        self.usuario = Usuario.objects.create_user(
+            username='fulano', email='fulano@exemplo.com', password='segredo123', nome='Fulano',
+        )
+        self.backend = UsuarioCacheBackend()
+
+    def test_update_em_lote_invalida_o_cache(self):
+        self.assertTrue(self.backend.get_user(self.usuario.pk).is_active)
+        Usuario.objects.filter(pk=self.usuario.pk).update(is_active=False)
+        # Usuário inativo não autentica mais
+        self.assertIsNone(self.backend.get_user(self.usuario.pk))
+
+    def test_bulk_update_invalida_o_cache(self):
+        self.assertFalse(self.backend.get_user(self.usuario.pk).is_staff)
+        self.usuario.is_staff = True
+        Usuario.objects.bulk_update([self.usuario], ['is_staff'])
+        self.assertTrue(self.backend.get_user(self.usuario.pk).is_staff)
@@ -1,3 +1,5 @@
+import logging
+
 from django.shortcuts import render, redirect
 from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
@@ -6,15 +8,19 @@ from django.contrib.auth.views import LoginView, LogoutView
 from django.urls import reverse_lazy
 from django.views.generic import CreateView
 from django.contrib.auth import get_user_model
-from .forms import UsuarioRegistrationForm, UsuarioProfileForm, VerificacaoONGForm
-from .models import Usuario
+from .forms import LoginForm, UsuarioRegistrationForm, UsuarioProfileForm, VerificacaoONGForm
+from .models import Usuario, SolicitacaoVerificacao
+from .tarefas import processar_solicitacao_verificacao
 
 User = get_user_model()
 
+logger = logging.getLogger(__name__)
+
 
 class CustomLoginView(LoginView):
     """View customizada para login"""
     template_name = 'accounts/login.html'
+    authentication_form = LoginForm
     redirect_authenticated_user = True
     
     def get_success_url(self):
@@ -34,23 +40,22 @@ class UsuarioRegistrationView(CreateView):
     success_url = reverse_lazy('accounts:login')
     
     def form_valid(self, form):
-        print("DEBUG: form_valid chamado")
         try:
             response = super().form_valid(form)
-            print("DEBUG: usuário criado com sucesso")
+            logger.info('Usuário cadastrado', extra={'usuario_id': self.object.pk})
             messages.success(
                 self.request, 
                 'Conta criada com sucesso! Faça login para continuar.'
             )
             return response
         except Exception as e:
-            print(f"DEBUG: Erro ao criar usuário: {e}")
+            logger.exception('Erro ao criar usuário')
             messages.error(self.request, f'Erro ao criar conta: {e}')
             return self.form_invalid(form)
     
     def form_invalid(self, form):
-        print("DEBUG: form_invalid chamado")
-        print(f"DEBUG: Erros do formulário: {form.errors}")
+        # Só os nomes dos campos: os valores podem ter dados pessoais
+        logger.info('Cadastro recusado', extra={'campos_invalidos': sorted(form.errors)})
         return super().form_invalid(form)
 
 
@@ -87,8 +92,19 @@ def solicitacao_verificacao_ong(request):
     if request.method == 'POST':
         form = VerificacaoONGForm(request.POST, request.FILES)
         if form.is_valid():
-            # Aqui você pode salvar a solicitação em uma tabela separada
-            # ou enviar por email para o administrador
+            solicitacao = SolicitacaoVerificacao.objects.create(
+                usuario=request.user,
+                nome_organizacao=form.cleaned_data['nome_organizacao'],
+                cnpj=form.cleaned_data['cnpj'],
+                endereco=form.cleaned_data['endereco'],
+                telefone_organizacao=form.cleaned_data['telefone_organizacao'],
+                site=form.cleaned_data.get('site') or None,
+                descricao_atividades=form.cleaned_data['descricao_atividades'],
+                documento=form.cleaned_data.get('documentos_comprovatorios'),
+            )
+            # Conferência do documento e aviso aos administradores ficam
+            # fora da requisição
+            processar_solicitacao_verificacao.enfileirar(solicitacao.pk)
             messages.success(
                 request, 
                 'Solicitação de verificação enviada! Aguarde a análise do administrador.'
@@ -110,10 +126,10 @@ def dashboard_view(request):
     
     # Estatísticas do usuário
     stats = {
-        'pets_cadastrados': user.pets_doados.count(),
+        'pets_cadastrados': user.pets_doados.count() + user.pets_arquivados.count(),
         'pets_aprovados': user.pets_doados.filter(status_anuncio='Aprovado').count(),
         'pets_pendentes': user.pets_doados.filter(status_anuncio='Pendente').count(),
-        'candidaturas_enviadas': user.candidaturas.count(),
+        'candidaturas_enviadas': user.candidaturas.count() + user.candidaturas_arquivadas.count(),
     }
     
     # Pets recentes do usuário
@@ -121,7 +137,7 @@ def dashboard_view(request):
     
     # Candidaturas recebidas (se for doador)
     candidaturas_recebidas = []
-    for pet in user.pets_doados.all():
+    for pet in user.pets_doados.filter(num_candidaturas__gt=0):
         candidaturas_recebidas.extend(pet.candidaturas.all())
     
     candidaturas_recebidas = candidaturas_recebidas[:10]  # Últimas 10
@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+"""
+Benchmark de concorrência do SQLite.
+
+Compara a configuração padrão (journal DELETE, conexão nova por operação) com o
+perfil de produção definido em settings.SQLITE_PRAGMAS (WAL, conexões
+persistentes, BEGIN IMMEDIATE), usando uma mistura de leituras de listagem de
+pets e gravações de interações do chat em threads concorrentes.
+
+Uso:
+    python bench_db.py [--leitores 8] [--escritores 2] [--segundos 5]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+import django
+
+# Configurar Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'meu_novo_amigo_pet.settings')
+django.setup()
+
+from django.conf import settings
+
+TOTAL_PETS = 2000
+
+
+def criar_banco(caminho):
+    """Cria um banco com tabelas simplificadas de pet e interacao_chat_ia"""
+    conn = sqlite3.connect(caminho)
+    conn.executescript("""
+        CREATE TABLE pet (
+            id INTEGER PRIMARY KEY,
+            nome TEXT, especie TEXT, cidade TEXT, estado TEXT,
+            status_anuncio TEXT, status_adocao TEXT, data_cadastro REAL
+        );
+        CREATE TABLE interacao_chat_ia (
+            id INTEGER PRIMARY KEY,
+            usuario_id INTEGER, mensagem_usuario TEXT, resposta_ia TEXT,
+            data_interacao REAL
+        );
+    """)
+    conn.executemany(
+        "INSERT INTO pet (nome, especie, cidade, estado, status_anuncio, status_adocao, data_cadastro) "
+        "VALUES (?, ?, ?, ?, 'Aprovado', 'Disponível', ?)",
+        [
+            (f'Pet {i}', random.choice(['Cão', 'Gato']), 'Manaus', 'AM', time.time() - i)
+            for i in range(TOTAL_PETS)
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+
+def abrir_conexao(caminho, perfil_producao):
+    if not perfil_producao:
+        return sqlite3.connect(caminho, isolation_level=None)
+    conn = sqlite3.connect(
+        caminho,
+        isolation_level=None,
+        timeout=settings.SQLITE_PRAGMAS['busy_timeout'] / 1000,
+    )
+    for nome, valor in settings.SQLITE_PRAGMAS.items():
+        conn.execute(f'PRAGMA {nome}={valor}')
+    return conn
+
+
+def executar(caminho, perfil_producao, leitores, escritores, segundos):
+    """Roda leitores e escritores concorrentes e devolve os contadores"""
+    resultados = {'leituras': 0, 'escritas': 0, 'erros': 0}
+    lock = threading.Lock()
+    fim = time.monotonic() + segundos
+
+    def trabalhar(escritor):
+        conn = abrir_conexao(caminho, perfil_producao) if perfil_producao else None
+        feitas = erros = 0
+        while time.monotonic() < fim:
+            # Sem conexão persistente, cada operação reabre o arquivo,
+            # como acontecia a cada requisição com CONN_MAX_AGE=0.
+            atual = conn or abrir_conexao(caminho, perfil_producao)
+            try:
+                if escritor:
+                    atual.execute('BEGIN IMMEDIATE' if perfil_producao else 'BEGIN')
+                    atual.execute(
+                        "INSERT INTO interacao_chat_ia (usuario_id, mensagem_usuario, resposta_ia, data_interacao) "
+                        "VALUES (?, 'oi', 'Olá! Como posso ajudar?', ?)",
+                        (random.randint(1, 100), time.time()),
+                    )
+                    atual.execute('COMMIT')
+                else:
+                    atual.execute(
+                        "SELECT id, nome, especie, cidade, estado FROM pet "
+                        "WHERE status_anuncio = 'Aprovado' AND status_adocao = 'Disponível' "
+                        "ORDER BY data_cadastro DESC LIMIT 12 OFFSET ?",
+                        (random.randint(0, TOTAL_PETS // 12) * 12,),
+                    ).fetchall()
+                feitas += 1
+            except sqlite3.OperationalError:
+                erros += 1
+                if atual.in_transaction:
+                    atual.execute('ROLLBACK')
+            finally:
+                if conn is None:
+                    atual.close()
+        if conn is not None:
+            conn.close()
+        with lock:
+            resultados['escritas' if escritor else 'leituras'] += feitas
+            resultados['erros'] += erros
+
+    threads = [threading.Thread(target=trabalhar, args=(False,)) for _ in range(leitores)]
+    threads += [threading.Thread(target=trabalhar, args=(True,)) for _ in range(escritores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--leitores', type=int, default=8)
+    parser.add_argument('--escritores', type=int, default=2)
+    parser.add_argument('--segundos', type=float, default=5)
+    args = parser.parse_args()
+
+    print("🔬 Benchmark de concorrência do SQLite")
+    print("=" * 50)
+    print(f"👀 Leitores: {args.leitores} | ✍️ Escritores: {args.escritores} | ⏱️ {args.segundos}s por perfil")
+
+    for nome, perfil_producao in (('Padrão (journal DELETE)', False), ('Produção (WAL)', True)):
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho = os.path.join(diretorio, 'bench.sqlite3')
+            criar_banco(caminho)
+            r = executar(caminho, perfil_producao, args.leitores, args.escritores, args.segundos)
+        print(f"\n📊 {nome}")
+        print(f"   Leituras/s: {r['leituras'] / args.segundos:,.0f}")
+        print(f"   Escritas/s: {r['escritas'] / args.segundos:,.0f}")
+        print(f"   Erros (database is locked): {r['erros']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat_ai', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='interacaochatia',
+            index=models.Index(fields=['usuario', '-data_interacao'], name='interacao_usuario_data_idx'),
+        ),
+    ]
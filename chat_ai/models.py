@@ -60,6 +60,10 @@ class InteracaoChatIA(models.Model):
         verbose_name_plural = "Interações Chat IA"
         db_table = 'interacao_chat_ia'
         ordering = ['-data_interacao']
+        indexes = [
+            # Histórico do usuário, mais recentes primeiro
+            models.Index(fields=['usuario', '-data_interacao'], name='interacao_usuario_data_idx'),
+        ]
     
     def __str__(self):
         return f"Chat IA - {self.usuario.nome} - {self.data_interacao.strftime('%d/%m/%Y %H:%M')}"
@@ -1,11 +1,17 @@
 import re
+import time
 from typing import Dict, List, Optional
 from django.contrib.auth import get_user_model
+from meu_novo_amigo_pet import metricas
 from pets.models import Pet
 from .models import InteracaoChatIA
 
 Usuario = get_user_model()
 
+duracao_intencao = metricas.histograma(
+    'chat_resposta_segundos', 'Tempo para gerar a resposta do chat, por intenção detectada', ('intencao',),
+)
+
 
 class ChatIAService:
     """Serviço para processar mensagens do chat com IA"""
@@ -55,16 +61,19 @@ class ChatIAService:
         contexto_detectado = self._detectar_contexto(mensagem_lower)
         
         # Processar baseado no contexto
+        inicio = time.perf_counter()
         if contexto_detectado == 'busca_pet':
-            return self._processar_busca_pet(mensagem, usuario)
+            resposta = self._processar_busca_pet(mensagem, usuario)
         elif contexto_detectado == 'duvida_adocao':
-            return self._processar_duvida_adocao(mensagem)
+            resposta = self._processar_duvida_adocao(mensagem)
         elif contexto_detectado == 'cuidados_pet':
-            return self._processar_cuidados_pet(mensagem)
+            resposta = self._processar_cuidados_pet(mensagem)
         elif contexto_detectado == 'suporte_tecnico':
-            return self._processar_suporte_tecnico(mensagem)
+            resposta = self._processar_suporte_tecnico(mensagem)
         else:
-            return self._resposta_generica(mensagem, usuario)
+            resposta = self._resposta_generica(mensagem, usuario)
+        duracao_intencao.observar(time.perf_counter() - inicio, intencao=contexto_detectado)
+        return resposta
     
     def _detectar_contexto(self, mensagem: str) -> str:
         """Detecta o contexto da mensagem baseado em palavras-chave"""
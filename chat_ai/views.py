@@ -9,6 +9,16 @@ import time
 from .models import InteracaoChatIA, ConfiguracaoChatIA
 from .services import ChatIAService
 
+# Quantas interações o histórico do chat mostra
+LIMITE_HISTORICO = 50
+
+
+def historico_usuario(usuario):
+    """Últimas interações do usuário com o chat, mais recentes primeiro"""
+    return InteracaoChatIA.objects.filter(
+        usuario=usuario
+    ).order_by('-data_interacao')[:LIMITE_HISTORICO]
+
 
 @login_required
 def chat_view(request):
@@ -126,9 +136,7 @@ def feedback_chat_view(request):
 @login_required
 def historico_chat_view(request):
     """View para histórico de conversas do usuário"""
-    interacoes = InteracaoChatIA.objects.filter(
-        usuario=request.user
-    ).order_by('-data_interacao')[:50]  # Últimas 50 interações
+    interacoes = historico_usuario(request.user)
     
     context = {
         'interacoes': interacoes,
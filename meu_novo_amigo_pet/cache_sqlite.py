@@ -0,0 +1,197 @@
+"""
+Cache compartilhado entre os workers da mesma máquina, numa tabela SQLite.
+
+Substitui o FileBasedCache, cujo set() lista o diretório inteiro (_cull) a
+cada escrita. Aqui cada operação é um comando sobre a chave primária:
+
+- set/add/touch/delete custam O(1) (um INSERT/UPDATE/DELETE pela chave);
+- add é um único INSERT ... ON CONFLICT, atômico entre processos;
+- inteiros são guardados como INTEGER (os demais valores com pickle), então
+  incr é um UPDATE valor = valor + n atômico.
+
+As entradas expiradas são ignoradas nas leituras e removidas a cada
+LIMPEZA_A_CADA escritas do processo (pelo índice de expira); só então a
+quantidade de linhas é comparada com MAX_ENTRIES. O custo da limpeza é
+dividido entre as escritas, em vez de pago em cada uma.
+
+O arquivo fica em modo WAL: leitores não esperam o escritor, e as escritas
+de workers diferentes esperam até busy_timeout pelo lock.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+TABELA = 'cache'
+LIMPEZA_A_CADA = 1000
+BUSY_TIMEOUT_MS = 5000
+
+_ESQUEMA = (
+    f'CREATE TABLE IF NOT EXISTS {TABELA} (chave TEXT PRIMARY KEY, valor BLOB NOT NULL, expira REAL)',
+    f'CREATE INDEX IF NOT EXISTS {TABELA}_expira ON {TABELA} (expira)',
+)
+_VALIDA = '(expira IS NULL OR expira > ?)'
+
+
+def _codificar(valor):
+    # Inteiros ficam como INTEGER para o incr somar no próprio SQLite
+    if type(valor) is int and -2 ** 63 <= valor < 2 ** 63:
+        return valor
+    return pickle.dumps(valor, pickle.HIGHEST_PROTOCOL)
+
+
+def _decodificar(valor):
+    return valor if isinstance(valor, int) else pickle.loads(valor)
+
+
+class SQLiteCache(BaseCache):
+    """
+    LOCATION: caminho do arquivo SQLite (o diretório é criado se faltar).
+    OPTIONS: MAX_ENTRIES e CULL_FREQUENCY como nos backends do Django e
+    LIMPEZA_A_CADA (escritas entre duas limpezas).
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self.caminho = Path(location)
+        self._limpeza_a_cada = params.get('OPTIONS', {}).get('LIMPEZA_A_CADA', LIMPEZA_A_CADA)
+        self._local = threading.local()
+        self._escritas = 0
+        self._lock = threading.Lock()
+
+    def _conexao(self):
+        # Uma conexão por thread; depois de um fork o processo abre a sua
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None or self._local.pid != os.getpid():
+            self.caminho.parent.mkdir(parents=True, exist_ok=True)
+            conexao = sqlite3.connect(self.caminho, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.execute('PRAGMA synchronous=NORMAL')
+            for comando in _ESQUEMA:
+                conexao.execute(comando)
+            self._local.conexao = conexao
+            self._local.pid = os.getpid()
+        return conexao
+
+    def _executar(self, sql, parametros=()):
+        return self._conexao().execute(sql, parametros)
+
+    def _escreveu(self, quantidade=1):
+        with self._lock:
+            self._escritas += quantidade
+            if self._escritas < self._limpeza_a_cada:
+                return
+            self._escritas = 0
+        self.limpar()
+
+    def limpar(self):
+        """Remove as entradas expiradas e, se passar de MAX_ENTRIES, as que expiram primeiro"""
+        self._executar(f'DELETE FROM {TABELA} WHERE expira <= ?', (time.time(),))
+        total = self._executar(f'SELECT COUNT(*) FROM {TABELA}').fetchone()[0]
+        if total <= self._max_entries:
+            return
+        if not self._cull_frequency:
+            self._executar(f'DELETE FROM {TABELA}')
+            return
+        self._executar(
+            f'DELETE FROM {TABELA} WHERE rowid IN '
+            f'(SELECT rowid FROM {TABELA} ORDER BY expira IS NULL, expira LIMIT ?)',
+            (total // self._cull_frequency,),
+        )
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        # Só substitui uma linha já expirada
+        cursor = self._executar(
+            f'INSERT INTO {TABELA} (chave, valor, expira) VALUES (?, ?, ?) '
+            f'ON CONFLICT (chave) DO UPDATE SET valor = excluded.valor, expira = excluded.expira '
+            f'WHERE {TABELA}.expira IS NOT NULL AND {TABELA}.expira <= ?',
+            (key, _codificar(value), self.get_backend_timeout(timeout), time.time()),
+        )
+        self._escreveu()
+        return cursor.rowcount == 1
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        linha = self._executar(
+            f'SELECT valor FROM {TABELA} WHERE chave = ? AND {_VALIDA}', (key, time.time()),
+        ).fetchone()
+        return default if linha is None else _decodificar(linha[0])
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._executar(
+            f'INSERT OR REPLACE INTO {TABELA} (chave, valor, expira) VALUES (?, ?, ?)',
+            (key, _codificar(value), self.get_backend_timeout(timeout)),
+        )
+        self._escreveu()
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._executar(
+            f'UPDATE {TABELA} SET expira = ? WHERE chave = ? AND {_VALIDA}',
+            (self.get_backend_timeout(timeout), key, time.time()),
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._executar(f'DELETE FROM {TABELA} WHERE chave = ?', (key,)).rowcount == 1
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._executar(
+            f'SELECT 1 FROM {TABELA} WHERE chave = ? AND {_VALIDA}', (key, time.time()),
+        ).fetchone() is not None
+
+    def incr(self, key, delta=1, version=None):
+        chave = self.make_and_validate_key(key, version=version)
+        linha = self._executar(
+            f"UPDATE {TABELA} SET valor = valor + ? "
+            f"WHERE chave = ? AND {_VALIDA} AND typeof(valor) = 'integer' RETURNING valor",
+            (delta, chave, time.time()),
+        ).fetchone()
+        if linha is not None:
+            return linha[0]
+        if not self.has_key(key, version=version):
+            raise ValueError(f"Key '{key}' not found")
+        # Valor que não é inteiro: leitura e escrita, como no BaseCache
+        return super().incr(key, delta, version=version)
+
+    def get_many(self, keys, version=None):
+        chaves = {self.make_and_validate_key(key, version=version): key for key in keys}
+        if not chaves:
+            return {}
+        marcadores = ', '.join('?' * len(chaves))
+        linhas = self._executar(
+            f'SELECT chave, valor FROM {TABELA} WHERE chave IN ({marcadores}) AND {_VALIDA}',
+            (*chaves, time.time()),
+        )
+        return {chaves[chave]: _decodificar(valor) for chave, valor in linhas}
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expira = self.get_backend_timeout(timeout)
+        linhas = [
+            (self.make_and_validate_key(key, version=version), _codificar(value), expira)
+            for key, value in data.items()
+        ]
+        conexao = self._conexao()
+        with conexao:
+            conexao.execute('BEGIN IMMEDIATE')
+            conexao.executemany(
+                f'INSERT OR REPLACE INTO {TABELA} (chave, valor, expira) VALUES (?, ?, ?)', linhas,
+            )
+        self._escreveu(len(linhas))
+        return []
+
+    def delete_many(self, keys, version=None):
+        chaves = [self.make_and_validate_key(key, version=version) for key in keys]
+        if chaves:
+            self._executar(f'DELETE FROM {TABELA} WHERE chave IN ({", ".join("?" * len(chaves))})', chaves)
+
+    def clear(self):
+        self._executar(f'DELETE FROM {TABELA}')
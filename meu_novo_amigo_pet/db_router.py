@@ -0,0 +1,61 @@
+"""
+Roteamento de leitura/escrita entre o banco principal e as réplicas.
+
+As leituras dos modelos de pets, accounts e chat_ai são distribuídas entre os
+aliases listados em settings.DATABASE_REPLICAS. Escritas, leituras dentro de
+transações e requisições marcadas pelo FixarBancoPrimarioMiddleware (POSTs e
+as requisições seguintes da mesma sessão) usam sempre o banco principal.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+APPS_ROTEADOS = {'pets', 'accounts', 'chat_ai'}
+
+_fixar_primario = ContextVar('fixar_primario', default=False)
+
+
+@contextmanager
+def usar_primario(ativo=True):
+    """Força as leituras do bloco a usarem o banco principal"""
+    token = _fixar_primario.set(ativo)
+    try:
+        yield
+    finally:
+        _fixar_primario.reset(token)
+
+
+class LeituraEscritaRouter:
+    """Envia leituras para réplicas somente leitura e escritas para o principal"""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in APPS_ROTEADOS:
+            return None
+        replicas = settings.DATABASE_REPLICAS
+        if (
+            not replicas
+            or _fixar_primario.get()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label not in APPS_ROTEADOS:
+            return None
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas contêm os mesmos dados do principal
+        aliases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
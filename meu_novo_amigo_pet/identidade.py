@@ -0,0 +1,110 @@
+"""
+Mapa de identidade por requisição.
+
+Durante uma requisição (MapaIdentidadeMiddleware), toda instância completa
+de um modelo com MapaIdentidadeMixin carregada do banco é guardada pela
+chave (classe, pk). Os acessos a chaves estrangeiras para esses modelos
+(ex.: candidatura.pet, pet.doador) consultam o mapa antes de ir ao banco,
+então a mesma linha não é buscada duas vezes na mesma requisição.
+
+Fora de uma requisição (comandos, worker de tarefas) o mapa não existe e
+nada muda no comportamento dos modelos.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.apps import apps
+from django.db.models.fields.related_descriptors import ForwardManyToOneDescriptor
+
+_mapa_atual = ContextVar('mapa_identidade', default=None)
+
+
+class MapaIdentidade:
+    """Instâncias carregadas na requisição e contadores de uso"""
+
+    def __init__(self):
+        self.objetos = {}
+        # Acessos a chaves estrangeiras servidos pelo mapa / que foram ao banco
+        self.acertos = 0
+        self.consultas = 0
+
+    def __len__(self):
+        return len(self.objetos)
+
+
+@contextmanager
+def mapa_identidade():
+    """Ativa um mapa de identidade novo durante o bloco"""
+    mapa = MapaIdentidade()
+    token = _mapa_atual.set(mapa)
+    try:
+        yield mapa
+    finally:
+        _mapa_atual.reset(token)
+
+
+def registrar(instancia):
+    """Guarda a instância no mapa ativo (se houver)"""
+    mapa = _mapa_atual.get()
+    if mapa is not None and instancia.pk is not None:
+        mapa.objetos[type(instancia), instancia.pk] = instancia
+
+
+def remover(instancia):
+    mapa = _mapa_atual.get()
+    if mapa is not None:
+        mapa.objetos.pop((type(instancia), instancia.pk), None)
+
+
+class MapaIdentidadeMixin:
+    """Registra no mapa as instâncias carregadas, salvas e removidas"""
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        # Instâncias com campos adiados (only/defer) não são registradas
+        if len(values) == len(cls._meta.concrete_fields):
+            registrar(instancia)
+        return instancia
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        registrar(self)
+
+    def delete(self, *args, **kwargs):
+        remover(self)
+        return super().delete(*args, **kwargs)
+
+
+class DescritorComMapa(ForwardManyToOneDescriptor):
+    """Descritor de chave estrangeira que consulta o mapa antes do banco"""
+
+    def get_object(self, instance):
+        mapa = _mapa_atual.get()
+        if mapa is None:
+            return super().get_object(instance)
+        chave = (self.field.remote_field.model, getattr(instance, self.field.attname))
+        objeto = mapa.objetos.get(chave)
+        if objeto is not None:
+            mapa.acertos += 1
+            return objeto
+        mapa.consultas += 1
+        return super().get_object(instance)
+
+
+def instalar_descritores():
+    """
+    Troca os descritores das chaves estrangeiras que apontam para a chave
+    primária de modelos com MapaIdentidadeMixin. Chamado no ready() do app.
+    """
+    for modelo in apps.get_models():
+        for campo in modelo._meta.local_fields:
+            if not campo.many_to_one or not campo.concrete:
+                continue
+            descritor = modelo.__dict__.get(campo.name)
+            if (
+                type(descritor) is ForwardManyToOneDescriptor
+                and issubclass(campo.remote_field.model, MapaIdentidadeMixin)
+                and campo.target_field.primary_key
+            ):
+                setattr(modelo, campo.name, DescritorComMapa(campo))
@@ -0,0 +1,106 @@
+"""
+Logs em JSON gravados fora das threads das requisições.
+
+O FilaJSONHandler só coloca o registro numa fila em memória; uma thread do
+QueueListener formata em JSON (uma linha por registro) e grava em stderr ou
+no arquivo configurado. Assim uma requisição nunca espera escrita em disco
+ou no terminal para registrar um log.
+
+O FiltroRequisicao acrescenta a todos os registros emitidos durante uma
+requisição o id dela (ver RegistroRequisicaoMiddleware), para juntar os logs
+de uma mesma requisição.
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+id_requisicao = ContextVar('id_requisicao', default=None)
+
+# Atributos que todo LogRecord tem; o resto veio de extra={...}
+_ATRIBUTOS_PADRAO = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+# Extras que o Django passa e não fazem sentido no JSON
+_IGNORADOS = {'request', 'server_time'}
+
+
+class FormatadorJSON(logging.Formatter):
+    """Um objeto JSON por linha com os campos fixos e os extras do registro"""
+
+    def format(self, record):
+        dados = {
+            'momento': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensagem': record.getMessage(),
+        }
+        for chave, valor in vars(record).items():
+            if chave not in _ATRIBUTOS_PADRAO and chave not in _IGNORADOS and valor is not None:
+                dados[chave] = valor
+        if record.exc_info:
+            dados['excecao'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            dados['excecao'] = record.exc_text
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+class FiltroRequisicao(logging.Filter):
+    """Acrescenta o id da requisição atual (se houver) ao registro"""
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = id_requisicao.get()
+        return True
+
+
+class FilaJSONHandler(logging.handlers.QueueHandler):
+    """
+    Enfileira os registros para um QueueListener que os grava em JSON.
+
+    arquivo: caminho do arquivo de log; sem ele os registros vão para stderr.
+    """
+
+    def __init__(self, arquivo=None):
+        super().__init__(queue.SimpleQueue())
+        if arquivo:
+            destino = logging.handlers.WatchedFileHandler(arquivo, encoding='utf-8')
+        else:
+            destino = logging.StreamHandler(sys.stderr)
+        destino.setFormatter(FormatadorJSON())
+        self.listener = logging.handlers.QueueListener(self.queue, destino, respect_handler_level=False)
+        self._pid = None
+        self._iniciar()
+        atexit.register(self.parar)
+
+    def _iniciar(self):
+        # A thread do listener não sobrevive a um fork (workers do gunicorn
+        # com preload); cada processo inicia a sua
+        self._pid = os.getpid()
+        self.listener._thread = None
+        self.listener.start()
+
+    def parar(self):
+        if self._pid == os.getpid() and self.listener._thread is not None:
+            self.listener.stop()
+
+    def prepare(self, record):
+        # Formata a mensagem aqui (os args podem mudar depois), mas deixa a
+        # conversão para JSON para a thread do listener
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            self._iniciar()
+        super().enqueue(record)
@@ -0,0 +1,285 @@
+"""
+Registro de métricas da aplicação no formato de texto do Prometheus.
+
+Contadores, medidores e histogramas ficam na memória do processo, protegidos
+por um lock. Cada processo grava um retrato dos seus valores em
+METRICAS_DIR/<pid>.json no máximo a cada METRICAS_GRAVAR_SEGUNDOS (e ao
+encerrar); o /metrics junta os retratos de todos os workers:
+
+- contadores e histogramas são somados, inclusive os de processos já
+  encerrados, para que os totais nunca diminuam enquanto o diretório existir;
+- medidores são somados só entre os processos vivos.
+
+O diretório deve ser esvaziado a cada deploy, como o diretório multiprocesso
+do cliente oficial do Prometheus.
+
+Valores que os módulos já contam por conta própria (cache de cards, limite
+de login) entram por coletores: funções registradas com registrar_coletor()
+e chamadas antes de cada retrato para copiar os números para as métricas.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Em segundos, dos limites do histograma padrão do cliente do Prometheus
+BALDES_PADRAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_metricas = {}
+_coletores = []
+_lock_registro = threading.Lock()
+_ultima_gravacao = 0.0
+
+
+def diretorio():
+    return Path(getattr(settings, 'METRICAS_DIR', settings.BASE_DIR / '.metricas'))
+
+
+def intervalo_gravacao():
+    return getattr(settings, 'METRICAS_GRAVAR_SEGUNDOS', 5)
+
+
+class _Metrica:
+    tipo = None
+
+    def __init__(self, nome, descricao, rotulos=()):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = tuple(rotulos)
+        # tupla com os valores dos rótulos -> valor
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def _chave(self, rotulos):
+        return tuple(str(rotulos.get(rotulo, '')) for rotulo in self.rotulos)
+
+    def retrato(self):
+        with self._lock:
+            valores = [[list(chave), valor] for chave, valor in self._valores.items()]
+        return {'tipo': self.tipo, 'descricao': self.descricao, 'rotulos': list(self.rotulos), 'valores': valores}
+
+
+class Contador(_Metrica):
+    tipo = 'counter'
+
+    def inc(self, valor=1, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def definir(self, valor, **rotulos):
+        """Copia um total já acumulado em outro lugar (uso dos coletores)"""
+        with self._lock:
+            self._valores[self._chave(rotulos)] = valor
+
+
+class Medidor(_Metrica):
+    tipo = 'gauge'
+
+    def definir(self, valor, **rotulos):
+        with self._lock:
+            self._valores[self._chave(rotulos)] = valor
+
+    def inc(self, valor=1, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+
+class Histograma(_Metrica):
+    tipo = 'histogram'
+
+    def __init__(self, nome, descricao, rotulos=(), baldes=BALDES_PADRAO):
+        super().__init__(nome, descricao, rotulos)
+        self.baldes = tuple(sorted(baldes))
+
+    def observar(self, valor, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            # [contagem por balde (não acumulada)..., +Inf, soma]
+            atual = self._valores.get(chave)
+            if atual is None:
+                atual = self._valores[chave] = [0] * (len(self.baldes) + 1) + [0.0]
+            atual[bisect_left(self.baldes, valor)] += 1
+            atual[-1] += valor
+
+    def retrato(self):
+        with self._lock:
+            valores = [[list(chave), list(valor)] for chave, valor in self._valores.items()]
+        return {
+            'tipo': self.tipo, 'descricao': self.descricao, 'rotulos': list(self.rotulos),
+            'baldes': list(self.baldes), 'valores': valores,
+        }
+
+
+def _registrar(classe, nome, *args, **kwargs):
+    with _lock_registro:
+        metrica = _metricas.get(nome)
+        if metrica is None:
+            metrica = _metricas[nome] = classe(nome, *args, **kwargs)
+        elif type(metrica) is not classe:
+            raise ValueError(f'Métrica {nome} já registrada como {metrica.tipo}')
+        return metrica
+
+
+def contador(nome, descricao, rotulos=()):
+    return _registrar(Contador, nome, descricao, rotulos)
+
+
+def medidor(nome, descricao, rotulos=()):
+    return _registrar(Medidor, nome, descricao, rotulos)
+
+
+def histograma(nome, descricao, rotulos=(), baldes=BALDES_PADRAO):
+    return _registrar(Histograma, nome, descricao, rotulos, baldes)
+
+
+def registrar_coletor(funcao):
+    """Registra uma função chamada antes de cada retrato; pode ser usada como decorator"""
+    if funcao not in _coletores:
+        _coletores.append(funcao)
+    return funcao
+
+
+def retrato():
+    """Valores atuais deste processo, depois de rodar os coletores"""
+    for coletor in _coletores:
+        try:
+            coletor()
+        except Exception:
+            logger.exception('Falha no coletor de métricas %s', coletor.__qualname__)
+    with _lock_registro:
+        metricas = list(_metricas.values())
+    return {metrica.nome: metrica.retrato() for metrica in metricas}
+
+
+def gravar():
+    """Grava o retrato deste processo no diretório compartilhado"""
+    global _ultima_gravacao
+    _ultima_gravacao = time.monotonic()
+    pasta = diretorio()
+    destino = pasta / f'{os.getpid()}.json'
+    temporario = pasta / f'{os.getpid()}.{threading.get_ident()}.tmp'
+    try:
+        pasta.mkdir(parents=True, exist_ok=True)
+        temporario.write_text(json.dumps(retrato()))
+        os.replace(temporario, destino)
+    except OSError:
+        logger.warning('Não foi possível gravar as métricas em %s', pasta, exc_info=True)
+
+
+def gravar_se_necessario():
+    if time.monotonic() - _ultima_gravacao >= intervalo_gravacao():
+        gravar()
+
+
+@atexit.register
+def _gravar_ao_sair():
+    # Só processos que já gravaram (servidores); comandos não deixam arquivo
+    if _ultima_gravacao:
+        gravar()
+
+
+def _processo_vivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OverflowError):
+        return True
+    return True
+
+
+def _retratos():
+    """(pid, retrato) de cada processo; o deste processo vem da memória"""
+    proprio = os.getpid()
+    yield proprio, retrato()
+    try:
+        arquivos = list(diretorio().glob('*.json'))
+    except OSError:
+        return
+    for arquivo in arquivos:
+        try:
+            pid = int(arquivo.stem)
+        except ValueError:
+            continue
+        if pid == proprio:
+            continue
+        try:
+            yield pid, json.loads(arquivo.read_text())
+        except (OSError, ValueError):
+            # Arquivo removido ou sendo substituído: fica para a próxima coleta
+            continue
+
+
+def juntar():
+    """{nome: {tipo, descricao, rotulos, [baldes], valores: {rótulos: valor}}} de todos os processos"""
+    juntas = {}
+    for pid, metricas in _retratos():
+        vivo = None
+        for nome, dados in metricas.items():
+            if dados['tipo'] == 'gauge':
+                if vivo is None:
+                    vivo = _processo_vivo(pid)
+                if not vivo:
+                    continue
+            junta = juntas.setdefault(nome, {**dados, 'valores': {}})
+            if junta['tipo'] != dados['tipo'] or junta.get('baldes') != dados.get('baldes'):
+                # Métrica redefinida entre deploys; vale a primeira encontrada
+                continue
+            for rotulos, valor in dados['valores']:
+                chave = tuple(rotulos)
+                atual = junta['valores'].get(chave)
+                if atual is None:
+                    junta['valores'][chave] = valor
+                elif dados['tipo'] == 'histogram':
+                    junta['valores'][chave] = [a + b for a, b in zip(atual, valor)]
+                else:
+                    junta['valores'][chave] = atual + valor
+    return juntas
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _rotulos(nomes, valores, extra=()):
+    pares = [*zip(nomes, valores), *extra]
+    if not pares:
+        return ''
+    return '{' + ','.join(f'{nome}="{_escapar(valor)}"' for nome, valor in pares) + '}'
+
+
+def _numero(valor):
+    if valor == float('inf'):
+        return '+Inf'
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def exportar():
+    """Texto no formato de exposição do Prometheus (versão 0.0.4)"""
+    gravar()
+    linhas = []
+    for nome, dados in sorted(juntar().items()):
+        linhas.append(f'# HELP {nome} {_escapar(dados["descricao"])}')
+        linhas.append(f'# TYPE {nome} {dados["tipo"]}')
+        for rotulos, valor in sorted(dados['valores'].items()):
+            if dados['tipo'] != 'histogram':
+                linhas.append(f'{nome}{_rotulos(dados["rotulos"], rotulos)} {_numero(valor)}')
+                continue
+            acumulado = 0
+            for limite, quantidade in zip([*dados['baldes'], float('inf')], valor[:-1]):
+                acumulado += quantidade
+                le = (('le', _numero(float(limite))),)
+                linhas.append(f'{nome}_bucket{_rotulos(dados["rotulos"], rotulos, le)} {acumulado}')
+            linhas.append(f'{nome}_sum{_rotulos(dados["rotulos"], rotulos)} {_numero(valor[-1])}')
+            linhas.append(f'{nome}_count{_rotulos(dados["rotulos"], rotulos)} {acumulado}')
+    return '\n'.join(linhas) + '\n'
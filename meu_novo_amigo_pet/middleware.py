@@ -0,0 +1,230 @@
+import ipaddress
+import logging
+import random
+import re
+import time
+import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import metricas
+from .db_router import usar_primario
+from .identidade import mapa_identidade
+from .logs import id_requisicao
+
+logger = logging.getLogger(__name__)
+logger_requisicoes = logging.getLogger('meu_novo_amigo_pet.requisicoes')
+
+# X-Request-ID aceito do proxy; qualquer outra coisa é trocada por um id novo
+ID_REQUISICAO_VALIDO = re.compile(r'^[A-Za-z0-9._-]{8,64}$')
+
+METODOS_SEGUROS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+requisicoes = metricas.contador(
+    'http_requisicoes_total', 'Requisições atendidas', ('view', 'metodo', 'status'),
+)
+duracao_requisicao = metricas.histograma(
+    'http_requisicao_segundos', 'Tempo até a view devolver a resposta', ('view',),
+)
+consultas_requisicao = metricas.histograma(
+    'db_consultas_por_requisicao', 'Consultas SQL feitas por requisição', ('view',),
+    baldes=(0, 1, 2, 5, 10, 20, 50, 100),
+)
+tempo_banco = metricas.contador(
+    'db_tempo_segundos_total', 'Tempo gasto em consultas SQL', ('view',),
+)
+cache_pagina = metricas.contador(
+    'cache_pagina_total', 'Páginas anônimas servidas do cache (HIT) ou geradas (MISS)', ('view', 'resultado'),
+)
+acessos_mapa = metricas.contador(
+    'mapa_identidade_acessos_total', 'Acessos a chaves estrangeiras com o mapa de identidade ativo', ('resultado',),
+)
+
+
+def _loopback(ip):
+    try:
+        return ipaddress.ip_address(ip).is_loopback
+    except ValueError:
+        return False
+
+
+def ip_cliente(request):
+    """
+    IP de quem fez a requisição. Conexões vindas de PROXIES_CONFIAVEIS usam
+    o X-Forwarded-For, da direita para a esquerda, até o primeiro endereço
+    que não é de um proxy confiável: os anteriores podem ter sido enviados
+    pelo próprio cliente.
+
+    Sem PROXIES_CONFIAVEIS, uma conexão de loopback fora do DEBUG é tratada
+    como vinda de um proxy local não configurado: devolve None (cliente
+    desconhecido) em vez do IP do próprio servidor.
+    """
+    confiaveis = getattr(settings, 'PROXIES_CONFIAVEIS', ())
+    ip = request.META.get('REMOTE_ADDR') or ''
+    if not confiaveis and not settings.DEBUG and _loopback(ip):
+        return None
+    encaminhados = [
+        endereco.strip() for endereco in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if endereco.strip()
+    ]
+    while ip in confiaveis and encaminhados:
+        ip = encaminhados.pop()
+    return ip
+
+
+class RegistroRequisicaoMiddleware:
+    """
+    Registra cada requisição uma vez no logger meu_novo_amigo_pet.requisicoes,
+    com id da requisição, usuário, view, status, duração e consultas SQL.
+
+    Views muito chamadas podem ser amostradas com LOG_REQUISICOES_AMOSTRAGEM
+    ({'nome_da_view': fração registrada}); erros (status >= 500) e
+    requisições acima de LOG_REQUISICOES_LENTAS_MS são sempre registrados.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.amostragem = getattr(settings, 'LOG_REQUISICOES_AMOSTRAGEM', {})
+        self.lentas_ms = getattr(settings, 'LOG_REQUISICOES_LENTAS_MS', 1000)
+
+    def __call__(self, request):
+        recebido = request.headers.get('X-Request-ID', '')
+        request.id = recebido if ID_REQUISICAO_VALIDO.match(recebido) else uuid.uuid4().hex
+        token = id_requisicao.set(request.id)
+        inicio = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            id_requisicao.reset(token)
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+        response['X-Request-ID'] = request.id
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else None
+        fracao = self.amostragem.get(view, 1.0)
+        if (
+            fracao >= 1.0 or response.status_code >= 500 or duracao_ms >= self.lentas_ms
+            or random.random() < fracao
+        ):
+            self._registrar(request, response, view, duracao_ms, fracao)
+        return response
+
+    def _registrar(self, request, response, view, duracao_ms, fracao):
+        # Só usa o usuário se alguém já o carregou: não abre a sessão só para o log
+        usuario = getattr(request, '_cached_user', None)
+        if response.status_code >= 500:
+            nivel = logging.ERROR
+        elif response.status_code >= 400:
+            nivel = logging.WARNING
+        else:
+            nivel = logging.INFO
+        logger_requisicoes.log(
+            nivel, '%s %s %s', request.method, request.path, response.status_code,
+            extra={
+                'request_id': request.id,
+                'usuario_id': usuario.pk if usuario is not None and usuario.is_authenticated else None,
+                'view': view,
+                'metodo': request.method,
+                'caminho': request.path,
+                'status': response.status_code,
+                'duracao_ms': round(duracao_ms, 1),
+                'consultas': getattr(request, 'consultas_sql', None),
+                'amostragem': fracao if fracao < 1.0 else None,
+            },
+        )
+
+
+class MetricasMiddleware:
+    """
+    Mede a duração, a quantidade de consultas e o tempo de banco de cada
+    requisição, por view (ver metricas.py). Fica no topo da lista para
+    incluir o tempo dos outros middlewares.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        banco = {'consultas': 0, 'segundos': 0.0}
+
+        def medir(execute, sql, params, many, context):
+            inicio = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                banco['consultas'] += 1
+                banco['segundos'] += time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        with ExitStack() as pilha:
+            for alias in connections:
+                pilha.enter_context(connections[alias].execute_wrapper(medir))
+            response = self.get_response(request)
+        duracao = time.perf_counter() - inicio
+        request.consultas_sql = banco['consultas']
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'nao_encontrada'
+        requisicoes.inc(view=view, metodo=request.method, status=f'{response.status_code // 100}xx')
+        duracao_requisicao.observar(duracao, view=view)
+        consultas_requisicao.observar(banco['consultas'], view=view)
+        if banco['segundos']:
+            tempo_banco.inc(banco['segundos'], view=view)
+        resultado_cache = response.get('X-Cache')
+        if resultado_cache:
+            cache_pagina.inc(view=view, resultado=resultado_cache)
+        metricas.gravar_se_necessario()
+        return response
+
+
+class FixarBancoPrimarioMiddleware:
+    """
+    Garante "read-your-writes": requisições de escrita e as requisições da
+    mesma sessão nos segundos seguintes leem do banco principal, e não de uma
+    réplica que ainda pode estar desatualizada.
+    """
+
+    CHAVE_SESSAO = '_banco_primario_ate'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        escrita = request.method not in METODOS_SEGUROS
+        sessao = getattr(request, 'session', None)
+        fixado_ate = sessao.get(self.CHAVE_SESSAO, 0) if sessao is not None else 0
+
+        with usar_primario(escrita or fixado_ate > time.time()):
+            response = self.get_response(request)
+
+        # Só grava na sessão se ela já existir (ex.: login), para não criar
+        # sessões para POSTs anônimos que falharam.
+        if escrita and sessao is not None and sessao.session_key:
+            sessao[self.CHAVE_SESSAO] = time.time() + settings.DATABASE_REPLICA_FIXAR_SEGUNDOS
+        return response
+
+
+class MapaIdentidadeMiddleware:
+    """
+    Ativa o mapa de identidade da requisição (ver identidade.py) e informa
+    quantos acessos a chaves estrangeiras foram servidos sem consulta.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with mapa_identidade() as mapa:
+            response = self.get_response(request)
+
+        if mapa.acertos or mapa.consultas:
+            acessos_mapa.inc(mapa.acertos, resultado='acerto')
+            acessos_mapa.inc(mapa.consultas, resultado='consulta')
+            logger.debug(
+                '%s %s: mapa de identidade com %d objetos, %d acertos, %d consultas',
+                request.method, request.path, len(mapa), mapa.acertos, mapa.consultas,
+            )
+        if settings.DEBUG:
+            response['X-Mapa-Identidade'] = f'acertos={mapa.acertos}, consultas={mapa.consultas}'
+        return response
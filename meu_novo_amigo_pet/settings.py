@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -25,6 +27,9 @@ SECRET_KEY = 'django-insecure-6i$_&oc2d^)cfh$*rba&*q5))b(3n9w+0^w552*-+myyvfbmu@
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
+# manage.py test: caches e logs separados dos de desenvolvimento
+TESTANDO = sys.argv[1:2] == ['test']
+
 ALLOWED_HOSTS = []
 
 
@@ -40,11 +45,16 @@ INSTALLED_APPS = [
     'accounts',
     'pets',
     'chat_ai',
+    'tarefas',
 ]
 
 MIDDLEWARE = [
+    'meu_novo_amigo_pet.middleware.RegistroRequisicaoMiddleware',
+    'meu_novo_amigo_pet.middleware.MetricasMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'meu_novo_amigo_pet.middleware.MapaIdentidadeMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'meu_novo_amigo_pet.middleware.FixarBancoPrimarioMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -75,13 +85,121 @@ WSGI_APPLICATION = 'meu_novo_amigo_pet.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Perfil de produção do SQLite, aplicado a cada nova conexão via init_command:
+# - WAL permite que leitores continuem lendo enquanto uma escrita está em curso
+#   (ex.: gravação de InteracaoChatIA) e torna os commits mais baratos;
+# - synchronous=NORMAL é seguro em WAL (só o último commit pode se perder numa
+#   queda de energia, nunca corromper o banco);
+# - mmap_size/cache_size reduzem leituras de disco para as páginas mais usadas;
+# - busy_timeout faz escritores concorrentes esperarem o lock em vez de
+#   falharem imediatamente com "database is locked".
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,  # 256 MiB
+    'cache_size': -64 * 1024,  # valor negativo = KiB (64 MiB)
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,  # ms
+    'foreign_keys': 'ON',
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        # Conexões persistentes: evita reabrir o arquivo e reaplicar os pragmas
+        # a cada requisição.
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ';'.join(
+                f'PRAGMA {nome}={valor}' for nome, valor in SQLITE_PRAGMAS.items()
+            ),
+            # BEGIN IMMEDIATE pega o lock de escrita no início da transação,
+            # evitando o erro de upgrade de lock (SQLITE_BUSY) entre escritores.
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': SQLITE_PRAGMAS['busy_timeout'] / 1000,
+        },
+    },
+    # Réplica somente leitura: o mesmo arquivo aberto com mode=ro. Em WAL os
+    # leitores não disputam lock com o escritor. Em produção pode apontar para
+    # uma cópia de backup atualizada periodicamente.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f"file:{BASE_DIR / 'db.sqlite3'}?mode=ro",
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ';'.join(
+                [f'PRAGMA {nome}={valor}' for nome, valor in SQLITE_PRAGMAS.items()
+                 if nome != 'journal_mode'] + ['PRAGMA query_only=ON']
+            ),
+            'timeout': SQLITE_PRAGMAS['busy_timeout'] / 1000,
+        },
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
 }
 
+# Leituras dos apps pets, accounts e chat_ai vão para as réplicas; escritas e
+# leituras feitas logo após um POST na mesma sessão ficam no banco principal.
+DATABASE_ROUTERS = ['meu_novo_amigo_pet.db_router.LeituraEscritaRouter']
+DATABASE_REPLICAS = ['replica']
+DATABASE_REPLICA_FIXAR_SEGUNDOS = 10
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'meu-novo-amigo-pet',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+    # Cache compartilhado entre os workers da mesma máquina (sessões, usuário
+    # da sessão, limite de login, geração e páginas do catálogo): uma tabela
+    # SQLite com escritas O(1) e add/incr atômicos; ver
+    # meu_novo_amigo_pet/cache_sqlite.py
+    'compartilhado': {
+        'BACKEND': 'meu_novo_amigo_pet.cache_sqlite.SQLiteCache',
+        'LOCATION': Path(os.environ.get('CACHE_COMPARTILHADO_DIR', BASE_DIR / '.cache')) / (
+            'testes.sqlite3' if TESTANDO else 'compartilhado.sqlite3'
+        ),
+        'TIMEOUT': 60 * 60 * 24 * 14,
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
+    },
+}
+
+# Geração do catálogo, páginas públicas e sitemaps (ver pets/cache.py)
+CATALOGO_CACHE_ALIAS = 'compartilhado'
+
+# Retratos das métricas de cada worker, juntados pelo /metrics; o /metrics
+# só responde para estes IPs (o Prometheus) ou para usuários da equipe.
+METRICAS_DIR = os.environ.get('METRICAS_DIR', BASE_DIR / '.metricas')
+METRICAS_IPS_PERMITIDOS = os.environ.get('METRICAS_IPS_PERMITIDOS', '127.0.0.1,::1').split(',')
+
+# Proxies reversos na frente da aplicação (ex.: o nginx local). Das conexões
+# vindas deles o IP do cliente é lido do X-Forwarded-For (ver
+# middleware.ip_cliente); sem isso todos os clientes teriam o IP do proxy,
+# e o limite de login por IP viraria um único balde para o site inteiro.
+# Atrás de um nginx local, configure PROXIES_CONFIAVEIS=127.0.0.1,::1 e
+# proxy_set_header X-Forwarded-For $proxy_add_x_forwarded_for no nginx.
+# Enquanto não estiver configurado (e fora do DEBUG), conexões de loopback
+# têm IP desconhecido: o /metrics e os detalhes do /ready só respondem à
+# equipe, e o login não usa o limite por IP (só o por conta).
+PROXIES_CONFIAVEIS = [ip for ip in os.environ.get('PROXIES_CONFIAVEIS', '').split(',') if ip]
+
+# Sessões lidas do cache compartilhado, com gravação também no banco
+# (django_session) para não se perderem se o cache for apagado.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'compartilhado'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -125,6 +243,52 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Logging
+# https://docs.djangoproject.com/en/5.2/topics/logging/
+# Logs em JSON, uma linha por registro, gravados por uma thread própria
+# (ver meu_novo_amigo_pet/logs.py). LOG_ARQUIVO troca o stderr por um arquivo.
+
+# Nos testes os logs ficam quietos (como o console padrão do Django, que só
+# escreve com DEBUG=True), a menos que LOG_NIVEL seja definido.
+LOG_SILENCIOSO = TESTANDO and not os.environ.get('LOG_NIVEL')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'requisicao': {'()': 'meu_novo_amigo_pet.logs.FiltroRequisicao'},
+    },
+    'handlers': {
+        'json': {
+            'class': 'meu_novo_amigo_pet.logs.FilaJSONHandler',
+            'filters': ['requisicao'],
+            'arquivo': os.environ.get('LOG_ARQUIVO') or None,
+        },
+    },
+    'root': {
+        'handlers': ['json'],
+        'level': 'CRITICAL' if LOG_SILENCIOSO else os.environ.get('LOG_NIVEL', 'INFO'),
+    },
+    'loggers': {
+        'django': {
+            'handlers': ['json'],
+            'level': 'CRITICAL' if LOG_SILENCIOSO else 'INFO',
+            'propagate': False,
+        },
+        # Respostas 4xx já aparecem no log das requisições
+        'django.request': {
+            'level': 'ERROR',
+        },
+    },
+}
+
+# Fração das requisições registradas por view (as demais views: todas);
+# erros e requisições lentas são sempre registrados.
+LOG_REQUISICOES_AMOSTRAGEM = {
+    'chat_ai:chat_api': 0.1,
+}
+LOG_REQUISICOES_LENTAS_MS = 1000
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -133,6 +297,15 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.Usuario'
 
+# O usuário da sessão fica em cache por alguns segundos; o cache é
+# invalidado sempre que o Usuario é salvo, removido ou alterado por
+# update()/bulk_update(). Só um UPDATE feito fora do ORM (SQL direto) fica
+# valendo com até USUARIO_CACHE_TIMEOUT segundos de atraso, inclusive para
+# is_active e is_staff.
+AUTHENTICATION_BACKENDS = ['accounts.backends.UsuarioCacheBackend']
+USUARIO_CACHE_ALIAS = 'compartilhado'
+USUARIO_CACHE_TIMEOUT = 60
+
 # Login URLs
 LOGIN_URL = '/accounts/login/'
 LOGIN_REDIRECT_URL = '/accounts/dashboard/'
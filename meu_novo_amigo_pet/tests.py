@@ -0,0 +1,150 @@
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .cache_sqlite import TABELA, SQLiteCache
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    """Cache compartilhado em SQLite: semântica do cache do Django e add/incr atômicos"""
+
+    def setUp(self):
+        pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, pasta, ignore_errors=True)
+        self.caminho = Path(pasta) / 'cache.sqlite3'
+        self.cache = self.novo_cache()
+
+    def novo_cache(self, **opcoes):
+        return SQLiteCache(self.caminho, {'TIMEOUT': 60, 'OPTIONS': opcoes})
+
+    def em_paralelo(self, funcao, threads=8):
+        resultados = []
+        lock = threading.Lock()
+
+        def rodar():
+            resultado = funcao()
+            with lock:
+                resultados.append(resultado)
+
+        trabalhadores = [threading.Thread(target=rodar) for _ in range(threads)]
+        for trabalhador in trabalhadores:
+            trabalhador.start()
+        for trabalhador in trabalhadores:
+            trabalhador.join()
+        return resultados
+
+    def test_operacoes_basicas(self):
+        cache = self.cache
+        cache.set('a', {'valor': 1})
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), {'valor': 1})
+        self.assertEqual(cache.get_many(['a', 'b', 'c']), {'a': {'valor': 1}, 'b': 2})
+        self.assertFalse(cache.add('a', 'outro'))
+        self.assertTrue(cache.add('c', 'novo'))
+        self.assertTrue(cache.has_key('c'))
+        self.assertTrue(cache.touch('c', None))
+        self.assertTrue(cache.delete('c'))
+        self.assertFalse(cache.delete('c'))
+        cache.set_many({'d': 1, 'e': 'texto'})
+        cache.delete_many(['d', 'e'])
+        self.assertIsNone(cache.get('d'))
+        cache.clear()
+        self.assertIsNone(cache.get('a'))
+
+    def test_expiradas_sao_ignoradas_e_substituidas(self):
+        self.cache.set('a', 1, timeout=0)
+        self.assertIsNone(self.cache.get('a'))
+        self.assertFalse(self.cache.has_key('a'))
+        with self.assertRaises(ValueError):
+            self.cache.incr('a')
+        self.assertTrue(self.cache.add('a', 2))
+        self.assertEqual(self.cache.get('a'), 2)
+
+    def test_incr(self):
+        with self.assertRaises(ValueError):
+            self.cache.incr('faltando')
+        self.cache.set('n', 5)
+        self.assertEqual(self.cache.incr('n', 3), 8)
+        self.assertEqual(self.cache.decr('n'), 7)
+        # Valores que não são inteiros seguem o incr do BaseCache
+        self.cache.set('f', 1.5)
+        self.assertEqual(self.cache.incr('f'), 2.5)
+
+    def test_incr_concorrente_nao_perde_incrementos(self):
+        self.cache.set('contador', 0)
+
+        def incrementar():
+            # Cada thread usa a sua própria conexão, como workers diferentes
+            for _ in range(200):
+                self.cache.incr('contador')
+
+        self.em_paralelo(incrementar)
+        self.assertEqual(self.cache.get('contador'), 8 * 200)
+
+    def test_add_concorrente_so_um_vence(self):
+        resultados = self.em_paralelo(lambda: self.cache.add('trava', 1))
+        self.assertEqual(resultados.count(True), 1)
+
+    def test_limpeza_remove_expiradas_e_respeita_max_entries(self):
+        cache = self.novo_cache(MAX_ENTRIES=10, CULL_FREQUENCY=2, LIMPEZA_A_CADA=5)
+        cache.set('expirada', 1, timeout=0)
+        for indice in range(30):
+            cache.set(f'chave-{indice}', indice)
+        total = cache._executar(f'SELECT COUNT(*) FROM {TABELA}').fetchone()[0]
+        self.assertLessEqual(total, 10 + 5)
+        expiradas = cache._executar(f'SELECT 1 FROM {TABELA} WHERE chave LIKE ?', ('%expirada',))
+        self.assertIsNone(expiradas.fetchone())
+        # As mais recentes ficam
+        self.assertEqual(cache.get('chave-29'), 29)
+
+
+class ProntidaoTests(TestCase):
+    """/ready é público: não escreve nos caches nem expõe o motivo das falhas"""
+
+    databases = {'default', 'replica'}
+
+    def test_prova_so_le_os_caches(self):
+        # Caches novos, sem chaves de outras execuções
+        pasta = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, pasta, ignore_errors=True)
+        vazios = {
+            alias: {'BACKEND': 'meu_novo_amigo_pet.cache_sqlite.SQLiteCache', 'LOCATION': Path(pasta) / alias}
+            for alias in settings.CACHES
+        }
+        with self.settings(CACHES=vazios):
+            response = self.client.get('/ready')
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.json()['pronto'])
+            for alias in vazios:
+                self.assertFalse(caches[alias].has_key('pronto'), alias)
+
+    @override_settings(PROXIES_CONFIAVEIS=['10.0.0.1'])
+    def test_motivo_da_falha_so_para_acessos_internos(self):
+        erro = RuntimeError('unable to open database file /srv/app/.cache')
+        with mock.patch.object(caches['default'], 'has_key', side_effect=erro):
+            with self.assertLogs('meu_novo_amigo_pet.views', 'WARNING'):
+                externo = self.client.get('/ready', REMOTE_ADDR='203.0.113.5')
+            with self.assertLogs('meu_novo_amigo_pet.views', 'WARNING'):
+                interno = self.client.get('/ready', REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(externo.status_code, 503)
+        self.assertEqual(externo.json()['verificacoes']['cache:default'], 'falhou')
+        self.assertNotIn(b'/srv/app', externo.content)
+        self.assertIn('/srv/app', interno.json()['verificacoes']['cache:default'])
+
+    def test_loopback_sem_proxy_configurado_nao_e_interno(self):
+        # Atrás de um proxy local não configurado todo mundo chega por 127.0.0.1
+        with mock.patch.object(caches['default'], 'has_key', side_effect=RuntimeError('/srv/app')):
+            with self.assertLogs('meu_novo_amigo_pet.views', 'WARNING'):
+                resposta = self.client.get('/ready', REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(resposta.json()['verificacoes']['cache:default'], 'falhou')
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='127.0.0.1').status_code, 403)
+        with override_settings(PROXIES_CONFIAVEIS=['127.0.0.1']):
+            self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='127.0.0.1').status_code, 200)
+            encaminhada = self.client.get('/metrics', REMOTE_ADDR='127.0.0.1', HTTP_X_FORWARDED_FOR='203.0.113.5')
+            self.assertEqual(encaminhada.status_code, 403)
@@ -14,13 +14,18 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
-from django.conf.urls.static import static
+
+from .views import metricas_view, pronto_view, servir_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metricas_view, name='metricas'),
+    path('ready', pronto_view, name='pronto'),
     path('', include('pets.urls')),
     path('accounts/', include('accounts.urls')),
     path('chat/', include('chat_ai.urls')),
@@ -28,4 +33,10 @@ urlpatterns = [
 
 # Servir arquivos de mídia durante o desenvolvimento
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns += [
+        re_path(
+            r'^%s(?P<path>.*)$' % re.escape(settings.MEDIA_URL.lstrip('/')),
+            servir_media,
+            {'document_root': settings.MEDIA_ROOT},
+        ),
+    ]
@@ -0,0 +1,86 @@
+import logging
+import re
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connections
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.utils.cache import add_never_cache_headers, patch_cache_control
+from django.views.static import serve
+
+from . import metricas
+from .middleware import ip_cliente
+
+# Arquivos com hash do conteúdo no nome (ver pets.models.caminho_foto_pet),
+# inclusive com o sufixo que o storage acrescenta quando o nome já existe
+ARQUIVO_COM_HASH = re.compile(r'(^|/)[0-9a-f]{20}(_[A-Za-z0-9]{7})?\.[a-z0-9]+$')
+
+UM_ANO = 60 * 60 * 24 * 365
+
+logger = logging.getLogger(__name__)
+
+
+def servir_media(request, path, document_root=None):
+    """
+    Serve os uploads durante o desenvolvimento com cabeçalhos de cache.
+
+    Arquivos com hash no nome nunca mudam de conteúdo e podem ficar um ano no
+    cache do navegador; os demais são revalidados via Last-Modified.
+    """
+    response = serve(request, path, document_root=document_root)
+    if ARQUIVO_COM_HASH.search(path):
+        patch_cache_control(response, public=True, max_age=UM_ANO, immutable=True)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+def _acesso_interno(request):
+    """
+    Prometheus e outros IPs de METRICAS_IPS_PERMITIDOS, ou usuários da
+    equipe. Com o IP do cliente desconhecido (ver ip_cliente), só a equipe.
+    """
+    ip = ip_cliente(request)
+    return (ip is not None and ip in settings.METRICAS_IPS_PERMITIDOS) or request.user.is_staff
+
+
+def metricas_view(request):
+    """Métricas de todos os workers no formato de texto do Prometheus"""
+    if not _acesso_interno(request):
+        return HttpResponseForbidden()
+    response = HttpResponse(metricas.exportar(), content_type='text/plain; version=0.0.4; charset=utf-8')
+    add_never_cache_headers(response)
+    return response
+
+
+def pronto_view(request):
+    """
+    Prova de prontidão: responde 200 se todos os bancos e caches
+    responderem, ou 503 com o que falhou.
+
+    A prova só lê (o endpoint é público e não pode gerar escritas), e o
+    motivo das falhas só aparece para os acessos internos; os demais
+    recebem ok/falhou de cada verificação.
+    """
+    verificacoes = {}
+    for alias in connections:
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute('SELECT 1')
+            verificacoes[f'banco:{alias}'] = 'ok'
+        except DatabaseError as erro:
+            verificacoes[f'banco:{alias}'] = str(erro)
+    for alias in settings.CACHES:
+        try:
+            caches[alias].has_key('pronto')
+            verificacoes[f'cache:{alias}'] = 'ok'
+        except Exception as erro:
+            verificacoes[f'cache:{alias}'] = str(erro)
+    pronto = all(valor == 'ok' for valor in verificacoes.values())
+    if not pronto:
+        logger.warning('Prova de prontidão falhou: %s', verificacoes)
+    if not _acesso_interno(request):
+        verificacoes = {nome: 'ok' if valor == 'ok' else 'falhou' for nome, valor in verificacoes.items()}
+    response = JsonResponse({'pronto': pronto, 'verificacoes': verificacoes}, status=200 if pronto else 503)
+    add_never_cache_headers(response)
+    return response
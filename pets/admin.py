@@ -1,6 +1,144 @@
-from django.contrib import admin
-from django.utils.html import format_html
-from .models import Pet, FotoPet, CandidaturaAdocao
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.core.cache import cache
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils import timezone
+from django.utils.functional import cached_property
+from django.utils.html import format_html, format_html_join
+from . import cidades, estatisticas
+from .cache import incrementar_geracao_catalogo, resumo
+from .duplicatas import duplicatas_por_pet
+from .models import (
+    Pet, PetPendente, FotoPet, CandidaturaAdocao, BuscaSalva, AlertaBuscaSalva,
+    PetArquivado, FotoPetArquivada, CandidaturaArquivada,
+)
+from .tarefas import atualizar_semelhantes, notificar_buscas_salvas
+
+# Por quanto tempo a contagem de resultados do changelist é reaproveitada
+CONTAGEM_TIMEOUT = 5 * 60
+REVISAO_TAMANHO_PADRAO = 20
+REVISAO_TAMANHO_MAXIMO = 100
+
+
+class PaginadorContagemEstimada(Paginator):
+    """
+    Paginator que guarda a contagem no cache por alguns minutos.
+
+    O número de páginas fica aproximado enquanto a fila muda, mas o
+    changelist deixa de rodar um COUNT(*) a cada carregamento.
+    """
+    
+    @cached_property
+    def count(self):
+        chave = f'admin:contagem:{resumo(str(self.object_list.query))}'
+        total = cache.get(chave)
+        if total is None:
+            total = self.object_list.count()
+            cache.set(chave, total, CONTAGEM_TIMEOUT)
+        return total
+
+
+class ModeracaoActionForm(ActionForm):
+    """Formulário das ações do admin com o motivo usado na rejeição"""
+    motivo_rejeicao = forms.CharField(
+        required=False,
+        label="Motivo da rejeição",
+        widget=forms.TextInput(attrs={'size': 40})
+    )
+
+
+def aprovar_pets(queryset):
+    """Aprova os pets do queryset com um único UPDATE"""
+    pet_ids = list(queryset.exclude(status_anuncio='Aprovado').values_list('id', flat=True))
+    agora = timezone.now()
+    total = Pet.objects.filter(pk__in=pet_ids).exclude(status_anuncio='Aprovado').update(
+        status_anuncio='Aprovado',
+        motivo_rejeicao=None,
+        data_atualizacao=agora,
+        data_aprovacao=agora,
+    )
+    if total:
+        # update() não dispara o post_save que invalida o catálogo e avisa
+        # as buscas salvas
+        incrementar_geracao_catalogo()
+        cidades.descartar()
+        notificar_buscas_salvas.enfileirar(pet_ids)
+        atualizar_semelhantes.enfileirar(pet_ids)
+        estatisticas.registrar_pets(Pet.objects.filter(pk__in=pet_ids).only('estado', 'especie'), aprovados=True)
+    return total
+
+
+def rejeitar_pets(queryset, motivo):
+    """Rejeita os pets do queryset com um único UPDATE"""
+    pet_ids = list(queryset.exclude(status_anuncio='Rejeitado').values_list('id', flat=True))
+    total = Pet.objects.filter(pk__in=pet_ids).exclude(status_anuncio='Rejeitado').update(
+        status_anuncio='Rejeitado',
+        motivo_rejeicao=motivo or None,
+        data_atualizacao=timezone.now(),
+        data_aprovacao=None,
+    )
+    if total:
+        incrementar_geracao_catalogo()
+        cidades.descartar()
+        atualizar_semelhantes.enfileirar(pet_ids)
+    return total
+
+
+def links_duplicatas(duplicatas):
+    """Links para os pets com fotos quase idênticas ({pet_id: fotos em comum})"""
+    if not duplicatas:
+        return '-'
+    return format_html_join(
+        ', ',
+        '<a href="{}">#{}</a> ({} foto(s))',
+        (
+            (reverse('admin:pets_pet_change', args=[pet_id]), pet_id, quantidade)
+            for pet_id, quantidade in sorted(duplicatas.items())
+        ),
+    )
+
+
+class CandidaturasFilter(admin.SimpleListFilter):
+    """Filtro pelos contadores desnormalizados, sem JOIN com candidatura_adocao"""
+    title = 'candidaturas'
+    parameter_name = 'candidaturas'
+    
+    def lookups(self, request, model_admin):
+        return [
+            ('nao_lidas', 'Com não lidas'),
+            ('com', 'Com candidaturas'),
+            ('sem', 'Sem candidaturas'),
+        ]
+    
+    def queryset(self, request, queryset):
+        if self.value() == 'nao_lidas':
+            return queryset.filter(num_candidaturas_nao_lidas__gt=0)
+        if self.value() == 'com':
+            return queryset.filter(num_candidaturas__gt=0)
+        if self.value() == 'sem':
+            return queryset.filter(num_candidaturas=0)
+        return queryset
+
+
+class FotosFilter(admin.SimpleListFilter):
+    title = 'fotos'
+    parameter_name = 'fotos'
+    
+    def lookups(self, request, model_admin):
+        return [('com', 'Com fotos'), ('sem', 'Sem fotos')]
+    
+    def queryset(self, request, queryset):
+        if self.value() == 'com':
+            return queryset.filter(num_fotos__gt=0)
+        if self.value() == 'sem':
+            return queryset.filter(num_fotos=0)
+        return queryset
 
 
 class FotoPetInline(admin.TabularInline):
@@ -14,12 +152,18 @@ class FotoPetInline(admin.TabularInline):
 class PetAdmin(admin.ModelAdmin):
     """Admin para o modelo Pet"""
     
-    list_display = ('nome', 'especie', 'porte', 'sexo', 'cidade', 'estado', 'status_anuncio', 'status_adocao', 'doador', 'data_cadastro')
-    list_filter = ('especie', 'porte', 'sexo', 'status_anuncio', 'status_adocao', 'estado', 'data_cadastro')
+    list_display = ('nome', 'especie', 'porte', 'sexo', 'cidade', 'estado', 'status_anuncio', 'status_adocao', 'doador', 'num_fotos', 'num_candidaturas', 'data_cadastro')
+    list_filter = ('especie', 'porte', 'sexo', 'status_anuncio', 'status_adocao', 'estado', CandidaturasFilter, FotosFilter)
+    list_select_related = ('doador',)
     search_fields = ('nome', 'cidade', 'doador__nome', 'doador__email')
-    list_editable = ('status_anuncio', 'status_adocao')
+    autocomplete_fields = ('doador',)
     ordering = ('-data_cadastro',)
     
+    paginator = PaginadorContagemEstimada
+    show_full_result_count = False
+    action_form = ModeracaoActionForm
+    actions = ['aprovar_selecionados', 'rejeitar_selecionados']
+    
     fieldsets = (
         ('Informações Básicas', {
             'fields': ('doador', 'nome', 'especie', 'porte', 'sexo', 'idade_meses')
@@ -31,25 +175,126 @@ class PetAdmin(admin.ModelAdmin):
             'fields': ('cidade', 'estado')
         }),
         ('Status', {
-            'fields': ('status_anuncio', 'status_adocao', 'motivo_rejeicao')
+            'fields': ('status_anuncio', 'status_adocao', 'motivo_rejeicao', 'possiveis_duplicatas')
         }),
         ('Metadados', {
-            'fields': ('data_cadastro', 'data_atualizacao'),
+            'fields': (
+                'visualizacoes', 'num_fotos', 'num_candidaturas', 'num_candidaturas_nao_lidas',
+                'data_cadastro', 'data_atualizacao',
+            ),
             'classes': ('collapse',)
         }),
     )
     
-    readonly_fields = ('data_cadastro', 'data_atualizacao')
+    readonly_fields = (
+        'visualizacoes', 'num_fotos', 'num_candidaturas', 'num_candidaturas_nao_lidas',
+        'data_cadastro', 'data_atualizacao', 'possiveis_duplicatas',
+    )
     inlines = [FotoPetInline]
     
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related('doador').prefetch_related('fotos')
-    
     def save_model(self, request, obj, form, change):
         # Se for ONG verificada, aprovar automaticamente
         if obj.doador.is_ong_verificada() and obj.status_anuncio == 'Pendente':
             obj.status_anuncio = 'Aprovado'
         super().save_model(request, obj, form, change)
+    
+    @admin.display(description="Possíveis duplicatas")
+    def possiveis_duplicatas(self, obj):
+        if obj is None or obj.pk is None:
+            return '-'
+        return links_duplicatas(duplicatas_por_pet([obj.pk]).get(obj.pk, {}))
+    
+    @admin.action(description="Aprovar os pets selecionados", permissions=['change'])
+    def aprovar_selecionados(self, request, queryset):
+        total = aprovar_pets(queryset)
+        self.message_user(request, f'{total} pet(s) aprovado(s).')
+    
+    @admin.action(description="Rejeitar os pets selecionados", permissions=['change'])
+    def rejeitar_selecionados(self, request, queryset):
+        motivo = request.POST.get('motivo_rejeicao', '').strip()
+        if not motivo:
+            self.message_user(request, 'Informe o motivo da rejeição.', messages.ERROR)
+            return
+        total = rejeitar_pets(queryset, motivo)
+        self.message_user(request, f'{total} pet(s) rejeitado(s).')
+
+
+@admin.register(PetPendente)
+class PetPendenteAdmin(PetAdmin):
+    """Fila de moderação dos anúncios pendentes"""
+    
+    list_display = ('nome', 'especie', 'porte', 'cidade', 'estado', 'doador', 'num_fotos', 'data_cadastro')
+    list_filter = ('especie', 'porte', 'estado')
+    ordering = ('data_cadastro', 'id')
+    change_list_template = 'admin/pets/petpendente/change_list.html'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def get_urls(self):
+        urls = [
+            path(
+                'revisao/',
+                self.admin_site.admin_view(self.revisao_view),
+                name='pets_petpendente_revisao',
+            ),
+        ]
+        return urls + super().get_urls()
+    
+    def revisao_view(self, request):
+        """Revisão em lote: os próximos N pendentes, navegados pelo teclado"""
+        if not self.has_change_permission(request):
+            raise PermissionDenied
+        
+        try:
+            tamanho = min(int(request.GET.get('n', REVISAO_TAMANHO_PADRAO)), REVISAO_TAMANHO_MAXIMO)
+        except ValueError:
+            tamanho = REVISAO_TAMANHO_PADRAO
+        url_revisao = reverse('admin:pets_petpendente_revisao')
+        
+        if request.method == 'POST':
+            aprovados = request.POST.getlist('aprovar')
+            rejeitados = request.POST.getlist('rejeitar')
+            motivo = request.POST.get('motivo_rejeicao', '').strip()
+            if rejeitados and not motivo:
+                messages.error(request, 'Informe o motivo da rejeição.')
+                return redirect(request.get_full_path())
+            total_aprovados = aprovar_pets(PetPendente.objects.filter(pk__in=aprovados)) if aprovados else 0
+            total_rejeitados = rejeitar_pets(PetPendente.objects.filter(pk__in=rejeitados), motivo) if rejeitados else 0
+            messages.success(
+                request,
+                f'{total_aprovados} pet(s) aprovado(s) e {total_rejeitados} rejeitado(s).'
+            )
+            # Os pulados continuam pendentes; o próximo lote começa depois deles
+            ultimo = request.POST.get('ultimo')
+            if ultimo and ultimo.isdigit():
+                return redirect(f'{url_revisao}?n={tamanho}&apos={ultimo}')
+            return redirect(f'{url_revisao}?n={tamanho}')
+        
+        pets = PetPendente.objects.select_related('doador').prefetch_related('fotos')
+        apos = request.GET.get('apos', '')
+        if apos.isdigit():
+            # Paginação por chave sobre o índice (status_anuncio, data_cadastro)
+            referencia = Pet.objects.filter(pk=apos).values_list('data_cadastro', flat=True).first()
+            if referencia is not None:
+                pets = pets.filter(
+                    Q(data_cadastro__gt=referencia) | Q(data_cadastro=referencia, id__gt=apos)
+                )
+        pets = list(pets.order_by('data_cadastro', 'id')[:tamanho])
+        duplicatas = duplicatas_por_pet([pet.pk for pet in pets])
+        for pet in pets:
+            pet.duplicatas = links_duplicatas(duplicatas[pet.pk]) if pet.pk in duplicatas else None
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Revisão em lote',
+            'pets': pets,
+            'tamanho': tamanho,
+            'apos': apos,
+            'url_revisao': url_revisao,
+        }
+        return TemplateResponse(request, 'admin/pets/petpendente/revisao.html', context)
 
 
 @admin.register(FotoPet)
@@ -95,3 +340,71 @@ class CandidaturaAdocaoAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('pet', 'candidato')
+
+
+@admin.register(BuscaSalva)
+class BuscaSalvaAdmin(admin.ModelAdmin):
+    """Admin para o modelo BuscaSalva"""
+    
+    list_display = ('usuario', 'especie', 'porte', 'sexo', 'faixa_idade', 'cidade', 'estado', 'data_criacao')
+    list_filter = ('especie', 'porte', 'estado')
+    list_select_related = ('usuario',)
+    search_fields = ('usuario__nome', 'usuario__email', 'cidade')
+    autocomplete_fields = ('usuario',)
+    readonly_fields = ('chave', 'data_criacao')
+    show_full_result_count = False
+
+
+@admin.register(AlertaBuscaSalva)
+class AlertaBuscaSalvaAdmin(admin.ModelAdmin):
+    """Admin para o modelo AlertaBuscaSalva"""
+    
+    list_display = ('pet', 'usuario', 'busca', 'lido', 'data_criacao')
+    list_filter = ('lido',)
+    list_select_related = ('pet', 'usuario', 'busca__usuario')
+    search_fields = ('usuario__nome', 'usuario__email', 'pet__nome')
+    raw_id_fields = ('usuario', 'busca', 'pet')
+    show_full_result_count = False
+
+
+class SomenteLeituraAdmin(admin.ModelAdmin):
+    """Registros do arquivo só são consultados; quem os grava é o arquivar_pets"""
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class FotoPetArquivadaInline(admin.TabularInline):
+    model = FotoPetArquivada
+    fields = ('imagem', 'descricao', 'ordem', 'data_upload')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+
+@admin.register(PetArquivado)
+class PetArquivadoAdmin(SomenteLeituraAdmin):
+    """Admin para o modelo PetArquivado"""
+    
+    list_display = ('nome', 'especie', 'doador', 'cidade', 'estado', 'status_anuncio', 'status_adocao', 'data_arquivamento')
+    list_filter = ('status_anuncio', 'status_adocao', 'especie')
+    list_select_related = ('doador',)
+    search_fields = ('nome', 'doador__nome', 'doador__email', 'cidade')
+    ordering = ('-data_arquivamento',)
+    inlines = [FotoPetArquivadaInline]
+    show_full_result_count = False
+
+
+@admin.register(CandidaturaArquivada)
+class CandidaturaArquivadaAdmin(SomenteLeituraAdmin):
+    """Admin para o modelo CandidaturaArquivada"""
+    
+    list_display = ('pet', 'candidato', 'status', 'data_envio')
+    list_filter = ('status',)
+    list_select_related = ('pet', 'candidato')
+    search_fields = ('pet__nome', 'candidato__nome', 'candidato__email')
+    ordering = ('-data_envio',)
+    show_full_result_count = False
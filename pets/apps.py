@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+
+
+class PetsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'pets'
+
+    def ready(self):
+        from meu_novo_amigo_pet import metricas
+        from meu_novo_amigo_pet.identidade import instalar_descritores
+        from . import signals  # noqa: F401
+        from .cache import publicar_metricas
+        instalar_descritores()
+        metricas.registrar_coletor(publicar_metricas)
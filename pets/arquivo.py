@@ -0,0 +1,99 @@
+"""
+Arquivamento de pets adotados ou rejeitados.
+
+Pets com status_adocao 'Adotado' ou status_anuncio 'Rejeitado' sem
+alterações há ARQUIVAR_PETS_APOS_DIAS são copiados, com fotos e
+candidaturas, para as tabelas de arquivo (PetArquivado, FotoPetArquivada,
+CandidaturaArquivada) com os mesmos ids e removidos das tabelas ativas.
+Cada lote é copiado e removido na mesma transação.
+
+A remoção é feita sem os sinais de delete: um pet arquivado não está no
+catálogo nem no índice de cidades, e os contadores das linhas removidas
+vão junto para o arquivo. Os arquivos das fotos ficam onde estão.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .cache import incrementar_geracao_catalogo
+from .models import (
+    Pet, FotoPet, CandidaturaAdocao, AlertaBuscaSalva,
+    PetArquivado, FotoPetArquivada, CandidaturaArquivada,
+)
+
+TAMANHO_LOTE = 500
+
+
+def dias_para_arquivar():
+    return getattr(settings, 'ARQUIVAR_PETS_APOS_DIAS', 90)
+
+
+def arquivaveis(dias=None):
+    """Pets adotados ou rejeitados sem alterações há mais de `dias` dias"""
+    limite = timezone.now() - timedelta(days=dias_para_arquivar() if dias is None else dias)
+    return Pet.objects.filter(
+        Q(status_adocao='Adotado') | Q(status_anuncio='Rejeitado'),
+        data_atualizacao__lt=limite,
+    )
+
+
+def _copias(modelo_arquivo, linhas):
+    """Instâncias de modelo_arquivo com os campos em comum das linhas (dicts)"""
+    campos = [campo.attname for campo in modelo_arquivo._meta.concrete_fields]
+    return [
+        modelo_arquivo(**{campo: linha[campo] for campo in campos if campo in linha})
+        for linha in linhas
+    ]
+
+
+def _remover(queryset):
+    # Sem coletar as linhas nem disparar os sinais de delete, que fariam um
+    # UPDATE no pet para cada foto e candidatura removida
+    return queryset._raw_delete(queryset.db)
+
+
+def arquivar_lote(pet_ids, dias=None):
+    """Copia os pets, fotos e candidaturas para o arquivo e remove dos ativos"""
+    with transaction.atomic():
+        # Confere de novo dentro da transação: o pet pode ter mudado
+        pets = list(arquivaveis(dias).filter(pk__in=pet_ids).order_by().values())
+        ids = [pet['id'] for pet in pets]
+        if not ids:
+            return 0
+        PetArquivado.objects.bulk_create(_copias(PetArquivado, pets))
+        FotoPetArquivada.objects.bulk_create(
+            _copias(FotoPetArquivada, FotoPet.objects.filter(pet_id__in=ids).order_by().values())
+        )
+        CandidaturaArquivada.objects.bulk_create(
+            _copias(CandidaturaArquivada, CandidaturaAdocao.objects.filter(pet_id__in=ids).order_by().values())
+        )
+        _remover(AlertaBuscaSalva.objects.filter(pet_id__in=ids))
+        _remover(CandidaturaAdocao.objects.filter(pet_id__in=ids))
+        _remover(FotoPet.objects.filter(pet_id__in=ids))
+        _remover(Pet.objects.filter(pk__in=ids))
+    return len(ids)
+
+
+def arquivar_pets(dias=None, tamanho_lote=TAMANHO_LOTE, limite=None):
+    """
+    Arquiva em lotes os pets elegíveis, em ordem de id.
+
+    Devolve a quantidade de pets arquivados; limite interrompe depois de
+    arquivar aproximadamente essa quantidade.
+    """
+    candidatos = arquivaveis(dias).order_by('id').values_list('id', flat=True)
+    total = 0
+    ultimo_id = 0
+    while limite is None or total < limite:
+        lote = list(candidatos.filter(id__gt=ultimo_id)[:tamanho_lote])
+        if not lote:
+            break
+        total += arquivar_lote(lote, dias)
+        ultimo_id = lote[-1]
+    if total:
+        # Os pets arquivados deixam de existir para as páginas públicas
+        incrementar_geracao_catalogo()
+    return total
@@ -0,0 +1,318 @@
+"""
+Cache de fragmentos dos cards de pets e de páginas inteiras do catálogo.
+
+Cada card é guardado com uma chave que inclui o id do pet e o
+data_atualizacao, então qualquer save do Pet gera uma chave nova. Alterações
+que não passam pelo save do Pet (fotos, verificação do doador) atualizam o
+data_atualizacao nos signals de pets/signals.py.
+
+As páginas públicas (início e busca) para visitantes anônimos são guardadas
+com uma chave que inclui a geração do catálogo; incrementar a geração
+invalida todas de uma vez. A geração, o momento da última alteração, as
+páginas e a trava de recálculo ficam no cache compartilhado entre os
+processos (CATALOGO_CACHE_ALIAS): uma alteração feita em qualquer worker ou
+no runworker vale para todos.
+
+Para as páginas públicas também há GET condicional (ETag/Last-Modified),
+calculado antes de a view rodar. Na busca e no início os validadores vêm da
+geração do catálogo e do momento em que ela mudou pela última vez (uma
+leitura do cache, sem SQL), então mudam junto com a chave das páginas.
+"""
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models import prefetch_related_objects
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import patch_cache_control
+from django.utils.safestring import mark_safe
+from django.views.decorators.http import condition
+
+from meu_novo_amigo_pet import metricas
+
+CARD_TIMEOUT = 60 * 60 * 24
+
+PAGINA_TIMEOUT = 60 * 5
+# Tempo máximo que uma requisição espera outra recalcular a mesma página
+PAGINA_ESPERA_SEGUNDOS = 2.0
+CHAVE_GERACAO = 'pets:catalogo:geracao'
+# Momento (time.time()) do último incremento da geração
+CHAVE_ALTERACAO = 'pets:catalogo:alterado'
+
+TEMPLATES_CARD = {
+    'grade': 'pets/_card_grade.html',
+    'lista': 'pets/_card_lista.html',
+}
+
+_lock = threading.Lock()
+_estatisticas = {'acertos': 0, 'faltas': 0, 'tempo_render_ms': 0.0}
+
+
+def chave_card(pet, variante):
+    """Chave do card do pet para a variante (grade ou lista)"""
+    versao = int(pet.data_atualizacao.timestamp() * 1_000_000)
+    return f'pets:card:{variante}:{pet.pk}:{versao}'
+
+
+def renderizar_cards(pets, variantes=('grade',)):
+    """
+    Retorna {variante: [html, ...]} na mesma ordem de pets.
+
+    Busca todos os cards com um único get_many; só os que faltarem são
+    renderizados (com as fotos carregadas numa única query) e gravados de volta
+    com set_many.
+    """
+    pets = list(pets)
+    chaves = {
+        (pet.pk, variante): chave_card(pet, variante)
+        for pet in pets
+        for variante in variantes
+    }
+    encontrados = cache.get_many(chaves.values())
+
+    faltando = [
+        pet for pet in pets
+        if any(chaves[(pet.pk, variante)] not in encontrados for variante in variantes)
+    ]
+    novos = {}
+    tempo_render_ms = 0.0
+    if faltando:
+        inicio = time.perf_counter()
+        prefetch_related_objects(faltando, 'fotos')
+        for pet in faltando:
+            for variante in variantes:
+                chave = chaves[(pet.pk, variante)]
+                if chave not in encontrados:
+                    novos[chave] = render_to_string(TEMPLATES_CARD[variante], {'pet': pet})
+        cache.set_many(novos, CARD_TIMEOUT)
+        encontrados.update(novos)
+        tempo_render_ms = (time.perf_counter() - inicio) * 1000
+
+    with _lock:
+        _estatisticas['acertos'] += len(chaves) - len(novos)
+        _estatisticas['faltas'] += len(novos)
+        _estatisticas['tempo_render_ms'] += tempo_render_ms
+
+    return {
+        variante: [mark_safe(encontrados[chaves[(pet.pk, variante)]]) for pet in pets]
+        for variante in variantes
+    }
+
+
+def estatisticas_cards():
+    """Taxa de acerto do cache de cards e tempo de renderização economizado"""
+    with _lock:
+        acertos = _estatisticas['acertos']
+        faltas = _estatisticas['faltas']
+        tempo_render_ms = _estatisticas['tempo_render_ms']
+    total = acertos + faltas
+    tempo_medio_ms = tempo_render_ms / faltas if faltas else 0.0
+    return {
+        'acertos': acertos,
+        'faltas': faltas,
+        'taxa_acerto': acertos / total if total else 0.0,
+        'tempo_medio_render_ms': tempo_medio_ms,
+        'economia_estimada_ms': acertos * tempo_medio_ms,
+    }
+
+
+cards_cache = metricas.contador(
+    'cache_cards_total', 'Cards de pets lidos do cache (acerto) ou renderizados (falta)', ('resultado',),
+)
+cards_render = metricas.contador(
+    'cache_cards_render_segundos_total', 'Tempo gasto renderizando cards que não estavam no cache',
+)
+
+
+def publicar_metricas():
+    """Coletor de métricas (ver metricas.py) com os totais do cache de cards"""
+    with _lock:
+        estatisticas = dict(_estatisticas)
+    cards_cache.definir(estatisticas['acertos'], resultado='acerto')
+    cards_cache.definir(estatisticas['faltas'], resultado='falta')
+    cards_render.definir(estatisticas['tempo_render_ms'] / 1000)
+
+
+def cache_catalogo():
+    """Cache compartilhado com a geração do catálogo e as páginas públicas"""
+    return caches[getattr(settings, 'CATALOGO_CACHE_ALIAS', 'compartilhado')]
+
+
+def catalogo_compartilhado():
+    """
+    Se a geração do catálogo é vista por todos os processos; num cache local
+    (LocMemCache) alterações feitas em outro worker não a mudariam.
+    """
+    return not isinstance(cache_catalogo(), LocMemCache)
+
+
+def geracao_catalogo():
+    """Número da geração atual do catálogo público"""
+    cache = cache_catalogo()
+    geracao = cache.get(CHAVE_GERACAO)
+    if geracao is None:
+        # Baseado no relógio para não reaproveitar páginas de uma geração
+        # anterior caso o contador seja descartado do cache.
+        geracao = int(time.time() * 1000)
+        if not cache.add(CHAVE_GERACAO, geracao, None):
+            geracao = cache.get(CHAVE_GERACAO, geracao)
+    return geracao
+
+
+def incrementar_geracao_catalogo():
+    """Invalida todas as páginas do catálogo em cache"""
+    cache = cache_catalogo()
+    try:
+        cache.incr(CHAVE_GERACAO)
+    except ValueError:
+        cache.set(CHAVE_GERACAO, int(time.time() * 1000), None)
+    cache.set(CHAVE_ALTERACAO, time.time(), None)
+
+
+def estado_catalogo():
+    """(geração, datetime da última alteração) do catálogo com um único get_many"""
+    cache = cache_catalogo()
+    valores = cache.get_many([CHAVE_GERACAO, CHAVE_ALTERACAO])
+    geracao = valores.get(CHAVE_GERACAO)
+    if geracao is None:
+        geracao = geracao_catalogo()
+    alterado = valores.get(CHAVE_ALTERACAO)
+    if alterado is None:
+        # Momento desconhecido: agora é posterior a qualquer Last-Modified
+        # já enviado, então nenhum cliente recebe um 304 indevido
+        alterado = time.time()
+        if not cache.add(CHAVE_ALTERACAO, alterado, None):
+            alterado = cache.get(CHAVE_ALTERACAO, alterado)
+    return geracao, datetime.fromtimestamp(alterado, timezone.utc)
+
+
+def resumo(*partes):
+    """Hash curto e estável de um conjunto de valores"""
+    return hashlib.md5(repr(partes).encode()).hexdigest()
+
+
+def parametros_normalizados(request):
+    """Parâmetros da query string ordenados e sem valores vazios"""
+    return sorted(
+        (nome, valor)
+        for nome, valores in request.GET.lists()
+        for valor in valores
+        if valor
+    )
+
+
+def chave_pagina(request):
+    """Chave da página: caminho + parâmetros normalizados + geração do catálogo"""
+    return (
+        f'pets:pagina:{geracao_catalogo()}:{request.path}:'
+        f'{resumo(parametros_normalizados(request))}'
+    )
+
+
+def requisicao_publica(request):
+    """Se a resposta é a mesma para qualquer visitante anônimo"""
+    if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+        return False
+    # Mensagens pendentes (ex.: "Você saiu") não podem ir para o cache
+    return not len(messages.get_messages(request))
+
+
+def _resposta_cacheavel(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+    )
+
+
+def _resposta_do_cache(conteudo, content_type, origem):
+    response = HttpResponse(conteudo, content_type=content_type)
+    response['X-Cache'] = origem
+    return response
+
+
+def cache_pagina_anonima(timeout=PAGINA_TIMEOUT):
+    """
+    Guarda a página inteira para visitantes anônimos.
+
+    Usuários logados e requisições que não sejam GET/HEAD passam direto. Quando
+    a página não está em cache, só uma requisição por vez a recalcula (trava
+    com cache.add); as demais esperam até PAGINA_ESPERA_SEGUNDOS pelo
+    resultado antes de recalcular por conta própria.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if not requisicao_publica(request):
+                return view_func(request, *args, **kwargs)
+
+            cache = cache_catalogo()
+            chave = chave_pagina(request)
+            guardado = cache.get(chave)
+            if guardado is not None:
+                return _resposta_do_cache(*guardado, 'HIT')
+
+            trava = f'{chave}:trava'
+            if not cache.add(trava, 1, int(PAGINA_ESPERA_SEGUNDOS * 5)):
+                limite = time.monotonic() + PAGINA_ESPERA_SEGUNDOS
+                while time.monotonic() < limite:
+                    time.sleep(0.05)
+                    guardado = cache.get(chave)
+                    if guardado is not None:
+                        return _resposta_do_cache(*guardado, 'HIT')
+                return view_func(request, *args, **kwargs)
+
+            try:
+                response = view_func(request, *args, **kwargs)
+                if hasattr(response, 'render') and callable(response.render):
+                    response = response.render()
+                if _resposta_cacheavel(request, response):
+                    cache.set(chave, (response.content, response['Content-Type']), timeout)
+                    response['X-Cache'] = 'MISS'
+            finally:
+                cache.delete(trava)
+            return response
+        return _wrapped_view
+    return decorator
+
+
+def condicional_publico(calcular):
+    """
+    GET condicional para visitantes anônimos.
+
+    calcular(request, *args, **kwargs) devolve (etag, last_modified) a partir
+    da geração do catálogo ou de colunas indexadas; é chamado uma vez por
+    requisição e antes da view (e do cache de página), então um 304 não
+    executa as queries pesadas nem renderiza o template.
+    """
+    def validadores(request, *args, **kwargs):
+        if not hasattr(request, '_validadores_condicionais'):
+            request._validadores_condicionais = (
+                calcular(request, *args, **kwargs)
+                if requisicao_publica(request) else (None, None)
+            )
+        return request._validadores_condicionais
+
+    def decorator(view_func):
+        condicional = condition(
+            etag_func=lambda request, *args, **kwargs: validadores(request, *args, **kwargs)[0],
+            last_modified_func=lambda request, *args, **kwargs: validadores(request, *args, **kwargs)[1],
+        )(view_func)
+
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            response = condicional(request, *args, **kwargs)
+            if validadores(request, *args, **kwargs)[0] is not None:
+                # O navegador pode guardar, mas precisa revalidar a cada visita
+                patch_cache_control(response, public=True, no_cache=True)
+            return response
+        return _wrapped_view
+    return decorator
@@ -0,0 +1,147 @@
+"""
+Índice em memória das cidades dos pets disponíveis, para o autocompletar.
+
+As cidades são agrupadas pela forma "dobrada" do nome (sem acentos, em
+minúsculas e com espaços normalizados), então "São Paulo", "sao paulo" e
+"Sao  Paulo" contam como a mesma cidade e a grafia mais usada é a sugerida.
+As chaves ficam em listas ordenadas de (chave, estado), uma por estado e
+uma geral; a busca por prefixo é um par de bisect seguido de um nsmallest
+pela quantidade de pets, sem consultar o banco.
+
+O índice é montado com uma consulta agrupada na primeira busca e ajustado
+pelos sinais de Pet a cada pet salvo ou removido neste processo. Mudanças
+feitas por outros processos ou por UPDATEs em lote (moderação no admin,
+importação) entram na reconstrução completa feita a cada
+CIDADES_RECONSTRUIR_SEGUNDOS.
+"""
+import heapq
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import Count
+
+LIMITE_PADRAO = 8
+LIMITE_MAXIMO = 20
+
+# Todos os estados; as chaves das listas por estado são as siglas
+TODOS = ''
+
+
+def intervalo_reconstrucao():
+    return getattr(settings, 'CIDADES_RECONSTRUIR_SEGUNDOS', 10 * 60)
+
+
+def dobrar(texto):
+    """Forma de comparação do nome: sem acentos, minúscula e com espaços simples"""
+    decomposto = unicodedata.normalize('NFKD', texto or '')
+    sem_acentos = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return ' '.join(sem_acentos.casefold().split())
+
+
+class IndiceCidades:
+    """Cidades por estado com a contagem de pets de cada grafia"""
+
+    def __init__(self):
+        # (chave, estado) -> Counter({grafia: pets})
+        self.grafias = {}
+        # estado (ou TODOS) -> lista ordenada de (chave, estado)
+        self.ordenadas = {TODOS: []}
+        self._lock = threading.Lock()
+
+    def ajustar(self, cidade, estado, quantidade):
+        """Soma quantidade (pode ser negativa) aos pets da cidade"""
+        chave = dobrar(cidade)
+        if not chave or not estado or not quantidade:
+            return
+        item = (chave, estado)
+        with self._lock:
+            grafias = self.grafias.get(item)
+            if grafias is None:
+                if quantidade < 0:
+                    return
+                grafias = self.grafias[item] = Counter()
+                insort(self.ordenadas[TODOS], item)
+                insort(self.ordenadas.setdefault(estado, []), item)
+            grafia = ' '.join(cidade.split())
+            grafias[grafia] += quantidade
+            if grafias[grafia] <= 0:
+                del grafias[grafia]
+            if grafias:
+                return
+            del self.grafias[item]
+            for lista in (self.ordenadas[TODOS], self.ordenadas[estado]):
+                del lista[bisect_left(lista, item)]
+
+    def _total(self, item):
+        grafias = self.grafias.get(item)
+        return grafias.total() if grafias else 0
+
+    def sugerir(self, prefixo, estado=TODOS, limite=LIMITE_PADRAO):
+        """Cidades que começam com o prefixo, das com mais pets para as com menos"""
+        chave = dobrar(prefixo)
+        lista = self.ordenadas.get(estado or TODOS, [])
+        inicio = bisect_left(lista, (chave,))
+        fim = bisect_left(lista, (chave + '\U0010ffff',))
+        # Mais pets primeiro; empates em ordem alfabética
+        melhores = heapq.nsmallest(limite, lista[inicio:fim], key=lambda item: (-self._total(item), item))
+        resultado = []
+        for item in melhores:
+            grafias = self.grafias.get(item)
+            if grafias:
+                resultado.append({
+                    'cidade': grafias.most_common(1)[0][0],
+                    'estado': item[1],
+                    'pets': grafias.total(),
+                })
+        return resultado
+
+    def grafia_preferida(self, cidade, estado):
+        """Grafia mais usada da cidade no estado, ou None se ela não estiver no índice"""
+        grafias = self.grafias.get((dobrar(cidade), estado))
+        return grafias.most_common(1)[0][0] if grafias else None
+
+
+_indice = None
+_construido_em = 0.0
+_lock_construcao = threading.Lock()
+
+
+def construir():
+    """Monta um índice novo com uma consulta agrupada por cidade e estado"""
+    from .models import Pet
+
+    indice = IndiceCidades()
+    linhas = (
+        Pet.objects.filter(status_anuncio='Aprovado', status_adocao='Disponível')
+        .order_by().values_list('cidade', 'estado').annotate(total=Count('id'))
+    )
+    for cidade, estado, total in linhas:
+        indice.ajustar(cidade, estado, total)
+    return indice
+
+
+def obter_indice():
+    """Índice atual, reconstruído se tiver mais de CIDADES_RECONSTRUIR_SEGUNDOS"""
+    global _indice, _construido_em
+    if _indice is None or time.monotonic() - _construido_em > intervalo_reconstrucao():
+        with _lock_construcao:
+            if _indice is None or time.monotonic() - _construido_em > intervalo_reconstrucao():
+                _indice = construir()
+                _construido_em = time.monotonic()
+    return _indice
+
+
+def ajustar(cidade, estado, quantidade):
+    """Ajuste incremental; sem efeito enquanto o índice não foi montado"""
+    if _indice is not None:
+        _indice.ajustar(cidade, estado, quantidade)
+
+
+def descartar():
+    """Força a reconstrução na próxima busca"""
+    global _indice
+    _indice = None
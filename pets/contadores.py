@@ -0,0 +1,159 @@
+"""
+Contadores de visualizações dos pets.
+
+Cada visualização só incrementa um contador em memória. Uma thread em
+segundo plano grava os totais acumulados a cada
+VISUALIZACOES_INTERVALO_SEGUNDOS, com UPDATEs do tipo
+visualizacoes = visualizacoes + n, agrupando os pets que tiveram o mesmo
+número de visualizações no período. Assim a página de detalhe continua sem
+escritas no banco.
+
+A popularidade usa decaimento "para frente": cada visualização soma
+2 ** ((t - EPOCA) / MEIA_VIDA) ao placar, então visualizações recentes
+valem mais que as antigas sem que os placares precisem ser recalculados.
+Como todos os placares usam a mesma base, a ordenação entre pets é a mesma
+de um placar com decaimento exponencial. Com meia-vida de 7 dias, o float
+comporta cerca de 19 anos a partir da EPOCA.
+
+Os contadores de candidaturas e fotos (Pet.num_*) são mantidos pelos sinais
+em pets/signals.py; recalcular_contadores corrige eventuais divergências
+(ex.: linhas removidas direto no banco).
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone as dt_timezone
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+logger = logging.getLogger(__name__)
+
+EPOCA = datetime(2025, 1, 1, tzinfo=dt_timezone.utc).timestamp()
+MEIA_VIDA_SEGUNDOS = 7 * 24 * 60 * 60
+
+# Janela em que a ordenação por popularidade é considerada a mesma (ETag)
+JANELA_RANKING_SEGUNDOS = 5 * 60
+
+_pendentes = Counter()
+_lock = threading.Lock()
+_thread = None
+_parar = threading.Event()
+
+
+def intervalo_envio():
+    return getattr(settings, 'VISUALIZACOES_INTERVALO_SEGUNDOS', 30)
+
+
+def peso_visualizacao(instante=None):
+    """Peso de uma visualização no placar de popularidade"""
+    instante = time.time() if instante is None else instante
+    return 2 ** ((instante - EPOCA) / MEIA_VIDA_SEGUNDOS)
+
+
+def janela_ranking():
+    """Número da janela atual, para validadores de páginas ordenadas por popularidade"""
+    return int(time.time() // JANELA_RANKING_SEGUNDOS)
+
+
+def registrar_visualizacao(pet_id):
+    """Conta uma visualização do pet (só em memória)"""
+    with _lock:
+        _pendentes[pet_id] += 1
+    _iniciar_thread()
+
+
+def descarregar():
+    """Grava no banco as visualizações acumuladas; devolve quantos pets foram atualizados"""
+    global _pendentes
+    with _lock:
+        lote, _pendentes = _pendentes, Counter()
+    if not lote:
+        return 0
+    
+    from .models import Pet
+    
+    # Pets com o mesmo número de visualizações compartilham o UPDATE
+    por_quantidade = defaultdict(list)
+    for pet_id, quantidade in lote.items():
+        por_quantidade[quantidade].append(pet_id)
+    peso = peso_visualizacao()
+    
+    try:
+        with transaction.atomic(using='default'):
+            for quantidade, pet_ids in por_quantidade.items():
+                Pet.objects.filter(pk__in=pet_ids).update(
+                    visualizacoes=F('visualizacoes') + quantidade,
+                    popularidade=F('popularidade') + quantidade * peso,
+                )
+    except Exception:
+        logger.exception('Falha ao gravar visualizações; serão reenviadas')
+        with _lock:
+            _pendentes.update(lote)
+        return 0
+    return len(lote)
+
+
+def _contagem_por_pet(queryset):
+    """Subconsulta com a contagem de linhas do queryset por pet (0 se não houver)"""
+    return Coalesce(Subquery(
+        queryset.filter(pet=OuterRef('pk')).order_by().values('pet')
+        .annotate(total=Count('pk')).values('total')
+    ), 0)
+
+
+def recalcular_contadores(pet_ids=None, tamanho_lote=500):
+    """
+    Recalcula num_candidaturas, num_candidaturas_nao_lidas e num_fotos a
+    partir das tabelas de origem; devolve quantos pets estavam divergentes.
+    """
+    from .models import CandidaturaAdocao, FotoPet, Pet
+    
+    reais = {
+        'num_candidaturas': _contagem_por_pet(CandidaturaAdocao.objects.all()),
+        'num_candidaturas_nao_lidas': _contagem_por_pet(CandidaturaAdocao.objects.filter(status='Enviada')),
+        'num_fotos': _contagem_por_pet(FotoPet.objects.all()),
+    }
+    pets = Pet.objects.all() if pet_ids is None else Pet.objects.filter(pk__in=pet_ids)
+    divergentes = list(
+        pets.annotate(**{f'{campo}_real': expressao for campo, expressao in reais.items()})
+        .filter(reduce(or_, (~Q(**{campo: F(f'{campo}_real')}) for campo in reais)))
+        .values_list('pk', flat=True)
+    )
+    # O UPDATE recalcula as contagens na hora, então incrementos feitos
+    # depois da verificação também ficam corretos
+    for inicio in range(0, len(divergentes), tamanho_lote):
+        Pet.objects.filter(pk__in=divergentes[inicio:inicio + tamanho_lote]).update(**reais)
+    return len(divergentes)
+
+
+def _loop():
+    while not _parar.wait(intervalo_envio()):
+        descarregar()
+        # A thread tem conexões próprias; não as deixar abertas entre envios
+        connections.close_all()
+
+
+def _iniciar_thread():
+    global _thread
+    if _thread is not None:
+        return
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_loop, name='contadores-visualizacoes', daemon=True)
+            _thread.start()
+
+
+@atexit.register
+def _descarregar_ao_sair():
+    _parar.set()
+    try:
+        descarregar()
+    except Exception:
+        logger.exception('Falha ao gravar visualizações ao encerrar')
@@ -0,0 +1,131 @@
+"""
+Detecção de fotos quase idênticas com hash perceptual (dHash).
+
+O dHash de 64 bits compara o brilho de pixels vizinhos numa miniatura 9x8
+em tons de cinza; recompressões e redimensionamentos mudam poucos bits.
+O hash é gravado em 4 partes de 16 bits, cada uma com índice próprio
+(multi-index hashing): se dois hashes diferem em no máximo 3 bits, pelo
+menos uma das 4 partes é idêntica. A busca consulta as partes pelos
+índices e só confere a distância de Hamming nos candidatos encontrados,
+sem comparar a foto com a tabela inteira.
+"""
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+DHASH_LARGURA = 9
+DHASH_ALTURA = 8
+PARTES = 4
+BITS_POR_PARTE = 64 // PARTES
+
+# Distância máxima (em bits) para considerar duas fotos iguais; precisa ser
+# menor que PARTES para a busca pelos índices não perder candidatos
+DISTANCIA_MAXIMA = 3
+
+CAMPOS_HASH = tuple(f'phash_{parte}' for parte in range(PARTES))
+
+
+def dhash(arquivo):
+    """dHash de 64 bits da imagem, ou None se o arquivo não for uma imagem"""
+    arquivo.seek(0)
+    try:
+        with Image.open(arquivo) as imagem:
+            # Decodificação reduzida do JPEG: bem mais rápida para fotos grandes
+            imagem.draft('L', (DHASH_LARGURA * 8, DHASH_ALTURA * 8))
+            imagem = ImageOps.exif_transpose(imagem).convert('L')
+            miniatura = imagem.resize((DHASH_LARGURA, DHASH_ALTURA), Image.LANCZOS)
+    except (UnidentifiedImageError, OSError, SyntaxError):
+        return None
+    finally:
+        arquivo.seek(0)
+    
+    pixels = list(miniatura.getdata())
+    valor = 0
+    for linha in range(DHASH_ALTURA):
+        inicio = linha * DHASH_LARGURA
+        for coluna in range(DHASH_LARGURA - 1):
+            valor = (valor << 1) | (pixels[inicio + coluna] > pixels[inicio + coluna + 1])
+    return valor
+
+
+def partes_hash(valor):
+    """Divide o hash nas partes gravadas em phash_0..phash_3"""
+    mascara = (1 << BITS_POR_PARTE) - 1
+    return [(valor >> (BITS_POR_PARTE * parte)) & mascara for parte in range(PARTES)]
+
+
+def juntar_partes(partes):
+    valor = 0
+    for parte, conteudo in enumerate(partes):
+        valor |= conteudo << (BITS_POR_PARTE * parte)
+    return valor
+
+
+def distancia(a, b):
+    """Distância de Hamming entre dois hashes"""
+    return bin(a ^ b).count('1')
+
+
+def fotos_semelhantes(hashes, excluir_pets=(), excluir_fotos=()):
+    """
+    Fotos gravadas quase idênticas aos hashes informados.
+
+    Devolve {hash: [(foto_id, pet_id, distancia), ...]}, com uma consulta
+    pelos índices das partes.
+    """
+    from django.db.models import Q
+    from .models import FotoPet
+    
+    # Tabela por parte: valor da parte -> hashes procurados com essa parte
+    tabelas = [{} for _ in CAMPOS_HASH]
+    for valor in set(hashes):
+        if valor is None:
+            continue
+        for parte, conteudo in enumerate(partes_hash(valor)):
+            tabelas[parte].setdefault(conteudo, []).append(valor)
+    if not tabelas[0]:
+        return {}
+    
+    filtro = Q()
+    for campo, tabela in zip(CAMPOS_HASH, tabelas):
+        filtro |= Q(**{f'{campo}__in': list(tabela)})
+    candidatas = FotoPet.objects.filter(filtro).exclude(pet_id__in=excluir_pets).exclude(
+        pk__in=excluir_fotos
+    ).order_by().values_list('id', 'pet_id', *CAMPOS_HASH)
+    
+    resultado = {}
+    for foto_id, pet_id, *partes_candidata in candidatas:
+        valor_candidata = juntar_partes(partes_candidata)
+        # Só os hashes que têm alguma parte igual à da candidata
+        conferidos = set()
+        for tabela, conteudo in zip(tabelas, partes_candidata):
+            conferidos.update(tabela.get(conteudo, ()))
+        for valor in conferidos:
+            bits = distancia(valor, valor_candidata)
+            if bits <= DISTANCIA_MAXIMA:
+                resultado.setdefault(valor, []).append((foto_id, pet_id, bits))
+    return resultado
+
+
+def duplicatas_por_pet(pet_ids):
+    """
+    Outros pets com fotos quase idênticas às dos pets informados.
+
+    Devolve {pet_id: {outro_pet_id: quantidade de fotos em comum}}; anúncios
+    repetidos aparecem aqui mesmo com outro nome ou outro doador.
+    """
+    from .models import FotoPet
+    
+    fotos = {}
+    for pet_id, *partes in FotoPet.objects.filter(
+        pet_id__in=pet_ids, phash_0__isnull=False
+    ).order_by().values_list('pet_id', *CAMPOS_HASH):
+        fotos.setdefault(juntar_partes(partes), set()).add(pet_id)
+    
+    semelhantes = fotos_semelhantes(fotos)
+    resultado = {}
+    for valor, encontradas in semelhantes.items():
+        for pet_id in fotos[valor]:
+            for _, outro_pet_id, _ in encontradas:
+                if outro_pet_id != pet_id:
+                    contagem = resultado.setdefault(pet_id, {})
+                    contagem[outro_pet_id] = contagem.get(outro_pet_id, 0) + 1
+    return resultado
@@ -0,0 +1,258 @@
+"""
+Estatísticas de impacto: cadastros, aprovações, adoções e candidaturas.
+
+Os totais ficam em estatistica_diaria, uma linha por dia, estado e espécie.
+Os sinais somam cada evento na linha do dia quando ele acontece, e as
+páginas de estatísticas só somam linhas dessa tabela: o custo depende do
+período e não da quantidade de pets e candidaturas.
+
+O tempo até a adoção é guardado como um histograma por faixas de dias
+(FAIXAS_DIAS_ADOCAO), que pode ser somado entre dias, estados e espécies;
+a mediana é interpolada dentro da faixa em que cai.
+
+reconstruir() (comando reconstruir_estatisticas) recalcula os dias a partir
+das tabelas de pets e candidaturas, ativas e arquivadas, usando as mesmas
+datas de aprovação e de adoção gravadas no pet que os sinais. A migração
+0013 preenche essas datas nos pets antigos e roda a reconstrução.
+"""
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from datetime import date, datetime, time, timedelta
+
+from django.apps import apps as global_apps
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from .models import (
+    FAIXAS_DIAS_ADOCAO, Pet, CandidaturaAdocao, PetArquivado, CandidaturaArquivada, EstatisticaDiaria,
+)
+
+CAMPOS = ('novos', 'aprovacoes', 'adocoes', 'candidaturas')
+CHAVE_IMPACTO = 'pets:estatisticas:impacto'
+IMPACTO_TIMEOUT = 60 * 10
+TAMANHO_LOTE = 1000
+
+
+def _histograma_vazio():
+    return [0] * (len(FAIXAS_DIAS_ADOCAO) + 1)
+
+
+def faixa_dias(dias):
+    """Índice da faixa do histograma para uma adoção após `dias` dias"""
+    return bisect_left(FAIXAS_DIAS_ADOCAO, dias)
+
+
+def mediana_dias(histograma):
+    """Mediana aproximada, em dias, de um histograma de tempos até a adoção"""
+    total = sum(histograma)
+    if not total:
+        return None
+    metade = total / 2
+    acumulado = 0
+    for indice, quantidade in enumerate(histograma):
+        if quantidade and acumulado + quantidade >= metade:
+            if indice == len(FAIXAS_DIAS_ADOCAO):
+                # Faixa aberta: só se sabe que passou do último limite
+                return float(FAIXAS_DIAS_ADOCAO[-1])
+            inicio = FAIXAS_DIAS_ADOCAO[indice - 1] if indice else 0
+            fim = FAIXAS_DIAS_ADOCAO[indice]
+            return round(inicio + (fim - inicio) * (metade - acumulado) / quantidade, 1)
+        acumulado += quantidade
+    return None
+
+
+def _somar_histogramas(histogramas):
+    resultado = _histograma_vazio()
+    for histograma in histogramas:
+        for indice, quantidade in enumerate(histograma):
+            resultado[indice] += quantidade
+    return resultado
+
+
+def somar(dia, estado, especie, dias_ate_adocao=(), **contadores):
+    """Soma os contadores (novos, aprovacoes, ...) e as adoções à linha do dia"""
+    contadores = {campo: n for campo, n in contadores.items() if n}
+    if not contadores and not dias_ate_adocao:
+        return
+    chave = {'dia': dia, 'estado': estado, 'especie': especie}
+    with transaction.atomic():
+        EstatisticaDiaria.objects.bulk_create(
+            [EstatisticaDiaria(**chave, dias_ate_adocao=_histograma_vazio())],
+            ignore_conflicts=True,
+        )
+        linhas = EstatisticaDiaria.objects.filter(**chave)
+        if not dias_ate_adocao:
+            linhas.update(**{campo: F(campo) + n for campo, n in contadores.items()})
+            return
+        # O histograma é um JSON: lê e grava a linha travada
+        linha = linhas.select_for_update().get()
+        for campo, n in contadores.items():
+            setattr(linha, campo, getattr(linha, campo) + n)
+        for dias in dias_ate_adocao:
+            linha.dias_ate_adocao[faixa_dias(dias)] += 1
+        linha.save()
+
+
+def registrar_pet(pet, novo=False, aprovado=False, adotado=False):
+    """Eventos de um pet salvo (chamado pelos sinais de pets/signals.py)"""
+    somar(
+        timezone.localdate(), pet.estado, pet.especie,
+        novos=int(novo),
+        aprovacoes=int(aprovado),
+        adocoes=int(adotado),
+        dias_ate_adocao=[(pet.data_adocao - pet.data_cadastro).days] if adotado else (),
+    )
+
+
+def registrar_pets(pets, novos=False, aprovados=False):
+    """Pets inseridos ou aprovados em lote, sem passar pelos sinais"""
+    hoje = timezone.localdate()
+    grupos = Counter((pet.estado, pet.especie) for pet in pets)
+    for (estado, especie), total in grupos.items():
+        somar(hoje, estado, especie, novos=total if novos else 0, aprovacoes=total if aprovados else 0)
+
+
+def registrar_candidatura(candidatura):
+    somar(timezone.localdate(), candidatura.pet.estado, candidatura.pet.especie, candidaturas=1)
+
+
+def _inicio_do_dia(dia):
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
+
+def reconstruir(desde=None, apps=global_apps):
+    """
+    Recalcula as linhas a partir de `desde` (date; None = todas) com
+    consultas agrupadas nas tabelas de pets e candidaturas. Devolve a
+    quantidade de linhas gravadas.
+
+    `apps` permite rodar a reconstrução numa migração, com os modelos
+    históricos.
+    """
+    Pet, PetArquivado, CandidaturaAdocao, CandidaturaArquivada, EstatisticaDiaria = (
+        apps.get_model('pets', nome) for nome in
+        ('Pet', 'PetArquivado', 'CandidaturaAdocao', 'CandidaturaArquivada', 'EstatisticaDiaria')
+    )
+    totais = defaultdict(lambda: dict.fromkeys(CAMPOS, 0))
+    histogramas = defaultdict(_histograma_vazio)
+    inicio = None if desde is None else _inicio_do_dia(desde)
+
+    def por_dia(queryset, campo_data, campo_total, estado='estado', especie='especie'):
+        queryset = queryset.order_by()
+        if inicio is not None:
+            queryset = queryset.filter(**{f'{campo_data}__gte': inicio})
+        linhas = (
+            queryset.annotate(dia=TruncDate(campo_data))
+            .values_list('dia', estado, especie)
+            .annotate(total=Count('pk'))
+        )
+        for dia, estado_pet, especie_pet, total in linhas:
+            totais[dia, estado_pet, especie_pet][campo_total] += total
+
+    for modelo in (Pet, PetArquivado):
+        por_dia(modelo.objects.all(), 'data_cadastro', 'novos')
+        por_dia(modelo.objects.filter(data_aprovacao__isnull=False), 'data_aprovacao', 'aprovacoes')
+        adotados = modelo.objects.filter(data_adocao__isnull=False).order_by()
+        if inicio is not None:
+            adotados = adotados.filter(data_adocao__gte=inicio)
+        for cadastro, adocao, estado, especie in adotados.values_list(
+            'data_cadastro', 'data_adocao', 'estado', 'especie',
+        ).iterator(chunk_size=TAMANHO_LOTE):
+            chave = (timezone.localdate(adocao), estado, especie)
+            totais[chave]['adocoes'] += 1
+            histogramas[chave][faixa_dias((adocao - cadastro).days)] += 1
+    for modelo in (CandidaturaAdocao, CandidaturaArquivada):
+        por_dia(modelo.objects.all(), 'data_envio', 'candidaturas', 'pet__estado', 'pet__especie')
+
+    linhas = [
+        EstatisticaDiaria(
+            dia=dia, estado=estado, especie=especie,
+            dias_ate_adocao=histogramas.get((dia, estado, especie)) or _histograma_vazio(),
+            **contadores,
+        )
+        for (dia, estado, especie), contadores in totais.items()
+    ]
+    with transaction.atomic():
+        antigas = EstatisticaDiaria.objects.all()
+        if desde is not None:
+            antigas = antigas.filter(dia__gte=desde)
+        antigas.delete()
+        EstatisticaDiaria.objects.bulk_create(linhas, batch_size=TAMANHO_LOTE)
+    cache.delete(CHAVE_IMPACTO)
+    return len(linhas)
+
+
+def _somas():
+    return {campo: Sum(campo) for campo in CAMPOS}
+
+
+def _medianas_por(linhas, campo):
+    """{valor do campo: mediana} somando os histogramas das linhas com adoções"""
+    por_valor = defaultdict(list)
+    for valor, histograma in linhas.filter(adocoes__gt=0).values_list(campo, 'dias_ate_adocao'):
+        por_valor[valor].append(histograma)
+    return {valor: mediana_dias(_somar_histogramas(lista)) for valor, lista in por_valor.items()}
+
+
+def painel(meses=12, estado='', especie=''):
+    """Totais, série mensal e quebras por estado e espécie para o painel da equipe"""
+    hoje = timezone.localdate()
+    mes = hoje.year * 12 + hoje.month - 1 - (meses - 1)
+    inicio = date(mes // 12, mes % 12 + 1, 1)
+    linhas = EstatisticaDiaria.objects.filter(dia__gte=inicio).order_by()
+    if estado:
+        linhas = linhas.filter(estado=estado)
+    if especie:
+        linhas = linhas.filter(especie=especie)
+
+    totais = {campo: valor or 0 for campo, valor in linhas.aggregate(**_somas()).items()}
+    histograma = _somar_histogramas(
+        linhas.filter(adocoes__gt=0).values_list('dias_ate_adocao', flat=True)
+    )
+    totais['mediana_dias_adocao'] = mediana_dias(histograma)
+
+    por_mes = list(
+        linhas.annotate(mes=TruncMonth('dia')).values('mes').annotate(**_somas()).order_by('mes')
+    )
+    quebras = {}
+    for campo in ('estado', 'especie'):
+        medianas = _medianas_por(linhas, campo)
+        quebras[campo] = [
+            {**linha, 'mediana_dias_adocao': medianas.get(linha[campo])}
+            for linha in linhas.values(campo).annotate(**_somas()).order_by('-adocoes', campo)
+        ]
+    return {
+        'inicio': inicio,
+        'totais': totais,
+        'por_mes': por_mes,
+        'por_estado': quebras['estado'],
+        'por_especie': quebras['especie'],
+    }
+
+
+
+def impacto_publico():
+    """Números da página pública de impacto, guardados por IMPACTO_TIMEOUT"""
+    resultado = cache.get(CHAVE_IMPACTO)
+    if resultado is None:
+        linhas = EstatisticaDiaria.objects.order_by()
+        totais = {campo: valor or 0 for campo, valor in linhas.aggregate(**_somas()).items()}
+        ultimo_ano = linhas.filter(dia__gte=timezone.localdate() - timedelta(days=365))
+        resultado = {
+            'totais': totais,
+            'adocoes_ultimo_ano': ultimo_ano.aggregate(total=Sum('adocoes'))['total'] or 0,
+            'mediana_dias_adocao': mediana_dias(_somar_histogramas(
+                linhas.filter(adocoes__gt=0).values_list('dias_ate_adocao', flat=True)
+            )),
+            'por_especie': list(
+                linhas.values('especie').annotate(adocoes=Sum('adocoes')).filter(adocoes__gt=0).order_by('-adocoes')
+            ),
+            'por_estado': list(
+                linhas.values('estado').annotate(adocoes=Sum('adocoes')).filter(adocoes__gt=0).order_by('-adocoes')[:10]
+            ),
+        }
+        cache.set(CHAVE_IMPACTO, resultado, IMPACTO_TIMEOUT)
+    return resultado
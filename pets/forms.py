@@ -1,6 +1,8 @@
 from django import forms
 from django.core.exceptions import ValidationError
-from .models import Pet, FotoPet, CandidaturaAdocao
+from django.urls import reverse_lazy
+from . import cidades
+from .models import Pet, FotoPet, CandidaturaAdocao, BuscaSalva, FAIXAS_IDADE
 
 
 class PetForm(forms.ModelForm):
@@ -43,7 +45,10 @@ class PetForm(forms.ModelForm):
             }),
             'cidade': forms.TextInput(attrs={
                 'class': 'form-control',
-                'placeholder': 'Cidade onde o pet está'
+                'placeholder': 'Cidade onde o pet está',
+                'autocomplete': 'off',
+                'data-suggestions': reverse_lazy('pets:cidades_api'),
+                'data-suggestions-estado': 'id_estado',
             }),
             'estado': forms.Select(attrs={'class': 'form-control'}),
         }
@@ -70,6 +75,17 @@ class PetForm(forms.ModelForm):
         if idade and idade > 300:  # 25 anos em meses
             raise ValidationError("A idade não pode ser superior a 25 anos.")
         return idade
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        cidade = cleaned_data.get('cidade')
+        estado = cleaned_data.get('estado')
+        if cidade and estado:
+            # Usa a grafia já cadastrada ("sao paulo" -> "São Paulo")
+            cleaned_data['cidade'] = (
+                cidades.obter_indice().grafia_preferida(cidade, estado) or ' '.join(cidade.split())
+            )
+        return cleaned_data
 
 
 class FotoPetForm(forms.ModelForm):
@@ -94,6 +110,63 @@ class FotoPetForm(forms.ModelForm):
         }
 
 
+class MultiplosArquivosInput(forms.ClearableFileInput):
+    """Input de arquivo que aceita vários arquivos"""
+    allow_multiple_selected = True
+
+
+class EnvioFotosForm(forms.Form):
+    """Formulário de envio de várias fotos de um pet"""
+    
+    fotos = forms.FileField(
+        label="Fotos",
+        widget=MultiplosArquivosInput(attrs={
+            'class': 'form-control',
+            'accept': 'image/jpeg,image/png,image/webp',
+        }),
+        help_text="Selecione uma ou mais fotos (JPEG, PNG ou WEBP)"
+    )
+
+
+class ImportacaoPetsForm(forms.Form):
+    """Formulário de importação de pets em lote"""
+    
+    arquivo = forms.FileField(
+        label="Arquivo de pets (CSV ou NDJSON)",
+        help_text="Uma linha por pet, com as mesmas colunas do cadastro. "
+                  "A coluna 'fotos' lista os arquivos do ZIP separados por ';'.",
+        widget=forms.FileInput(attrs={
+            'class': 'form-control',
+            'accept': '.csv,.ndjson,.jsonl'
+        })
+    )
+    
+    fotos = forms.FileField(
+        required=False,
+        label="Fotos (ZIP)",
+        widget=forms.FileInput(attrs={
+            'class': 'form-control',
+            'accept': '.zip'
+        })
+    )
+    
+    def clean_arquivo(self):
+        from .importacao import detectar_formato
+        arquivo = self.cleaned_data.get('arquivo')
+        if arquivo and not detectar_formato(arquivo.name):
+            raise ValidationError("Envie um arquivo .csv, .ndjson ou .jsonl.")
+        return arquivo
+    
+    def clean_fotos(self):
+        import zipfile
+        fotos = self.cleaned_data.get('fotos')
+        if fotos and not zipfile.is_zipfile(fotos):
+            raise ValidationError("O arquivo de fotos deve ser um ZIP válido.")
+        if fotos:
+            fotos.seek(0)
+        return fotos
+
+
 class BuscaPetForm(forms.Form):
     """Formulário de busca de pets"""
     
@@ -155,7 +228,10 @@ class BuscaPetForm(forms.Form):
         required=False,
         widget=forms.TextInput(attrs={
             'class': 'form-control',
-            'placeholder': 'Cidade'
+            'placeholder': 'Cidade',
+            'autocomplete': 'off',
+            'data-suggestions': reverse_lazy('pets:cidades_api'),
+            'data-suggestions-estado': 'id_estado',
         })
     )
     
@@ -182,6 +258,82 @@ class BuscaPetForm(forms.Form):
         label="Apenas ONGs/Protetores verificados",
         widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
     )
+    
+    com_fotos = forms.BooleanField(
+        required=False,
+        label="Apenas pets com fotos",
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+    
+    ordenacao = forms.ChoiceField(
+        choices=[
+            ('', 'Mais recentes'),
+            ('mais_vistos', 'Mais vistos'),
+        ],
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    
+    ORDENACOES = {
+        '': ('-data_cadastro',),
+        'mais_vistos': ('-popularidade', '-data_cadastro'),
+    }
+    
+    def ordenar(self, queryset):
+        """Aplica a ordenação escolhida (mais recentes por padrão)"""
+        ordenacao = self.cleaned_data.get('ordenacao', '') if self.is_valid() else ''
+        return queryset.order_by(*self.ORDENACOES[ordenacao])
+    
+    def busca_salva(self, usuario):
+        """BuscaSalva (não gravada) com os filtros válidos do formulário"""
+        dados = self.cleaned_data
+        return BuscaSalva(
+            usuario=usuario,
+            especie=dados.get('especie', ''),
+            porte=dados.get('porte', ''),
+            sexo=dados.get('sexo', ''),
+            faixa_idade=dados.get('idade', ''),
+            cidade=dados.get('cidade', '').strip(),
+            estado=dados.get('estado', ''),
+            apenas_verificados=bool(dados.get('apenas_verificados')),
+        )
+    
+    def filtrar(self, queryset):
+        """Aplica os filtros válidos do formulário ao queryset de pets"""
+        if not self.is_valid():
+            return queryset
+        
+        especie = self.cleaned_data.get('especie')
+        porte = self.cleaned_data.get('porte')
+        sexo = self.cleaned_data.get('sexo')
+        idade = self.cleaned_data.get('idade')
+        cidade = self.cleaned_data.get('cidade')
+        estado = self.cleaned_data.get('estado')
+        apenas_verificados = self.cleaned_data.get('apenas_verificados')
+        com_fotos = self.cleaned_data.get('com_fotos')
+        
+        if especie:
+            queryset = queryset.filter(especie=especie)
+        if porte:
+            queryset = queryset.filter(porte=porte)
+        if sexo:
+            queryset = queryset.filter(sexo=sexo)
+        if idade:
+            minimo, maximo = FAIXAS_IDADE[idade]
+            if minimo is not None:
+                queryset = queryset.filter(idade_meses__gte=minimo)
+            if maximo is not None:
+                queryset = queryset.filter(idade_meses__lte=maximo)
+        if cidade:
+            queryset = queryset.filter(cidade__icontains=cidade)
+        if estado:
+            queryset = queryset.filter(estado=estado)
+        if apenas_verificados:
+            queryset = queryset.filter(doador__verificado=True)
+        if com_fotos:
+            queryset = queryset.filter(num_fotos__gt=0)
+        
+        return queryset
 
 
 class CandidaturaAdocaoForm(forms.ModelForm):
@@ -292,3 +444,29 @@ class CandidaturaAdocaoForm(forms.ModelForm):
         if commit:
             candidatura.save()
         return candidatura
+
+
+class EstatisticasForm(forms.Form):
+    """Filtros do painel de estatísticas da equipe"""
+    
+    MESES_PADRAO = 12
+    
+    meses = forms.TypedChoiceField(
+        choices=[(3, '3 meses'), (6, '6 meses'), (12, '12 meses'), (24, '24 meses'), (60, '5 anos')],
+        coerce=int,
+        required=False,
+        initial=MESES_PADRAO,
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    
+    estado = forms.ChoiceField(
+        choices=BuscaPetForm.base_fields['estado'].choices,
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+    
+    especie = forms.ChoiceField(
+        choices=BuscaPetForm.ESPECIE_CHOICES,
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
@@ -0,0 +1,263 @@
+"""
+Importação e exportação de pets em lote (CSV/NDJSON + ZIP de fotos).
+
+A importação lê o arquivo linha a linha, valida cada linha com as regras do
+PetForm e grava em lotes (bulk_create) dentro de transações por lote. A
+exportação é gerada sob demanda, lote a lote, para uso com
+StreamingHttpResponse; a memória usada não depende da quantidade de pets.
+"""
+import csv
+import io
+from collections import Counter
+import json
+import os
+import zipfile
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, UnidentifiedImageError
+
+from . import cidades, estatisticas
+from .cache import incrementar_geracao_catalogo
+from .duplicatas import fotos_semelhantes
+from .forms import PetForm
+from .models import Pet, FotoPet
+from .signals import somar_fotos
+from .uploads import FORMATOS_ACEITOS, tamanho_maximo_foto, validar_cabecalho
+from .tarefas import atualizar_semelhantes, notificar_buscas_salvas, otimizar_fotos
+
+TAMANHO_LOTE = 500
+MAXIMO_ERROS_RELATORIO = 100
+
+CAMPOS_EXPORTACAO = PetForm.Meta.fields + ['status_anuncio', 'status_adocao', 'data_cadastro']
+
+FORMATOS = {
+    '.csv': 'csv',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+}
+
+
+def detectar_formato(nome_arquivo):
+    """Formato (csv ou ndjson) a partir da extensão do arquivo"""
+    return FORMATOS.get(os.path.splitext(nome_arquivo)[1].lower())
+
+
+def ler_linhas(arquivo, formato):
+    """Gera (número da linha, dict) sem carregar o arquivo inteiro"""
+    texto = io.TextIOWrapper(arquivo, encoding='utf-8-sig', newline='')
+    if formato == 'csv':
+        leitor = csv.DictReader(texto)
+        for linha in leitor:
+            yield leitor.line_num, linha
+    else:
+        for numero, conteudo in enumerate(texto, 1):
+            conteudo = conteudo.strip()
+            if not conteudo:
+                continue
+            try:
+                dados = json.loads(conteudo)
+            except json.JSONDecodeError:
+                dados = None
+            yield numero, dados if isinstance(dados, dict) else None
+
+
+def _abrir_foto(arquivo_fotos, nome):
+    """
+    (File, None) para uma foto do ZIP válida ou (None, motivo).
+
+    A foto passa pelas mesmas regras das enviadas pelo formulário: tamanho
+    do arquivo, formato e dimensões (validar_cabecalho).
+    """
+    try:
+        info = arquivo_fotos.getinfo(nome)
+    except KeyError:
+        return None, 'não encontrada no ZIP'
+    if info.file_size > tamanho_maximo_foto():
+        return None, 'arquivo muito grande'
+    try:
+        with arquivo_fotos.open(info) as conteudo, Image.open(conteudo, formats=FORMATOS_ACEITOS) as imagem:
+            erro = validar_cabecalho(imagem)
+            if erro is None:
+                imagem.verify()
+    except Image.DecompressionBombError:
+        return None, 'imagem muito grande'
+    except (UnidentifiedImageError, OSError, SyntaxError, zipfile.BadZipFile, RuntimeError):
+        # RuntimeError: membro do ZIP protegido por senha
+        return None, 'o arquivo não é uma imagem JPEG, PNG ou WEBP'
+    if erro:
+        return None, erro
+    return File(arquivo_fotos.open(info), name=os.path.basename(nome)), None
+
+
+class ImportacaoPets:
+    """Importa pets de um doador em lotes"""
+
+    def __init__(self, doador, arquivo_fotos=None, tamanho_lote=TAMANHO_LOTE):
+        self.doador = doador
+        self.arquivo_fotos = zipfile.ZipFile(arquivo_fotos) if arquivo_fotos else None
+        self.tamanho_lote = tamanho_lote
+        # Mesma regra do PetCreateView, avaliada uma única vez
+        self.status_anuncio = 'Aprovado' if doador.is_ong_verificada() else 'Pendente'
+        self.importados = 0
+        self.fotos_importadas = 0
+        self.fotos_duplicadas = 0
+        self.total_erros = 0
+        self.erros = []
+        self._lote = []
+
+    def _registrar_erro(self, linha, mensagem):
+        self.total_erros += 1
+        if len(self.erros) < MAXIMO_ERROS_RELATORIO:
+            self.erros.append((linha, mensagem))
+
+    def importar(self, arquivo, formato):
+        for numero, dados in ler_linhas(arquivo, formato):
+            if dados is None:
+                self._registrar_erro(numero, 'Linha inválida')
+                continue
+            form = PetForm(data=dados)
+            if not form.is_valid():
+                self._registrar_erro(numero, '; '.join(
+                    f'{campo}: {" ".join(erros)}' for campo, erros in form.errors.items()
+                ))
+                continue
+            pet = form.save(commit=False)
+            pet.doador = self.doador
+            pet.status_anuncio = self.status_anuncio
+            fotos = [nome.strip() for nome in str(dados.get('fotos') or '').split(';') if nome.strip()]
+            self._lote.append((numero, pet, fotos))
+            if len(self._lote) >= self.tamanho_lote:
+                self._gravar_lote()
+        self._gravar_lote()
+        if self.importados:
+            incrementar_geracao_catalogo()
+            cidades.descartar()
+        return self
+
+    def _gravar_lote(self):
+        if not self._lote:
+            return
+        with transaction.atomic():
+            # bulk_create não chama o save() que preenche a data de aprovação
+            for _, pet, _ in self._lote:
+                pet.marcar_datas_status()
+            pets = Pet.objects.bulk_create([pet for _, pet, _ in self._lote])
+            fotos = []
+            for (numero, _, nomes), pet in zip(self._lote, pets):
+                for ordem, nome in enumerate(nomes):
+                    if self.arquivo_fotos is None:
+                        conteudo, motivo = None, 'nenhum ZIP de fotos enviado'
+                    else:
+                        conteudo, motivo = _abrir_foto(self.arquivo_fotos, nome)
+                    if conteudo is None:
+                        self._registrar_erro(numero, f'Foto {nome}: {motivo}')
+                        continue
+                    foto = FotoPet(pet=pet, imagem=conteudo, ordem=ordem)
+                    # bulk_create não chama o save() que calcula o dHash
+                    foto.definir_hash_perceptual(conteudo)
+                    fotos.append(foto)
+            # O pre_save do ImageField grava cada arquivo no storage
+            FotoPet.objects.bulk_create(fotos)
+            if fotos:
+                semelhantes = fotos_semelhantes(
+                    [foto.hash_perceptual for foto in fotos],
+                    excluir_fotos=[foto.pk for foto in fotos],
+                )
+                self.fotos_duplicadas += sum(1 for foto in fotos if foto.hash_perceptual in semelhantes)
+            # bulk_create não dispara os post_save que enfileiram a otimização
+            # das fotos, contam as fotos do pet, somam as estatísticas e geram
+            # os alertas das buscas salvas
+            if fotos:
+                otimizar_fotos.enfileirar([foto.pk for foto in fotos])
+                somar_fotos(Counter(foto.pet_id for foto in fotos))
+            estatisticas.registrar_pets(pets, novos=True, aprovados=self.status_anuncio == 'Aprovado')
+            if self.status_anuncio == 'Aprovado':
+                notificar_buscas_salvas.enfileirar([pet.pk for pet in pets])
+                atualizar_semelhantes.enfileirar([pet.pk for pet in pets])
+        for foto in fotos:
+            foto.imagem.close()
+        self.importados += len(pets)
+        self.fotos_importadas += len(fotos)
+        self._lote = []
+
+
+def _lotes_de_pets(doador, tamanho_lote=TAMANHO_LOTE):
+    """Pets do doador em lotes ordenados por id (paginação por chave)"""
+    ultimo_id = 0
+    while True:
+        lote = list(
+            Pet.objects.filter(doador=doador, id__gt=ultimo_id)
+            .order_by('id')
+            .values_list('id', *CAMPOS_EXPORTACAO)[:tamanho_lote]
+        )
+        if not lote:
+            return
+        fotos = {}
+        for pet_id, imagem in FotoPet.objects.filter(
+            pet_id__in=[linha[0] for linha in lote]
+        ).order_by('pet_id', 'ordem', 'data_upload').values_list('pet_id', 'imagem'):
+            fotos.setdefault(pet_id, []).append(f'{pet_id}/{os.path.basename(imagem)}')
+        for linha in lote:
+            yield linha, fotos.get(linha[0], [])
+        ultimo_id = lote[-1][0]
+
+
+class _Eco:
+    """Objeto com write() que apenas devolve o valor, para o csv.writer"""
+
+    def write(self, valor):
+        return valor
+
+
+def exportar_csv(doador):
+    escritor = csv.writer(_Eco())
+    yield escritor.writerow(['id', *CAMPOS_EXPORTACAO, 'fotos'])
+    for linha, fotos in _lotes_de_pets(doador):
+        yield escritor.writerow([*linha, ';'.join(fotos)])
+
+
+def exportar_ndjson(doador):
+    for linha, fotos in _lotes_de_pets(doador):
+        item = dict(zip(['id', *CAMPOS_EXPORTACAO], linha))
+        item['data_cadastro'] = item['data_cadastro'].isoformat()
+        item['fotos'] = ';'.join(fotos)
+        yield json.dumps(item, ensure_ascii=False) + '\n'
+
+
+class _BufferZip:
+    """Destino não posicionável para o ZipFile; os bytes são drenados pelo gerador"""
+
+    def __init__(self):
+        self._partes = []
+
+    def write(self, dados):
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def drenar(self):
+        dados = b''.join(self._partes)
+        self._partes.clear()
+        return dados
+
+
+def exportar_fotos_zip(doador):
+    """ZIP das fotos do doador, com os caminhos usados na coluna 'fotos'"""
+    buffer = _BufferZip()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as arquivo_zip:
+        fotos = FotoPet.objects.filter(pet__doador=doador).order_by('pet_id', 'ordem', 'data_upload')
+        for pet_id, imagem in fotos.values_list('pet_id', 'imagem').iterator(chunk_size=TAMANHO_LOTE):
+            if not default_storage.exists(imagem):
+                continue
+            nome = f'{pet_id}/{os.path.basename(imagem)}'
+            with default_storage.open(imagem) as origem, \
+                    arquivo_zip.open(nome, 'w', force_zip64=True) as destino:
+                for chunk in origem.chunks():
+                    destino.write(chunk)
+                    yield buffer.drenar()
+            yield buffer.drenar()
+    yield buffer.drenar()
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from pets.arquivo import TAMANHO_LOTE, arquivar_pets, dias_para_arquivar
+
+
+class Command(BaseCommand):
+    help = 'Move pets adotados ou rejeitados antigos (com fotos e candidaturas) para as tabelas de arquivo'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias', type=int, default=None,
+            help=f'Arquiva pets sem alterações há mais de N dias (padrão: {dias_para_arquivar()})',
+        )
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help='Pets por transação')
+        parser.add_argument('--limite', type=int, default=None, help='Para depois de arquivar N pets')
+
+    def handle(self, *args, **options):
+        arquivados = arquivar_pets(dias=options['dias'], tamanho_lote=options['lote'], limite=options['limite'])
+        self.stdout.write(self.style.SUCCESS(f'{arquivados} pet(s) arquivado(s).'))
@@ -0,0 +1,32 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from pets.models import FotoPet
+
+
+class Command(BaseCommand):
+    help = 'Calcula o hash perceptual (dHash) das fotos que ainda não têm'
+
+    def handle(self, *args, **options):
+        calculadas = 0
+        falhas = 0
+        for foto in FotoPet.objects.filter(phash_0__isnull=True).only('id', 'imagem').iterator(chunk_size=500):
+            if not foto.imagem or not default_storage.exists(foto.imagem.name):
+                falhas += 1
+                continue
+            with default_storage.open(foto.imagem.name) as arquivo:
+                foto.definir_hash_perceptual(arquivo)
+            if foto.phash_0 is None:
+                falhas += 1
+                continue
+            # update() para não disparar os signals do FotoPet
+            FotoPet.objects.filter(pk=foto.pk).update(
+                phash_0=foto.phash_0,
+                phash_1=foto.phash_1,
+                phash_2=foto.phash_2,
+                phash_3=foto.phash_3,
+            )
+            calculadas += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'{calculadas} foto(s) processada(s), {falhas} sem imagem válida.'
+        ))
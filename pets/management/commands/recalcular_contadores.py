@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from pets.contadores import recalcular_contadores
+
+
+class Command(BaseCommand):
+    help = 'Corrige os contadores de candidaturas e fotos dos pets'
+
+    def handle(self, *args, **options):
+        corrigidos = recalcular_contadores()
+        self.stdout.write(self.style.SUCCESS(f'{corrigidos} pet(s) corrigido(s).'))
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from pets.semelhantes import K_SEMELHANTES, recalcular_todos
+
+
+class Command(BaseCommand):
+    help = 'Recalcula as listas de pets semelhantes de todos os pets aprovados'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-k', type=int, default=K_SEMELHANTES,
+            help=f'Quantidade de vizinhos por pet (padrão: {K_SEMELHANTES})',
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        gravados = recalcular_todos(k=options['k'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{gravados} lista(s) atualizada(s) em {time.perf_counter() - inicio:.2f}s.'
+        ))
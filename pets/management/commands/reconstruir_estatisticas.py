@@ -0,0 +1,25 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pets.estatisticas import reconstruir
+
+
+class Command(BaseCommand):
+    help = 'Recalcula as estatísticas diárias a partir dos pets e candidaturas (ativos e arquivados)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--desde', default=None,
+            help='Recalcula só a partir desta data (AAAA-MM-DD); sem ela, recalcula tudo',
+        )
+
+    def handle(self, *args, **options):
+        desde = None
+        if options['desde']:
+            try:
+                desde = date.fromisoformat(options['desde'])
+            except ValueError:
+                raise CommandError('Use a data no formato AAAA-MM-DD.')
+        linhas = reconstruir(desde)
+        self.stdout.write(self.style.SUCCESS(f'{linhas} linha(s) de estatísticas gravada(s).'))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:29
+
+import pets.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0002_remove_candidaturaadocao_unique_candidatura_per_pet_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='fotopet',
+            name='imagem',
+            field=models.ImageField(upload_to=pets.models.caminho_foto_pet, verbose_name='Imagem'),
+        ),
+    ]
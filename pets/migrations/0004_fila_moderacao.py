@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0003_foto_pet_caminho_com_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PetPendente',
+            fields=[
+            ],
+            options={
+                'verbose_name': 'Pet pendente',
+                'verbose_name_plural': 'Fila de moderação',
+                'ordering': ['data_cadastro', 'id'],
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('pets.pet',),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(fields=['status_anuncio', 'data_cadastro'], name='pet_status_cadastro_idx'),
+        ),
+    ]
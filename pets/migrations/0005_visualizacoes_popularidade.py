@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0004_fila_moderacao'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pet',
+            name='popularidade',
+            field=models.FloatField(default=0, help_text='Placar de visualizações com decaimento; valores maiores são mais recentes', verbose_name='Popularidade'),
+        ),
+        migrations.AddField(
+            model_name='pet',
+            name='visualizacoes',
+            field=models.PositiveIntegerField(default=0, verbose_name='Visualizações'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(fields=['-popularidade'], name='pet_popularidade_idx'),
+        ),
+    ]
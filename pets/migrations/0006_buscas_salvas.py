@@ -0,0 +1,57 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0005_visualizacoes_popularidade'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BuscaSalva',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('especie', models.CharField(blank=True, max_length=10, verbose_name='Espécie')),
+                ('porte', models.CharField(blank=True, max_length=10, verbose_name='Porte')),
+                ('sexo', models.CharField(blank=True, max_length=10, verbose_name='Sexo')),
+                ('faixa_idade', models.CharField(blank=True, max_length=10, verbose_name='Faixa de idade')),
+                ('cidade', models.CharField(blank=True, max_length=100, verbose_name='Cidade')),
+                ('estado', models.CharField(blank=True, max_length=2, verbose_name='Estado')),
+                ('apenas_verificados', models.BooleanField(default=False, verbose_name='Apenas verificados')),
+                ('chave', models.CharField(db_index=True, editable=False, max_length=60, verbose_name='Chave')),
+                ('data_criacao', models.DateTimeField(auto_now_add=True, verbose_name='Data de criação')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buscas_salvas', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Busca Salva',
+                'verbose_name_plural': 'Buscas Salvas',
+                'db_table': 'busca_salva',
+                'ordering': ['-data_criacao'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AlertaBuscaSalva',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lido', models.BooleanField(default=False, verbose_name='Lido')),
+                ('data_criacao', models.DateTimeField(auto_now_add=True, verbose_name='Data de criação')),
+                ('pet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alertas', to='pets.pet', verbose_name='Pet')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alertas', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+                ('busca', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alertas', to='pets.buscasalva', verbose_name='Busca salva')),
+            ],
+            options={
+                'verbose_name': 'Alerta de Busca',
+                'verbose_name_plural': 'Alertas de Busca',
+                'db_table': 'alerta_busca_salva',
+                'ordering': ['-data_criacao'],
+                'indexes': [models.Index(fields=['usuario', 'lido', '-data_criacao'], name='alerta_usuario_idx')],
+                'constraints': [models.UniqueConstraint(fields=('busca', 'pet'), name='alerta_unico_por_busca')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0006_buscas_salvas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pet',
+            name='semelhantes',
+            field=models.JSONField(blank=True, default=list, editable=False, verbose_name='Pets semelhantes'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0007_pet_semelhantes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fotopet',
+            name='phash_0',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='fotopet',
+            name='phash_1',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='fotopet',
+            name='phash_2',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='fotopet',
+            name='phash_3',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='fotopet',
+            index=models.Index(fields=['phash_0'], name='foto_pet_phash_0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fotopet',
+            index=models.Index(fields=['phash_1'], name='foto_pet_phash_1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fotopet',
+            index=models.Index(fields=['phash_2'], name='foto_pet_phash_2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fotopet',
+            index=models.Index(fields=['phash_3'], name='foto_pet_phash_3_idx'),
+        ),
+    ]
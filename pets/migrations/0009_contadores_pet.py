@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:52
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def preencher_contadores(apps, schema_editor):
+    Pet = apps.get_model('pets', 'Pet')
+    CandidaturaAdocao = apps.get_model('pets', 'CandidaturaAdocao')
+    FotoPet = apps.get_model('pets', 'FotoPet')
+
+    def contagem(queryset):
+        return Coalesce(Subquery(
+            queryset.filter(pet=OuterRef('pk')).order_by().values('pet')
+            .annotate(total=Count('pk')).values('total')
+        ), 0)
+
+    Pet.objects.update(
+        num_candidaturas=contagem(CandidaturaAdocao.objects.all()),
+        num_candidaturas_nao_lidas=contagem(CandidaturaAdocao.objects.filter(status='Enviada')),
+        num_fotos=contagem(FotoPet.objects.all()),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0008_foto_pet_hash_perceptual'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pet',
+            name='num_candidaturas',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Candidaturas'),
+        ),
+        migrations.AddField(
+            model_name='pet',
+            name='num_candidaturas_nao_lidas',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Candidaturas não lidas'),
+        ),
+        migrations.AddField(
+            model_name='pet',
+            name='num_fotos',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Fotos'),
+        ),
+        migrations.RunPython(preencher_contadores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:04
+
+import django.db.models.deletion
+import pets.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0009_contadores_pet'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PetArquivado',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('nome', models.CharField(max_length=100, verbose_name='Nome do pet')),
+                ('especie', models.CharField(choices=[('Cão', 'Cão'), ('Gato', 'Gato'), ('Outro', 'Outro')], max_length=10, verbose_name='Espécie')),
+                ('porte', models.CharField(choices=[('Pequeno', 'Pequeno'), ('Médio', 'Médio'), ('Grande', 'Grande')], max_length=10, verbose_name='Porte')),
+                ('sexo', models.CharField(choices=[('Macho', 'Macho'), ('Fêmea', 'Fêmea')], max_length=10, verbose_name='Sexo')),
+                ('idade_meses', models.PositiveIntegerField(verbose_name='Idade (meses)')),
+                ('descricao', models.TextField(verbose_name='Descrição')),
+                ('historia', models.TextField(blank=True, null=True, verbose_name='História')),
+                ('informacoes_saude', models.TextField(blank=True, null=True, verbose_name='Informações de saúde')),
+                ('cidade', models.CharField(max_length=100, verbose_name='Cidade')),
+                ('estado', models.CharField(max_length=2, verbose_name='Estado')),
+                ('status_anuncio', models.CharField(choices=[('Pendente', 'Pendente de Moderação'), ('Aprovado', 'Aprovado'), ('Rejeitado', 'Rejeitado')], max_length=20, verbose_name='Status do anúncio')),
+                ('status_adocao', models.CharField(choices=[('Disponível', 'Disponível'), ('Em Processo', 'Em Processo'), ('Adotado', 'Adotado')], max_length=20, verbose_name='Status da adoção')),
+                ('visualizacoes', models.PositiveIntegerField(default=0, verbose_name='Visualizações')),
+                ('num_candidaturas', models.PositiveIntegerField(default=0, verbose_name='Candidaturas')),
+                ('num_candidaturas_nao_lidas', models.PositiveIntegerField(default=0, verbose_name='Candidaturas não lidas')),
+                ('num_fotos', models.PositiveIntegerField(default=0, verbose_name='Fotos')),
+                ('data_cadastro', models.DateTimeField(verbose_name='Data de cadastro')),
+                ('data_atualizacao', models.DateTimeField(verbose_name='Data de atualização')),
+                ('motivo_rejeicao', models.TextField(blank=True, null=True, verbose_name='Motivo da rejeição')),
+                ('data_arquivamento', models.DateTimeField(auto_now_add=True, verbose_name='Data de arquivamento')),
+                ('doador', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pets_arquivados', to=settings.AUTH_USER_MODEL, verbose_name='Doador')),
+            ],
+            options={
+                'verbose_name': 'Pet arquivado',
+                'verbose_name_plural': 'Pets arquivados',
+                'db_table': 'pet_arquivado',
+                'ordering': ['-data_cadastro'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FotoPetArquivada',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('imagem', models.ImageField(upload_to=pets.models.caminho_foto_pet, verbose_name='Imagem')),
+                ('descricao', models.CharField(blank=True, max_length=255, null=True, verbose_name='Descrição da foto')),
+                ('ordem', models.PositiveIntegerField(default=0, verbose_name='Ordem')),
+                ('data_upload', models.DateTimeField(verbose_name='Data do upload')),
+                ('pet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fotos', to='pets.petarquivado', verbose_name='Pet')),
+            ],
+            options={
+                'verbose_name': 'Foto de pet arquivado',
+                'verbose_name_plural': 'Fotos de pets arquivados',
+                'db_table': 'foto_pet_arquivada',
+                'ordering': ['ordem', 'data_upload'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CandidaturaArquivada',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('respostas_formulario', models.JSONField(verbose_name='Respostas do formulário')),
+                ('status', models.CharField(choices=[('Enviada', 'Enviada'), ('Visualizada', 'Visualizada'), ('Respondida', 'Respondida')], max_length=20, verbose_name='Status')),
+                ('data_envio', models.DateTimeField(verbose_name='Data de envio')),
+                ('data_visualizacao', models.DateTimeField(blank=True, null=True, verbose_name='Data de visualização')),
+                ('data_resposta', models.DateTimeField(blank=True, null=True, verbose_name='Data da resposta')),
+                ('observacoes_doador', models.TextField(blank=True, null=True, verbose_name='Observações do doador')),
+                ('candidato', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='candidaturas_arquivadas', to=settings.AUTH_USER_MODEL, verbose_name='Candidato')),
+                ('pet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='candidaturas', to='pets.petarquivado', verbose_name='Pet')),
+            ],
+            options={
+                'verbose_name': 'Candidatura arquivada',
+                'verbose_name_plural': 'Candidaturas arquivadas',
+                'db_table': 'candidatura_adocao_arquivada',
+                'ordering': ['-data_envio'],
+            },
+        ),
+    ]
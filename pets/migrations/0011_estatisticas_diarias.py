@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0010_arquivo_pets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstatisticaDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField(verbose_name='Dia')),
+                ('estado', models.CharField(max_length=2, verbose_name='Estado')),
+                ('especie', models.CharField(choices=[('Cão', 'Cão'), ('Gato', 'Gato'), ('Outro', 'Outro')], max_length=10, verbose_name='Espécie')),
+                ('novos', models.PositiveIntegerField(default=0, verbose_name='Pets cadastrados')),
+                ('aprovacoes', models.PositiveIntegerField(default=0, verbose_name='Anúncios aprovados')),
+                ('adocoes', models.PositiveIntegerField(default=0, verbose_name='Adoções')),
+                ('candidaturas', models.PositiveIntegerField(default=0, verbose_name='Candidaturas')),
+                ('dias_ate_adocao', models.JSONField(default=list, verbose_name='Dias até a adoção')),
+            ],
+            options={
+                'verbose_name': 'Estatística diária',
+                'verbose_name_plural': 'Estatísticas diárias',
+                'db_table': 'estatistica_diaria',
+                'ordering': ['-dia', 'estado', 'especie'],
+                'constraints': [models.UniqueConstraint(fields=('dia', 'estado', 'especie'), name='estatistica_diaria_unica')],
+            },
+        ),
+    ]
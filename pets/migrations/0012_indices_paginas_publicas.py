@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0011_estatisticas_diarias'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='fotopet',
+            options={'ordering': ['pet_id', 'ordem', 'data_upload'], 'verbose_name': 'Foto do Pet', 'verbose_name_plural': 'Fotos dos Pets'},
+        ),
+        migrations.AddIndex(
+            model_name='fotopet',
+            index=models.Index(fields=['pet', 'ordem', 'data_upload'], name='foto_pet_ordem_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(fields=['status_anuncio', 'status_adocao', '-data_cadastro'], name='pet_disponiveis_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(fields=['status_anuncio', 'status_adocao', 'especie', '-data_cadastro'], name='pet_disponiveis_especie_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(fields=['status_anuncio', 'status_adocao', 'estado', '-data_cadastro'], name='pet_disponiveis_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pet',
+            index=models.Index(fields=['status_anuncio', 'status_adocao', '-popularidade', '-data_cadastro'], name='pet_disponiveis_popular_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:43
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def preencher_datas(apps, schema_editor):
+    # Sem histórico das transições: a aprovação fica na data de cadastro e a
+    # adoção na última atualização, como a reconstrução fazia até aqui
+    for nome in ('Pet', 'PetArquivado'):
+        modelo = apps.get_model('pets', nome)
+        modelo.objects.filter(status_anuncio='Aprovado').update(data_aprovacao=F('data_cadastro'))
+        modelo.objects.filter(status_adocao='Adotado').update(data_adocao=F('data_atualizacao'))
+
+
+def reconstruir_estatisticas(apps, schema_editor):
+    # Preenche estatistica_diaria, criada vazia pela 0011
+    from pets.estatisticas import reconstruir
+    reconstruir(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0012_indices_paginas_publicas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pet',
+            name='data_adocao',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Data de adoção'),
+        ),
+        migrations.AddField(
+            model_name='pet',
+            name='data_aprovacao',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Data de aprovação'),
+        ),
+        migrations.AddField(
+            model_name='petarquivado',
+            name='data_adocao',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Data de adoção'),
+        ),
+        migrations.AddField(
+            model_name='petarquivado',
+            name='data_aprovacao',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Data de aprovação'),
+        ),
+        migrations.RunPython(preencher_datas, migrations.RunPython.noop),
+        migrations.RunPython(reconstruir_estatisticas, migrations.RunPython.noop),
+    ]
@@ -1,12 +1,46 @@
+import hashlib
+import os
+
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
+from django.utils.http import urlencode
+
+from meu_novo_amigo_pet.identidade import MapaIdentidadeMixin
+
+from .duplicatas import CAMPOS_HASH, dhash, juntar_partes, partes_hash
 
 Usuario = get_user_model()
 
+# Faixas de idade da busca: chave -> (mínimo, máximo) em meses, inclusivos
+FAIXAS_IDADE = {
+    '0-6': (None, 6),
+    '6-12': (6, 12),
+    '12-24': (12, 24),
+    '24-60': (24, 60),
+    '60+': (60, None),
+}
+
+
+def faixas_idade(idade_meses):
+    """Faixas de idade da busca que incluem a idade informada"""
+    return [
+        faixa for faixa, (minimo, maximo) in FAIXAS_IDADE.items()
+        if (minimo is None or idade_meses >= minimo) and (maximo is None or idade_meses <= maximo)
+    ]
+
+
+CAMPOS_INDICE_CIDADES = ('cidade', 'estado', 'status_anuncio', 'status_adocao')
+
+# Campos que entram no vetor do índice de semelhantes (pets/semelhantes.py)
+CAMPOS_SEMELHANCA = (
+    'especie', 'porte', 'sexo', 'idade_meses', 'cidade', 'estado', 'descricao', 'historia',
+    'status_anuncio', 'status_adocao',
+)
+
 
-class Pet(models.Model):
+class Pet(MapaIdentidadeMixin, models.Model):
     """Modelo para representar um pet disponível para adoção"""
     
     ESPECIE_CHOICES = [
@@ -102,10 +136,36 @@ class Pet(models.Model):
         verbose_name="Status da adoção"
     )
     
+    # Visualizações (gravadas em lote por pets/contadores.py)
+    visualizacoes = models.PositiveIntegerField(default=0, verbose_name="Visualizações")
+    popularidade = models.FloatField(
+        default=0,
+        verbose_name="Popularidade",
+        help_text="Placar de visualizações com decaimento; valores maiores são mais recentes"
+    )
+    
+    # Contadores desnormalizados, mantidos com UPDATEs atômicos (F()) pelos
+    # sinais de CandidaturaAdocao e FotoPet; ver recalcular_contadores
+    num_candidaturas = models.PositiveIntegerField(default=0, editable=False, verbose_name="Candidaturas")
+    num_candidaturas_nao_lidas = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Candidaturas não lidas"
+    )
+    num_fotos = models.PositiveIntegerField(default=0, editable=False, verbose_name="Fotos")
+    
+    # Ids dos pets semelhantes, calculados por pets/semelhantes.py
+    semelhantes = models.JSONField(default=list, blank=True, editable=False, verbose_name="Pets semelhantes")
+    
     # Metadados
     data_cadastro = models.DateTimeField(auto_now_add=True, verbose_name="Data de cadastro")
     data_atualizacao = models.DateTimeField(auto_now=True, verbose_name="Data de atualização")
     
+    # Datas das transições de status, usadas pelas estatísticas diárias;
+    # preenchidas por marcar_datas_status
+    data_aprovacao = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="Data de aprovação")
+    data_adocao = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="Data de adoção")
+    
     # Motivo de rejeição (se aplicável)
     motivo_rejeicao = models.TextField(
         blank=True, 
@@ -118,10 +178,92 @@ class Pet(models.Model):
         verbose_name_plural = "Pets"
         db_table = 'pet'
         ordering = ['-data_cadastro']
+        indexes = [
+            # Fila de moderação e listagens por status em ordem de cadastro
+            models.Index(fields=['status_anuncio', 'data_cadastro'], name='pet_status_cadastro_idx'),
+            models.Index(fields=['-popularidade'], name='pet_popularidade_idx'),
+            # Páginas públicas (pets_disponiveis): busca sem filtro ou por
+            # espécie/estado em ordem de cadastro e destaques por popularidade.
+            # Os planos são conferidos pelos testes de pets/tests.py
+            models.Index(
+                fields=['status_anuncio', 'status_adocao', '-data_cadastro'],
+                name='pet_disponiveis_idx',
+            ),
+            models.Index(
+                fields=['status_anuncio', 'status_adocao', 'especie', '-data_cadastro'],
+                name='pet_disponiveis_especie_idx',
+            ),
+            models.Index(
+                fields=['status_anuncio', 'status_adocao', 'estado', '-data_cadastro'],
+                name='pet_disponiveis_estado_idx',
+            ),
+            models.Index(
+                fields=['status_anuncio', 'status_adocao', '-popularidade', '-data_cadastro'],
+                name='pet_disponiveis_popular_idx',
+            ),
+        ]
+    
+    # Campos alterados só com UPDATEs atômicos; o save() de um pet existente
+    # não os regrava, para não desfazer incrementos feitos por outras requisições.
+    # semelhantes é gravado só pelo worker (pets/semelhantes.py)
+    CAMPOS_ATOMICOS = (
+        'visualizacoes', 'popularidade',
+        'num_candidaturas', 'num_candidaturas_nao_lidas', 'num_fotos', 'semelhantes',
+    )
+    
+    # PetArquivado tem arquivado = True; o histórico do doador lista os dois
+    arquivado = False
     
     def __str__(self):
         return f"{self.nome} - {self.especie} ({self.cidade}/{self.estado})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Status lido do banco, para o post_save detectar a aprovação
+        if 'status_anuncio' in instance.__dict__:
+            instance._status_anuncio_original = instance.status_anuncio
+        # Status da adoção lido do banco, para contar as adoções nas estatísticas
+        if 'status_adocao' in instance.__dict__:
+            instance._status_adocao_original = instance.status_adocao
+        # Cidade e disponibilidade lidas do banco, para o índice de cidades
+        if all(campo in instance.__dict__ for campo in CAMPOS_INDICE_CIDADES):
+            instance._cidade_indexada = instance.cidade_indexada()
+        # Dados do vetor de semelhança lidos do banco, para só recalcular os
+        # semelhantes quando algum deles mudar
+        if all(campo in instance.__dict__ for campo in CAMPOS_SEMELHANCA):
+            instance._semelhanca_original = instance.dados_semelhanca()
+        return instance
+    
+    def save(self, *args, **kwargs):
+        self.marcar_datas_status()
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                campo.name for campo in self._meta.concrete_fields
+                if not campo.primary_key and campo.name not in self.CAMPOS_ATOMICOS
+            ]
+        super().save(*args, **kwargs)
+    
+    def marcar_datas_status(self, agora=None):
+        """Data da aprovação e da adoção atuais; vazias fora desses status"""
+        agora = agora or timezone.now()
+        if not self.is_aprovado():
+            self.data_aprovacao = None
+        elif self.data_aprovacao is None:
+            self.data_aprovacao = agora
+        if self.status_adocao != 'Adotado':
+            self.data_adocao = None
+        elif self.data_adocao is None:
+            self.data_adocao = agora
+    
+    def cidade_indexada(self):
+        """(cidade, estado, disponível) usados pelo índice de cidades"""
+        return self.cidade, self.estado, self.is_disponivel()
+    
+    def dados_semelhanca(self):
+        """Valores de CAMPOS_SEMELHANCA, comparados antes e depois do save()"""
+        return tuple(getattr(self, campo) for campo in CAMPOS_SEMELHANCA)
+    
     def is_aprovado(self):
         """Verifica se o anúncio está aprovado"""
         return self.status_anuncio == 'Aprovado'
@@ -143,7 +285,45 @@ class Pet(models.Model):
             return f"{meses} mês{'es' if meses > 1 else ''}"
 
 
-class FotoPet(models.Model):
+class PetPendenteManager(models.Manager):
+    """Apenas anúncios aguardando moderação"""
+    
+    def get_queryset(self):
+        return super().get_queryset().filter(status_anuncio='Pendente')
+
+
+class PetPendente(Pet):
+    """Pets pendentes de moderação (fila do admin)"""
+    
+    objects = PetPendenteManager()
+    
+    class Meta:
+        proxy = True
+        verbose_name = "Pet pendente"
+        verbose_name_plural = "Fila de moderação"
+        ordering = ['data_cadastro', 'id']
+
+
+def nome_por_conteudo(arquivo, filename):
+    """Caminho pets/fotos/<hash do conteúdo>.<ext> do arquivo"""
+    digest = hashlib.sha256()
+    for chunk in arquivo.chunks():
+        digest.update(chunk)
+    extensao = os.path.splitext(filename)[1].lower()
+    return f'pets/fotos/{digest.hexdigest()[:20]}{extensao}'
+
+
+def caminho_foto_pet(instance, filename):
+    """
+    Nome do arquivo baseado no hash do conteúdo (pets/fotos/<hash>.<ext>).
+
+    Como o nome muda sempre que a imagem muda, a URL pode ser servida com
+    cache de longa duração.
+    """
+    return nome_por_conteudo(instance.imagem, filename)
+
+
+class FotoPet(MapaIdentidadeMixin, models.Model):
     """Modelo para armazenar fotos dos pets"""
     
     pet = models.ForeignKey(
@@ -153,7 +333,7 @@ class FotoPet(models.Model):
         verbose_name="Pet"
     )
     imagem = models.ImageField(
-        upload_to='pets/fotos/',
+        upload_to=caminho_foto_pet,
         verbose_name="Imagem"
     )
     descricao = models.CharField(
@@ -169,14 +349,50 @@ class FotoPet(models.Model):
     )
     data_upload = models.DateTimeField(auto_now_add=True, verbose_name="Data do upload")
     
+    # dHash em 4 partes de 16 bits, indexadas para a busca de duplicatas
+    phash_0 = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    phash_1 = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    phash_2 = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    phash_3 = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    
     class Meta:
         verbose_name = "Foto do Pet"
         verbose_name_plural = "Fotos dos Pets"
         db_table = 'foto_pet'
-        ordering = ['ordem', 'data_upload']
+        # O pet vem primeiro para o prefetch das fotos de vários pets seguir o
+        # índice foto_pet_ordem_idx sem ordenar; as fotos de um pet ficam na
+        # mesma ordem
+        ordering = ['pet_id', 'ordem', 'data_upload']
+        indexes = [
+            models.Index(fields=['pet', 'ordem', 'data_upload'], name='foto_pet_ordem_idx'),
+            models.Index(fields=['phash_0'], name='foto_pet_phash_0_idx'),
+            models.Index(fields=['phash_1'], name='foto_pet_phash_1_idx'),
+            models.Index(fields=['phash_2'], name='foto_pet_phash_2_idx'),
+            models.Index(fields=['phash_3'], name='foto_pet_phash_3_idx'),
+        ]
     
     def __str__(self):
         return f"Foto de {self.pet.nome}"
+    
+    def save(self, *args, **kwargs):
+        # Arquivos novos ainda não gravados no storage: calcula o dHash do upload
+        if self.phash_0 is None and self.imagem and not self.imagem._committed:
+            self.definir_hash_perceptual(self.imagem.file)
+        super().save(*args, **kwargs)
+    
+    @property
+    def hash_perceptual(self):
+        """dHash de 64 bits da foto (None se ainda não calculado)"""
+        if self.phash_0 is None:
+            return None
+        return juntar_partes(getattr(self, campo) for campo in CAMPOS_HASH)
+    
+    def definir_hash_perceptual(self, arquivo):
+        """Calcula o dHash do arquivo e preenche phash_0..phash_3"""
+        valor = dhash(arquivo)
+        partes = partes_hash(valor) if valor is not None else [None] * len(CAMPOS_HASH)
+        for campo, conteudo in zip(CAMPOS_HASH, partes):
+            setattr(self, campo, conteudo)
 
 
 class CandidaturaAdocao(models.Model):
@@ -243,6 +459,17 @@ class CandidaturaAdocao(models.Model):
     def __str__(self):
         return f"Candidatura de {self.candidato.nome} para {self.pet.nome}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Status lido do banco, para os sinais ajustarem as não lidas do pet
+        if 'status' in instance.__dict__:
+            instance._status_original = instance.status
+        return instance
+    
+    def is_nao_lida(self):
+        return self.status == 'Enviada'
+    
     def marcar_como_visualizada(self):
         """Marca a candidatura como visualizada"""
         if not self.data_visualizacao:
@@ -256,3 +483,299 @@ class CandidaturaAdocao(models.Model):
         self.status = 'Respondida'
         self.save(update_fields=['data_resposta', 'status'])
 
+
+
+class BuscaSalva(models.Model):
+    """Busca salva por um usuário, avisado quando um pet novo for compatível"""
+    
+    # Valor da chave para filtros não preenchidos (qualquer valor)
+    QUALQUER = '*'
+    
+    usuario = models.ForeignKey(
+        Usuario,
+        on_delete=models.CASCADE,
+        related_name='buscas_salvas',
+        verbose_name="Usuário"
+    )
+    especie = models.CharField(max_length=10, blank=True, verbose_name="Espécie")
+    porte = models.CharField(max_length=10, blank=True, verbose_name="Porte")
+    sexo = models.CharField(max_length=10, blank=True, verbose_name="Sexo")
+    faixa_idade = models.CharField(max_length=10, blank=True, verbose_name="Faixa de idade")
+    cidade = models.CharField(max_length=100, blank=True, verbose_name="Cidade")
+    estado = models.CharField(max_length=2, blank=True, verbose_name="Estado")
+    apenas_verificados = models.BooleanField(default=False, verbose_name="Apenas verificados")
+    
+    # Índice invertido: especie|porte|sexo|faixa_idade|estado, com * para "qualquer"
+    chave = models.CharField(max_length=60, db_index=True, editable=False, verbose_name="Chave")
+    
+    data_criacao = models.DateTimeField(auto_now_add=True, verbose_name="Data de criação")
+    
+    class Meta:
+        verbose_name = "Busca Salva"
+        verbose_name_plural = "Buscas Salvas"
+        db_table = 'busca_salva'
+        ordering = ['-data_criacao']
+    
+    def __str__(self):
+        return f"Busca de {self.usuario}: {self.descricao()}"
+    
+    @classmethod
+    def montar_chave(cls, especie, porte, sexo, faixa_idade, estado):
+        return '|'.join(valor or cls.QUALQUER for valor in (especie, porte, sexo, faixa_idade, estado))
+    
+    @classmethod
+    def chaves_para_pet(cls, pet):
+        """Todas as chaves de buscas que podem incluir o pet (no máximo 48)"""
+        chaves = ['']
+        for valores in (
+            [pet.especie],
+            [pet.porte],
+            [pet.sexo],
+            faixas_idade(pet.idade_meses),
+            [pet.estado],
+        ):
+            chaves = [
+                f'{prefixo}|{valor}' if prefixo else valor
+                for prefixo in chaves
+                for valor in valores + [cls.QUALQUER]
+            ]
+        return chaves
+    
+    def save(self, *args, **kwargs):
+        self.chave = self.montar_chave(self.especie, self.porte, self.sexo, self.faixa_idade, self.estado)
+        super().save(*args, **kwargs)
+    
+    def aceita(self, pet):
+        """Filtros que não fazem parte da chave (cidade e verificação do doador)"""
+        if self.cidade and self.cidade.lower() not in pet.cidade.lower():
+            return False
+        if self.apenas_verificados and not pet.doador.verificado:
+            return False
+        return True
+    
+    def descricao(self):
+        """Resumo legível dos filtros"""
+        partes = [
+            self.especie,
+            self.porte,
+            self.sexo,
+            f'{self.faixa_idade} meses' if self.faixa_idade else '',
+            '/'.join(parte for parte in (self.cidade, self.estado) if parte),
+            'verificados' if self.apenas_verificados else '',
+        ]
+        return ', '.join(parte for parte in partes if parte) or 'Todos os pets'
+    
+    def querystring(self):
+        """Filtros no formato da querystring do BuscaPetForm"""
+        parametros = {
+            'especie': self.especie,
+            'porte': self.porte,
+            'sexo': self.sexo,
+            'idade': self.faixa_idade,
+            'cidade': self.cidade,
+            'estado': self.estado,
+        }
+        if self.apenas_verificados:
+            parametros['apenas_verificados'] = 'on'
+        return urlencode({campo: valor for campo, valor in parametros.items() if valor})
+
+
+class AlertaBuscaSalva(models.Model):
+    """Aviso de um pet novo compatível com uma busca salva"""
+    
+    usuario = models.ForeignKey(
+        Usuario,
+        on_delete=models.CASCADE,
+        related_name='alertas',
+        verbose_name="Usuário"
+    )
+    busca = models.ForeignKey(
+        BuscaSalva,
+        on_delete=models.CASCADE,
+        related_name='alertas',
+        verbose_name="Busca salva"
+    )
+    pet = models.ForeignKey(
+        Pet,
+        on_delete=models.CASCADE,
+        related_name='alertas',
+        verbose_name="Pet"
+    )
+    lido = models.BooleanField(default=False, verbose_name="Lido")
+    data_criacao = models.DateTimeField(auto_now_add=True, verbose_name="Data de criação")
+    
+    class Meta:
+        verbose_name = "Alerta de Busca"
+        verbose_name_plural = "Alertas de Busca"
+        db_table = 'alerta_busca_salva'
+        ordering = ['-data_criacao']
+        constraints = [
+            models.UniqueConstraint(fields=['busca', 'pet'], name='alerta_unico_por_busca'),
+        ]
+        indexes = [
+            models.Index(fields=['usuario', 'lido', '-data_criacao'], name='alerta_usuario_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.pet.nome} para {self.usuario}"
+
+
+# Pets adotados ou rejeitados há mais de ARQUIVAR_PETS_APOS_DIAS saem das
+# tabelas pet, foto_pet e candidatura_adocao e vão para as tabelas abaixo
+# (ver pets/arquivo.py), mantendo os mesmos ids. As tabelas ativas ficam só
+# com os anúncios em andamento; o histórico do doador lê das duas.
+
+class PetArquivado(models.Model):
+    """Pet adotado ou rejeitado movido para o arquivo"""
+    
+    arquivado = True
+    
+    id = models.BigIntegerField(primary_key=True)
+    doador = models.ForeignKey(
+        Usuario,
+        on_delete=models.CASCADE,
+        related_name='pets_arquivados',
+        verbose_name="Doador"
+    )
+    nome = models.CharField(max_length=100, verbose_name="Nome do pet")
+    especie = models.CharField(max_length=10, choices=Pet.ESPECIE_CHOICES, verbose_name="Espécie")
+    porte = models.CharField(max_length=10, choices=Pet.PORTE_CHOICES, verbose_name="Porte")
+    sexo = models.CharField(max_length=10, choices=Pet.SEXO_CHOICES, verbose_name="Sexo")
+    idade_meses = models.PositiveIntegerField(verbose_name="Idade (meses)")
+    descricao = models.TextField(verbose_name="Descrição")
+    historia = models.TextField(blank=True, null=True, verbose_name="História")
+    informacoes_saude = models.TextField(blank=True, null=True, verbose_name="Informações de saúde")
+    cidade = models.CharField(max_length=100, verbose_name="Cidade")
+    estado = models.CharField(max_length=2, verbose_name="Estado")
+    status_anuncio = models.CharField(
+        max_length=20,
+        choices=Pet.STATUS_ANUNCIO_CHOICES,
+        verbose_name="Status do anúncio"
+    )
+    status_adocao = models.CharField(
+        max_length=20,
+        choices=Pet.STATUS_ADOCAO_CHOICES,
+        verbose_name="Status da adoção"
+    )
+    visualizacoes = models.PositiveIntegerField(default=0, verbose_name="Visualizações")
+    num_candidaturas = models.PositiveIntegerField(default=0, verbose_name="Candidaturas")
+    num_candidaturas_nao_lidas = models.PositiveIntegerField(default=0, verbose_name="Candidaturas não lidas")
+    num_fotos = models.PositiveIntegerField(default=0, verbose_name="Fotos")
+    data_cadastro = models.DateTimeField(verbose_name="Data de cadastro")
+    data_atualizacao = models.DateTimeField(verbose_name="Data de atualização")
+    data_aprovacao = models.DateTimeField(null=True, blank=True, verbose_name="Data de aprovação")
+    data_adocao = models.DateTimeField(null=True, blank=True, verbose_name="Data de adoção")
+    motivo_rejeicao = models.TextField(blank=True, null=True, verbose_name="Motivo da rejeição")
+    data_arquivamento = models.DateTimeField(auto_now_add=True, verbose_name="Data de arquivamento")
+    
+    class Meta:
+        verbose_name = "Pet arquivado"
+        verbose_name_plural = "Pets arquivados"
+        db_table = 'pet_arquivado'
+        ordering = ['-data_cadastro']
+    
+    def __str__(self):
+        return f"{self.nome} - {self.especie} ({self.cidade}/{self.estado})"
+    
+    def is_aprovado(self):
+        return self.status_anuncio == 'Aprovado'
+    
+    def is_disponivel(self):
+        return False
+    
+    get_idade_formatada = Pet.get_idade_formatada
+
+
+class FotoPetArquivada(models.Model):
+    """Foto de um pet arquivado; o arquivo continua no mesmo caminho do storage"""
+    
+    id = models.BigIntegerField(primary_key=True)
+    pet = models.ForeignKey(
+        PetArquivado,
+        on_delete=models.CASCADE,
+        related_name='fotos',
+        verbose_name="Pet"
+    )
+    imagem = models.ImageField(upload_to=caminho_foto_pet, verbose_name="Imagem")
+    descricao = models.CharField(max_length=255, blank=True, null=True, verbose_name="Descrição da foto")
+    ordem = models.PositiveIntegerField(default=0, verbose_name="Ordem")
+    data_upload = models.DateTimeField(verbose_name="Data do upload")
+    
+    class Meta:
+        verbose_name = "Foto de pet arquivado"
+        verbose_name_plural = "Fotos de pets arquivados"
+        db_table = 'foto_pet_arquivada'
+        ordering = ['ordem', 'data_upload']
+    
+    def __str__(self):
+        return f"Foto de {self.pet.nome}"
+
+
+class CandidaturaArquivada(models.Model):
+    """Candidatura a um pet arquivado"""
+    
+    id = models.BigIntegerField(primary_key=True)
+    pet = models.ForeignKey(
+        PetArquivado,
+        on_delete=models.CASCADE,
+        related_name='candidaturas',
+        verbose_name="Pet"
+    )
+    candidato = models.ForeignKey(
+        Usuario,
+        on_delete=models.CASCADE,
+        related_name='candidaturas_arquivadas',
+        verbose_name="Candidato"
+    )
+    respostas_formulario = models.JSONField(verbose_name="Respostas do formulário")
+    status = models.CharField(
+        max_length=20,
+        choices=CandidaturaAdocao.STATUS_CHOICES,
+        verbose_name="Status"
+    )
+    data_envio = models.DateTimeField(verbose_name="Data de envio")
+    data_visualizacao = models.DateTimeField(blank=True, null=True, verbose_name="Data de visualização")
+    data_resposta = models.DateTimeField(blank=True, null=True, verbose_name="Data da resposta")
+    observacoes_doador = models.TextField(blank=True, null=True, verbose_name="Observações do doador")
+    
+    class Meta:
+        verbose_name = "Candidatura arquivada"
+        verbose_name_plural = "Candidaturas arquivadas"
+        db_table = 'candidatura_adocao_arquivada'
+        ordering = ['-data_envio']
+    
+    def __str__(self):
+        return f"Candidatura de {self.candidato.nome} para {self.pet.nome}"
+
+
+# Limites superiores (em dias) das faixas do histograma de tempo até a adoção
+FAIXAS_DIAS_ADOCAO = (1, 3, 7, 14, 30, 60, 90, 180, 365)
+
+
+class EstatisticaDiaria(models.Model):
+    """
+    Totais de um dia por estado e espécie, mantidos pelos sinais a cada
+    cadastro, aprovação, adoção e candidatura (ver pets/estatisticas.py).
+    """
+    
+    dia = models.DateField(verbose_name="Dia")
+    estado = models.CharField(max_length=2, verbose_name="Estado")
+    especie = models.CharField(max_length=10, choices=Pet.ESPECIE_CHOICES, verbose_name="Espécie")
+    novos = models.PositiveIntegerField(default=0, verbose_name="Pets cadastrados")
+    aprovacoes = models.PositiveIntegerField(default=0, verbose_name="Anúncios aprovados")
+    adocoes = models.PositiveIntegerField(default=0, verbose_name="Adoções")
+    candidaturas = models.PositiveIntegerField(default=0, verbose_name="Candidaturas")
+    # Adoções do dia por faixa de dias desde o cadastro (FAIXAS_DIAS_ADOCAO + "mais")
+    dias_ate_adocao = models.JSONField(default=list, verbose_name="Dias até a adoção")
+    
+    class Meta:
+        verbose_name = "Estatística diária"
+        verbose_name_plural = "Estatísticas diárias"
+        db_table = 'estatistica_diaria'
+        ordering = ['-dia', 'estado', 'especie']
+        constraints = [
+            models.UniqueConstraint(fields=['dia', 'estado', 'especie'], name='estatistica_diaria_unica'),
+        ]
+    
+    def __str__(self):
+        return f"{self.dia} {self.estado}/{self.especie}"
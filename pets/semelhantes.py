@@ -0,0 +1,273 @@
+"""
+Índice de pets semelhantes.
+
+Cada pet aprovado vira um vetor com blocos para os atributos (espécie,
+porte, sexo, faixa de idade), a localização (estado e cidade) e o texto
+(descrição e história, em bag-of-words com hashing). Cada bloco é
+normalizado e multiplicado pelo seu peso, então o produto escalar entre dois
+vetores é a similaridade. As similaridades são calculadas com NumPy em
+blocos de linhas, e os K vizinhos mais próximos entre os pets disponíveis
+ficam gravados em Pet.semelhantes.
+
+A atualização incremental recalcula apenas as listas que podem mudar:
+as dos pets alterados, as que contêm algum deles e as em que algum deles
+passa a ficar entre os K mais próximos. A matriz fica na memória do worker
+entre as atualizações e só as linhas dos pets alterados são vetorizadas de
+novo; ela é montada do zero a cada SEMELHANTES_RECONSTRUIR_SEGUNDOS, para
+incorporar gravações feitas por outros processos.
+"""
+import re
+import threading
+import time
+import unicodedata
+import zlib
+
+import numpy as np
+from django.conf import settings
+
+from .models import Pet, faixas_idade
+
+K_SEMELHANTES = 6
+LINHAS_POR_BLOCO = 512
+LOTE_GRAVACAO = 500
+
+DIMENSOES_CIDADE = 64
+DIMENSOES_TEXTO = 512
+
+PESOS = {
+    'especie': 3.0,
+    'porte': 1.0,
+    'sexo': 0.5,
+    'idade': 1.0,
+    'estado': 1.0,
+    'cidade': 1.0,
+    'texto': 1.5,
+}
+
+_PALAVRA = re.compile(r'[a-z0-9]{3,}')
+
+CAMPOS_VETOR = ('id', 'especie', 'porte', 'sexo', 'idade_meses', 'cidade', 'estado', 'descricao', 'historia')
+
+
+def _normalizar_texto(texto):
+    texto = unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore').decode()
+    return texto.lower()
+
+
+def _indice_hash(valor, dimensoes):
+    # crc32 é estável entre processos, ao contrário de hash()
+    return zlib.crc32(valor.encode()) % dimensoes
+
+
+class _Vetorizador:
+    """Monta a matriz de vetores normalizados dos pets"""
+    
+    def __init__(self):
+        self.categorias = {
+            'especie': [valor for valor, _ in Pet.ESPECIE_CHOICES],
+            'porte': [valor for valor, _ in Pet.PORTE_CHOICES],
+            'sexo': [valor for valor, _ in Pet.SEXO_CHOICES],
+        }
+        self.faixas = list(dict.fromkeys(faixa for idade in range(0, 121) for faixa in faixas_idade(idade)))
+        self.estados = sorted({estado for estado, in Pet.objects.values_list('estado').distinct()})
+        self.blocos = [
+            ('especie', len(self.categorias['especie'])),
+            ('porte', len(self.categorias['porte'])),
+            ('sexo', len(self.categorias['sexo'])),
+            ('idade', len(self.faixas)),
+            ('estado', max(len(self.estados), 1)),
+            ('cidade', DIMENSOES_CIDADE),
+            ('texto', DIMENSOES_TEXTO),
+        ]
+        self.inicio = {}
+        posicao = 0
+        for nome, tamanho in self.blocos:
+            self.inicio[nome] = posicao
+            posicao += tamanho
+        self.dimensoes = posicao
+    
+    def matriz(self, linhas):
+        matriz = np.zeros((len(linhas), self.dimensoes), dtype=np.float32)
+        estados = {estado: indice for indice, estado in enumerate(self.estados)}
+        for i, (_, especie, porte, sexo, idade_meses, cidade, estado, descricao, historia) in enumerate(linhas):
+            for nome, valor in (('especie', especie), ('porte', porte), ('sexo', sexo)):
+                if valor in self.categorias[nome]:
+                    matriz[i, self.inicio[nome] + self.categorias[nome].index(valor)] = 1
+            for faixa in faixas_idade(idade_meses):
+                matriz[i, self.inicio['idade'] + self.faixas.index(faixa)] = 1
+            if estado in estados:
+                matriz[i, self.inicio['estado'] + estados[estado]] = 1
+            if cidade:
+                matriz[i, self.inicio['cidade'] + _indice_hash(_normalizar_texto(cidade).strip(), DIMENSOES_CIDADE)] = 1
+            for palavra in _PALAVRA.findall(_normalizar_texto(f'{descricao} {historia or ""}')):
+                matriz[i, self.inicio['texto'] + _indice_hash(palavra, DIMENSOES_TEXTO)] += 1
+        
+        for nome, tamanho in self.blocos:
+            bloco = matriz[:, self.inicio[nome]:self.inicio[nome] + tamanho]
+            normas = np.linalg.norm(bloco, axis=1, keepdims=True)
+            np.divide(bloco, normas, out=bloco, where=normas > 0)
+            bloco *= PESOS[nome]
+        return matriz
+
+
+def _linhas(pets):
+    """(linhas do vetor, máscara de candidatos, vizinhos atuais) dos pets, em ordem de id"""
+    linhas = []
+    atuais = {}
+    disponiveis = []
+    for linha in pets.order_by('id').values_list(
+        *CAMPOS_VETOR, 'status_adocao', 'semelhantes'
+    ).iterator(chunk_size=2000):
+        linhas.append(linha[:len(CAMPOS_VETOR)])
+        disponiveis.append(linha[-2] == 'Disponível')
+        atuais[linha[0]] = linha[-1] or []
+    return linhas, np.array(disponiveis, dtype=bool), atuais
+
+
+class _Indice:
+    """Vetores dos pets aprovados, mantidos entre as atualizações incrementais"""
+    
+    def __init__(self):
+        self.vetorizador = _Vetorizador()
+        linhas, self.candidatos, self.atuais = _linhas(Pet.objects.filter(status_anuncio='Aprovado'))
+        self.ids = np.array([linha[0] for linha in linhas], dtype=np.int64)
+        self.matriz = self.vetorizador.matriz(linhas)
+        self.construido_em = time.monotonic()
+    
+    def recarregar(self, pet_ids):
+        """
+        Troca as linhas dos pets informados pelos dados atuais do banco.
+        Devolve False se algum deles estiver num estado que o vetorizador não
+        conhece (o índice precisa ser montado do zero).
+        """
+        linhas, candidatos, atuais = _linhas(Pet.objects.filter(pk__in=pet_ids, status_anuncio='Aprovado'))
+        estados = set(self.vetorizador.estados)
+        if any(linha[6] not in estados for linha in linhas):
+            return False
+        manter = ~np.isin(self.ids, list(pet_ids))
+        ids = np.concatenate([self.ids[manter], np.array([linha[0] for linha in linhas], dtype=np.int64)])
+        # As linhas ficam em ordem de id, que desfaz os empates em _vizinhos
+        ordem = np.argsort(ids, kind='stable')
+        self.ids = ids[ordem]
+        self.matriz = np.concatenate([self.matriz[manter], self.vetorizador.matriz(linhas)])[ordem]
+        self.candidatos = np.concatenate([self.candidatos[manter], candidatos])[ordem]
+        for pet_id in pet_ids:
+            self.atuais.pop(pet_id, None)
+        self.atuais.update(atuais)
+        return True
+
+
+_indice = None
+_lock = threading.Lock()
+
+
+def intervalo_reconstrucao():
+    return getattr(settings, 'SEMELHANTES_RECONSTRUIR_SEGUNDOS', 10 * 60)
+
+
+def _obter_indice(pet_ids):
+    """Índice com as linhas dos pets informados em dia; chamar com _lock"""
+    global _indice
+    if _indice is not None and time.monotonic() - _indice.construido_em <= intervalo_reconstrucao():
+        if _indice.recarregar(pet_ids):
+            return _indice
+    _indice = _Indice()
+    return _indice
+
+
+def descartar():
+    """Força a montagem da matriz na próxima atualização"""
+    global _indice
+    _indice = None
+
+
+def _vizinhos(linhas, ids, matriz, candidatos, k):
+    """Top-k (ids) entre os candidatos para cada linha informada"""
+    resultado = {}
+    for inicio in range(0, len(linhas), LINHAS_POR_BLOCO):
+        bloco = linhas[inicio:inicio + LINHAS_POR_BLOCO]
+        similaridades = matriz[bloco] @ matriz.T
+        similaridades[:, ~candidatos] = -np.inf
+        similaridades[np.arange(len(bloco)), bloco] = -np.inf
+        quantidade = min(k, int(candidatos.sum()))
+        if quantidade == 0:
+            for linha in bloco:
+                resultado[int(ids[linha])] = []
+            continue
+        # Similaridade do K-ésimo colocado; empates são desfeitos pelo id,
+        # para o cálculo incremental e o completo darem o mesmo resultado
+        limites = -np.partition(-similaridades, quantidade - 1, axis=1)[:, quantidade - 1]
+        for posicao, linha in enumerate(bloco):
+            linha_similaridades = similaridades[posicao]
+            escolhidos = np.flatnonzero(
+                (linha_similaridades >= limites[posicao]) & np.isfinite(linha_similaridades)
+            )
+            ordem = escolhidos[np.lexsort((escolhidos, -linha_similaridades[escolhidos]))][:quantidade]
+            resultado[int(ids[linha])] = [int(ids[vizinho]) for vizinho in ordem]
+    return resultado
+
+
+def _gravar(novos, atuais):
+    """Grava só as listas que mudaram; devolve quantas foram gravadas"""
+    alterados = [
+        Pet(pk=pet_id, semelhantes=lista)
+        for pet_id, lista in novos.items()
+        if atuais.get(pet_id) != lista
+    ]
+    Pet.objects.bulk_update(alterados, ['semelhantes'], batch_size=LOTE_GRAVACAO)
+    atuais.update((pet.pk, pet.semelhantes) for pet in alterados)
+    return len(alterados)
+
+
+def recalcular_todos(k=K_SEMELHANTES):
+    """Recalcula as listas de todos os pets aprovados"""
+    global _indice
+    with _lock:
+        _indice = indice = _Indice()
+        novos = _vizinhos(np.arange(len(indice.ids)), indice.ids, indice.matriz, indice.candidatos, k)
+        # Pets que deixaram de ser aprovados não mostram mais vizinhos
+        Pet.objects.exclude(status_anuncio='Aprovado').exclude(semelhantes=[]).update(semelhantes=[])
+        return _gravar(novos, indice.atuais)
+
+
+def atualizar(pet_ids, k=K_SEMELHANTES):
+    """Atualização incremental depois de mudanças nos pets informados"""
+    pet_ids = set(pet_ids)
+    Pet.objects.filter(pk__in=pet_ids).exclude(status_anuncio='Aprovado').exclude(
+        semelhantes=[]
+    ).update(semelhantes=[])
+    
+    with _lock:
+        indice = _obter_indice(pet_ids)
+        ids, matriz, atuais, candidatos = indice.ids, indice.matriz, indice.atuais, indice.candidatos
+        if not len(ids):
+            return 0
+        posicoes = {int(pet_id): posicao for posicao, pet_id in enumerate(ids)}
+        
+        afetadas = {posicoes[pet_id] for pet_id in pet_ids if pet_id in posicoes}
+        # Listas que contêm algum pet alterado (saiu, mudou de status ou de texto)
+        afetadas.update(
+            posicoes[pet_id] for pet_id, lista in atuais.items()
+            if pet_id in posicoes and pet_ids.intersection(lista)
+        )
+        
+        # Listas em que um pet alterado disponível entra entre os K mais próximos
+        alterados_candidatos = [posicoes[pet_id] for pet_id in pet_ids if pet_id in posicoes and candidatos[posicoes[pet_id]]]
+        if alterados_candidatos:
+            similaridades = matriz @ matriz[alterados_candidatos].T
+            # Similaridade com o K-ésimo vizinho atual (listas incompletas aceitam qualquer um)
+            ultimo = np.array([
+                posicoes.get(atuais[int(pet_id)][-1], -1) if len(atuais[int(pet_id)]) >= k else -1
+                for pet_id in ids
+            ])
+            limite = np.full(len(ids), -np.inf, dtype=np.float32)
+            completas = ultimo >= 0
+            limite[completas] = np.einsum('ij,ij->i', matriz[completas], matriz[ultimo[completas]])
+            entram = (similaridades >= limite[:, None]).any(axis=1)
+            entram[alterados_candidatos] = False
+            afetadas.update(np.flatnonzero(entram).tolist())
+        
+        if not afetadas:
+            return 0
+        novos = _vizinhos(np.array(sorted(afetadas)), ids, matriz, candidatos, k)
+        return _gravar(novos, atuais)
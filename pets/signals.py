@@ -0,0 +1,210 @@
+from collections import defaultdict
+from functools import wraps
+
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import cidades, estatisticas
+from .cache import incrementar_geracao_catalogo
+from .models import CAMPOS_SEMELHANCA, Pet, FotoPet, CandidaturaAdocao
+
+Usuario = get_user_model()
+
+
+def _incrementos(contadores):
+    return {campo: F(campo) + valor for campo, valor in (contadores or {}).items() if valor}
+
+
+def tocar_pets(contadores=None, **filtros):
+    """
+    Atualiza o data_atualizacao dos pets filtrados sem passar pelo save(),
+    invalidando os cards em cache que dependem de dados fora da tabela pet.
+    
+    contadores ({campo: n}) são somados no mesmo UPDATE.
+    """
+    Pet.objects.filter(**filtros).update(data_atualizacao=timezone.now(), **_incrementos(contadores))
+    incrementar_geracao_catalogo()
+
+
+def receptor_pet(*sinais):
+    """
+    Conecta o receptor aos sinais do Pet e dos proxies (PetPendente).
+
+    O Django envia os sinais de um proxy com o próprio proxy como sender,
+    e não para os receptores registrados com sender=Pet; por isso o
+    receptor é conectado sem sender e filtra as subclasses de Pet.
+    """
+    def decorator(funcao):
+        @wraps(funcao)
+        def receptor(sender, **kwargs):
+            if issubclass(sender, Pet):
+                return funcao(sender, **kwargs)
+        for sinal in sinais:
+            sinal.connect(receptor, weak=False, dispatch_uid=f'{funcao.__module__}.{funcao.__name__}')
+        return receptor
+    return decorator
+
+
+def incrementar_contadores(pet_id, **contadores):
+    """Soma os valores aos contadores do pet com um UPDATE atômico"""
+    incrementos = _incrementos(contadores)
+    if incrementos:
+        Pet.objects.filter(pk=pet_id).update(**incrementos)
+
+
+def somar_fotos(quantidades):
+    """
+    Soma {pet_id: n} ao num_fotos dos pets, para inserções em lote que não
+    disparam o post_save; pets com o mesmo n compartilham o UPDATE.
+    """
+    por_quantidade = defaultdict(list)
+    for pet_id, quantidade in quantidades.items():
+        if quantidade:
+            por_quantidade[quantidade].append(pet_id)
+    for quantidade, pet_ids in por_quantidade.items():
+        Pet.objects.filter(pk__in=pet_ids).update(num_fotos=F('num_fotos') + quantidade)
+
+
+def _afeta_semelhantes(instance, created, removido):
+    """Se a mudança pode alterar alguma lista de semelhantes"""
+    anterior = None if created else getattr(instance, '_semelhanca_original', None)
+    atual = instance.dados_semelhanca()
+    instance._semelhanca_original = atual
+    if created:
+        return instance.is_aprovado()
+    if anterior is None:
+        # Valores lidos do banco desconhecidos: recalcula por garantia
+        return True
+    aprovado = CAMPOS_SEMELHANCA.index('status_anuncio')
+    if removido:
+        return anterior[aprovado] == 'Aprovado'
+    # Só os pets aprovados estão no índice
+    return anterior != atual and 'Aprovado' in (anterior[aprovado], atual[aprovado])
+
+
+@receptor_pet(post_save, post_delete)
+def pet_alterado(sender, instance, raw=False, created=False, signal=None, **kwargs):
+    """Aprovações, mudanças de status e edições alteram as páginas do catálogo"""
+    incrementar_geracao_catalogo()
+    if not raw and _afeta_semelhantes(instance, created, signal is post_delete):
+        from .tarefas import atualizar_semelhantes
+        atualizar_semelhantes.enfileirar([instance.pk])
+
+
+@receptor_pet(post_save)
+def pet_aprovado(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Pets que acabaram de ser aprovados entram nas estatísticas e geram alertas das buscas salvas"""
+    if raw or (not created and not hasattr(instance, '_status_anuncio_original')):
+        return
+    anterior = None if created else instance._status_anuncio_original
+    instance._status_anuncio_original = instance.status_anuncio
+    if anterior != 'Aprovado' and instance.is_aprovado():
+        estatisticas.registrar_pet(instance, aprovado=True)
+        if instance.is_disponivel():
+            from .tarefas import notificar_buscas_salvas
+            notificar_buscas_salvas.enfileirar([instance.pk])
+
+
+@receptor_pet(post_save)
+def pet_contabilizado(sender, instance, created, raw=False, **kwargs):
+    """Cadastros e adoções entram nas estatísticas diárias"""
+    if raw or (not created and not hasattr(instance, '_status_adocao_original')):
+        return
+    anterior = None if created else instance._status_adocao_original
+    instance._status_adocao_original = instance.status_adocao
+    adotado = anterior != 'Adotado' and instance.status_adocao == 'Adotado'
+    if created or adotado:
+        estatisticas.registrar_pet(instance, novo=created, adotado=adotado)
+
+
+@receptor_pet(post_save)
+def pet_indexado(sender, instance, created, raw=False, **kwargs):
+    """Ajusta o índice de cidades quando a cidade ou a disponibilidade mudam"""
+    if raw:
+        return
+    anterior = None if created else getattr(instance, '_cidade_indexada', None)
+    if not created and anterior is None:
+        # Valores originais desconhecidos: fica para a próxima reconstrução
+        return
+    atual = instance.cidade_indexada()
+    if anterior != atual:
+        if anterior and anterior[2]:
+            cidades.ajustar(anterior[0], anterior[1], -1)
+        if atual[2]:
+            cidades.ajustar(atual[0], atual[1], 1)
+    instance._cidade_indexada = atual
+
+
+@receptor_pet(post_delete)
+def pet_desindexado(sender, instance, **kwargs):
+    cidade, estado, disponivel = getattr(instance, '_cidade_indexada', None) or instance.cidade_indexada()
+    if disponivel:
+        cidades.ajustar(cidade, estado, -1)
+
+
+@receiver(post_save, sender=FotoPet)
+@receiver(post_delete, sender=FotoPet)
+def foto_alterada(sender, instance, signal, created=False, raw=False, **kwargs):
+    """Fotos novas, editadas ou removidas mudam a capa e o número de fotos do card"""
+    incremento = 0 if raw else 1 if created else -1 if signal is post_delete else 0
+    tocar_pets({'num_fotos': incremento}, pk=instance.pet_id)
+
+
+@receiver(post_save, sender=FotoPet)
+def foto_enviada(sender, instance, created, raw=False, **kwargs):
+    """Fotos novas são otimizadas em segundo plano"""
+    if created and not raw:
+        from .tarefas import otimizar_fotos
+        otimizar_fotos.enfileirar([instance.pk])
+
+
+@receiver(post_save, sender=CandidaturaAdocao)
+def candidatura_salva(sender, instance, created, raw=False, **kwargs):
+    """Mantém num_candidaturas e num_candidaturas_nao_lidas do pet"""
+    if raw:
+        return
+    if created:
+        incrementar_contadores(
+            instance.pet_id,
+            num_candidaturas=1,
+            num_candidaturas_nao_lidas=int(instance.is_nao_lida()),
+        )
+        estatisticas.registrar_candidatura(instance)
+    elif hasattr(instance, '_status_original'):
+        anterior = instance._status_original == 'Enviada'
+        incrementar_contadores(
+            instance.pet_id,
+            num_candidaturas_nao_lidas=int(instance.is_nao_lida()) - int(anterior),
+        )
+    instance._status_original = instance.status
+
+
+@receiver(post_delete, sender=CandidaturaAdocao)
+def candidatura_removida(sender, instance, **kwargs):
+    nao_lida = getattr(instance, '_status_original', instance.status) == 'Enviada'
+    incrementar_contadores(
+        instance.pet_id,
+        num_candidaturas=-1,
+        num_candidaturas_nao_lidas=-int(nao_lida),
+    )
+
+
+@receiver(pre_save, sender=Usuario)
+def guardar_verificacao_original(sender, instance, using, update_fields=None, **kwargs):
+    """Guarda o valor anterior de verificado para detectar a mudança no post_save"""
+    if instance.pk is None or (update_fields is not None and 'verificado' not in update_fields):
+        instance._verificado_original = instance.verificado
+        return
+    instance._verificado_original = (
+        Usuario.objects.using(using).filter(pk=instance.pk).values_list('verificado', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Usuario)
+def verificacao_alterada(sender, instance, created, **kwargs):
+    """O selo de verificado aparece nos cards de todos os pets do doador"""
+    if not created and getattr(instance, '_verificado_original', None) != instance.verificado:
+        tocar_pets(doador=instance)
@@ -0,0 +1,200 @@
+"""
+Sitemap e feed Atom dos pets disponíveis.
+
+O sitemap é dividido em segmentos por faixa de id (SITEMAP_URLS_POR_SEGMENTO
+ids por segmento), então um pet novo ou removido só muda o segmento da sua
+faixa. O índice lista os segmentos com a maior data_atualizacao de cada um,
+calculada com uma única consulta agrupada.
+
+Os documentos são gerados lendo só (id, data_atualizacao) com values_list()
+e iterator(), e enviados em streaming. Ao terminar, o conteúdo completo é
+guardado no cache compartilhado do catálogo (o mesmo da geração, visto por
+todos os workers) com uma chave que inclui a geração; qualquer alteração em
+pets ou fotos, feita em qualquer processo, muda a geração e os documentos
+são refeitos uma vez na próxima requisição.
+
+O Last-Modified das respostas é o da última alteração do catálogo: um pet
+adotado ou arquivado sai dos documentos sem aumentar a maior
+data_atualizacao dos que ficam.
+"""
+from urllib.parse import urljoin
+from xml.sax.saxutils import escape, quoteattr
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import F, Max, OuterRef, Subquery
+from django.urls import reverse
+from django.utils import timezone
+
+from .cache import cache_catalogo, estado_catalogo, geracao_catalogo, resumo
+from .models import Pet, FotoPet
+
+SITEMAP_TIMEOUT = 60 * 60 * 24
+TAMANHO_LOTE = 2000
+FEED_ITENS = 50
+
+# Id fictício usado para montar o caminho dos pets uma única vez
+_ID_MODELO = 999999999
+
+
+def urls_por_segmento():
+    return getattr(settings, 'SITEMAP_URLS_POR_SEGMENTO', 5000)
+
+
+def _disponiveis():
+    return Pet.objects.filter(status_anuncio='Aprovado', status_adocao='Disponível')
+
+
+def _data_iso(data):
+    return data.isoformat(timespec='seconds')
+
+
+def _modelo_url_pet(url_base):
+    """'https://host/{}/' para formatar com o id, sem um reverse() por pet"""
+    caminho = reverse('pets:pet_detail', args=[_ID_MODELO])
+    return url_base + caminho.replace(str(_ID_MODELO), '{}')
+
+
+def _chave(documento, url_base):
+    return f'pets:sitemap:{geracao_catalogo()}:{documento}:{resumo(url_base)}'
+
+
+def _streaming_com_cache(chave, partes):
+    """
+    Devolve um gerador com os bytes do documento.
+
+    Se o documento estiver no cache ele é enviado de uma vez; senão as partes
+    são enviadas conforme geradas e o resultado completo vai para o cache
+    (só se o envio terminar).
+    """
+    cache = cache_catalogo()
+    guardado = cache.get(chave)
+    if guardado is not None:
+        yield guardado
+        return
+    enviado = []
+    for parte in partes:
+        dados = parte.encode()
+        enviado.append(dados)
+        yield dados
+    cache.set(chave, b''.join(enviado), SITEMAP_TIMEOUT)
+
+
+def segmentos():
+    """{número do segmento: maior data_atualizacao}, guardado por geração do catálogo"""
+    cache = cache_catalogo()
+    chave = f'pets:sitemap:{geracao_catalogo()}:segmentos'
+    resultado = cache.get(chave)
+    if resultado is None:
+        resultado = dict(
+            _disponiveis().order_by()
+            .annotate(segmento=F('id') / urls_por_segmento())
+            .values('segmento')
+            .annotate(ultima=Max('data_atualizacao'))
+            .values_list('segmento', 'ultima')
+        )
+        cache.set(chave, resultado, SITEMAP_TIMEOUT)
+    return resultado
+
+
+def ultima_alteracao():
+    """Maior data_atualizacao entre os pets disponíveis (None se não houver)"""
+    return max(segmentos().values(), default=None)
+
+
+def alterado_em():
+    """Momento da última alteração do catálogo, para o Last-Modified"""
+    return estado_catalogo()[1]
+
+
+def _partes_indice(url_base):
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    )
+    for numero, ultima in sorted(segmentos().items()):
+        loc = url_base + reverse('pets:sitemap_segmento', args=[numero])
+        yield f'<sitemap><loc>{escape(loc)}</loc><lastmod>{_data_iso(ultima)}</lastmod></sitemap>\n'
+    yield '</sitemapindex>\n'
+
+
+def gerar_indice(url_base):
+    return _streaming_com_cache(_chave('indice', url_base), _partes_indice(url_base))
+
+
+def _partes_segmento(numero, url_base):
+    modelo = _modelo_url_pet(url_base)
+    tamanho = urls_por_segmento()
+    linhas = (
+        _disponiveis()
+        .filter(id__gte=numero * tamanho, id__lt=(numero + 1) * tamanho)
+        .order_by('id')
+        .values_list('id', 'data_atualizacao')
+        .iterator(chunk_size=TAMANHO_LOTE)
+    )
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    )
+    lote = []
+    for pet_id, data_atualizacao in linhas:
+        lote.append(
+            f'<url><loc>{escape(modelo.format(pet_id))}</loc>'
+            f'<lastmod>{_data_iso(data_atualizacao)}</lastmod></url>\n'
+        )
+        if len(lote) >= TAMANHO_LOTE:
+            yield ''.join(lote)
+            lote = []
+    yield ''.join(lote)
+    yield '</urlset>\n'
+
+
+def gerar_segmento(numero, url_base):
+    return _streaming_com_cache(_chave(f'segmento:{numero}', url_base), _partes_segmento(numero, url_base))
+
+
+def _partes_feed(url_base):
+    modelo = _modelo_url_pet(url_base)
+    url_feed = url_base + reverse('pets:feed_novos_pets')
+    capa = FotoPet.objects.filter(pet=OuterRef('pk')).order_by('ordem', 'data_upload').values('imagem')[:1]
+    linhas = (
+        _disponiveis()
+        .annotate(capa=Subquery(capa))
+        .order_by('-data_cadastro', '-id')
+        .values_list(
+            'id', 'nome', 'especie', 'cidade', 'estado', 'descricao',
+            'data_cadastro', 'data_atualizacao', 'capa',
+        )[:FEED_ITENS]
+        .iterator(chunk_size=FEED_ITENS)
+    )
+    atualizado = ultima_alteracao() or timezone.now()
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<feed xmlns="http://www.w3.org/2005/Atom" xml:lang="pt-BR">\n'
+        '<title>Meu Novo Amigo Pet - Novos pets para adoção</title>\n'
+        f'<id>{escape(url_feed)}</id>\n'
+        f'<link rel="self" href={quoteattr(url_feed)}/>\n'
+        f'<link rel="alternate" href={quoteattr(url_base + reverse("pets:pet_list"))}/>\n'
+        f'<updated>{_data_iso(atualizado)}</updated>\n'
+    )
+    for pet_id, nome, especie, cidade, estado, descricao, cadastro, atualizacao, imagem in linhas:
+        url = modelo.format(pet_id)
+        enclosure = (
+            f'<link rel="enclosure" href={quoteattr(urljoin(url_base, default_storage.url(imagem)))}/>'
+            if imagem else ''
+        )
+        yield (
+            '<entry>'
+            f'<id>{escape(url)}</id>'
+            f'<title>{escape(f"{nome} ({especie}) - {cidade}/{estado}")}</title>'
+            f'<link rel="alternate" href={quoteattr(url)}/>{enclosure}'
+            f'<published>{_data_iso(cadastro)}</published>'
+            f'<updated>{_data_iso(atualizacao)}</updated>'
+            f'<summary>{escape(descricao)}</summary>'
+            '</entry>\n'
+        )
+    yield '</feed>\n'
+
+
+def gerar_feed(url_base):
+    return _streaming_com_cache(_chave('feed', url_base), _partes_feed(url_base))
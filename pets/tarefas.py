@@ -0,0 +1,107 @@
+import hashlib
+import io
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from tarefas.fila import tarefa
+from . import semelhantes
+from .models import FotoPet, Pet, BuscaSalva, AlertaBuscaSalva
+from .signals import tocar_pets
+
+# Tamanho dos lotes de alertas gravados com bulk_create
+LOTE_ALERTAS = 1000
+
+# Maior lado das fotos depois do processamento
+LADO_MAXIMO_FOTO = 1600
+QUALIDADE_JPEG = 85
+
+
+def _otimizar_imagem(conteudo):
+    """
+    Aplica a orientação do EXIF e reduz a imagem para LADO_MAXIMO_FOTO.
+
+    Devolve (bytes, extensão) ou None quando a imagem já está adequada.
+    """
+    with Image.open(conteudo) as original:
+        rotacionar = original.getexif().get(0x0112, 1) != 1
+        reduzir = max(original.size) > LADO_MAXIMO_FOTO
+        if not (rotacionar or reduzir):
+            return None
+        formato = original.format
+        imagem = ImageOps.exif_transpose(original)
+        imagem.thumbnail((LADO_MAXIMO_FOTO, LADO_MAXIMO_FOTO), Image.LANCZOS)
+    
+    saida = io.BytesIO()
+    if formato == 'PNG' or imagem.mode in ('RGBA', 'LA', 'P'):
+        imagem.save(saida, 'PNG', optimize=True)
+        extensao = '.png'
+    else:
+        imagem.convert('RGB').save(saida, 'JPEG', quality=QUALIDADE_JPEG, optimize=True, progressive=True)
+        extensao = '.jpg'
+    return saida.getvalue(), extensao
+
+
+@tarefa(prioridade=1)
+def otimizar_fotos(foto_ids):
+    """Corrige a orientação e reduz as fotos enviadas pelos doadores"""
+    pets_alterados = set()
+    for foto_id, pet_id, caminho in FotoPet.objects.filter(pk__in=foto_ids).values_list('id', 'pet_id', 'imagem'):
+        if not caminho or not default_storage.exists(caminho):
+            continue
+        try:
+            with default_storage.open(caminho) as conteudo:
+                resultado = _otimizar_imagem(conteudo)
+        except (UnidentifiedImageError, OSError):
+            continue
+        if resultado is None:
+            continue
+        
+        dados, extensao = resultado
+        # Mesmo esquema de nome do caminho_foto_pet: o hash muda com o conteúdo
+        nome = f'pets/fotos/{hashlib.sha256(dados).hexdigest()[:20]}{extensao}'
+        novo_caminho = default_storage.save(nome, ContentFile(dados))
+        
+        # update() condicional: não sobrescreve uma troca de imagem feita
+        # enquanto a tarefa rodava e não dispara os signals do FotoPet
+        if FotoPet.objects.filter(pk=foto_id, imagem=caminho).update(imagem=novo_caminho):
+            if not FotoPet.objects.filter(imagem=caminho).exists():
+                default_storage.delete(caminho)
+            pets_alterados.add(pet_id)
+        else:
+            default_storage.delete(novo_caminho)
+    
+    if pets_alterados:
+        tocar_pets(pk__in=pets_alterados)
+
+
+@tarefa(prioridade=3)
+def notificar_buscas_salvas(pet_ids):
+    """Cria os alertas das buscas salvas compatíveis com pets recém-aprovados"""
+    pets = Pet.objects.filter(
+        pk__in=pet_ids,
+        status_anuncio='Aprovado',
+        status_adocao='Disponível',
+    ).select_related('doador')
+    for pet in pets:
+        # Consulta pelo índice de chave: só as buscas que podem incluir o pet
+        buscas = BuscaSalva.objects.filter(
+            chave__in=BuscaSalva.chaves_para_pet(pet)
+        ).exclude(usuario_id=pet.doador_id).only('id', 'usuario_id', 'cidade', 'apenas_verificados').order_by()
+        lote = []
+        for busca in buscas.iterator(chunk_size=LOTE_ALERTAS):
+            if not busca.aceita(pet):
+                continue
+            lote.append(AlertaBuscaSalva(usuario_id=busca.usuario_id, busca_id=busca.pk, pet=pet))
+            if len(lote) >= LOTE_ALERTAS:
+                AlertaBuscaSalva.objects.bulk_create(lote, ignore_conflicts=True)
+                lote = []
+        if lote:
+            AlertaBuscaSalva.objects.bulk_create(lote, ignore_conflicts=True)
+
+
+@tarefa
+def atualizar_semelhantes(pet_ids):
+    """Atualiza as listas de pets semelhantes afetadas pelos pets informados"""
+    semelhantes.atualizar(pet_ids)
@@ -0,0 +1,655 @@
+"""
+Testes do app pets.
+
+Planos de consulta das páginas mais acessadas:
+
+CONSULTAS_CRITICAS liga um nome a uma função que executa o código real de
+uma página (a view, o serviço do chat ou a função que monta o queryset).
+O teste captura os SELECTs executados e roda EXPLAIN QUERY PLAN em cada um:
+falha se algum plano ler uma tabela inteira (SCAN) ou ordenar numa árvore
+temporária (USE TEMP B-TREE), o que indica que falta um índice para o
+filtro ou a ordenação.
+
+Os planos não dependem da quantidade de linhas (o SQLite só usa
+estatísticas depois de um ANALYZE), então poucas linhas bastam para que
+todas as consultas, inclusive os prefetches, sejam executadas.
+"""
+import io
+import shutil
+import tempfile
+import time
+import zipfile
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from PIL import Image
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from chat_ai.models import InteracaoChatIA
+from chat_ai.services import ChatIAService
+from chat_ai.views import historico_usuario
+from meu_novo_amigo_pet.cache_sqlite import SQLiteCache
+from tarefas.models import Tarefa
+
+from . import cidades, estatisticas, semelhantes, sitemap
+from .admin import aprovar_pets
+from .arquivo import arquivar_lote, arquivar_pets
+from .cache import CHAVE_ALTERACAO, CHAVE_GERACAO, cache_catalogo, chave_card, geracao_catalogo
+from .contadores import recalcular_contadores
+from .importacao import ImportacaoPets
+from .models import (
+    Pet, PetPendente, FotoPet, CandidaturaAdocao, EstatisticaDiaria,
+    PetArquivado, FotoPetArquivada, CandidaturaArquivada,
+)
+from .views import PetListView, pets_destaque, candidaturas_recebidas
+
+# Operações que indicam um índice faltando
+LEITURA_COMPLETA = 'SCAN '
+ORDENACAO_TEMPORARIA = 'USE TEMP B-TREE'
+
+# Consultas em que a ordenação numa árvore temporária é aceita
+ORDENACAO_ACEITA = {
+    # As candidaturas vêm de uma busca no índice para cada pet do doador;
+    # sem o doador na candidatura não há índice que já entregue as de todos
+    # os pets por data, e a ordenação é só das linhas desse doador
+    'candidaturas_recebidas',
+}
+
+
+def _listagem(**parametros):
+    """Busca pública com os filtros da querystring: contagem do paginador e primeira página"""
+    def executar(dados):
+        view = PetListView()
+        view.setup(RequestFactory().get('/pets/', parametros))
+        queryset = view.get_queryset()
+        queryset.count()
+        list(queryset[:PetListView.paginate_by])
+    return executar
+
+
+def _chat(mensagem):
+    """Sugestões do chat para a mensagem, com as preferências que ela gera"""
+    def executar(dados):
+        servico = ChatIAService()
+        preferencias = servico._extrair_preferencias_pet(mensagem)
+        servico._buscar_pets_compatíveis(preferencias, dados['adotante'])
+    return executar
+
+
+CONSULTAS_CRITICAS = {
+    'listagem': _listagem(),
+    'listagem_mais_vistos': _listagem(ordenacao='mais_vistos'),
+    'listagem_especie': _listagem(especie='Cão'),
+    'listagem_especie_estado': _listagem(especie='Gato', estado='SP'),
+    'listagem_estado_idade': _listagem(estado='SP', idade='0-6'),
+    'listagem_completa': _listagem(especie='Cão', porte='Pequeno', sexo='Fêmea', estado='SP', cidade='Campinas'),
+    'home_destaques': lambda dados: list(pets_destaque()),
+    'chat_sugestoes': _chat('quero um cachorro'),
+    'chat_sugestoes_porte': _chat('quero um cachorro pequeno'),
+    'chat_sugestoes_idade': _chat('procuro um gato filhote'),
+    'candidaturas_recebidas': lambda dados: list(candidaturas_recebidas(dados['doador'])),
+    'historico_chat': lambda dados: list(historico_usuario(dados['adotante'])),
+}
+
+
+class PlanoConsultaTests(TestCase):
+    """Nenhuma consulta crítica pode ler uma tabela inteira ou ordenar sem índice"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        Usuario = get_user_model()
+        doador = Usuario.objects.create_user(
+            email='doador@exemplo.com', username='doador', nome='Doador', password='senha-teste-123',
+        )
+        adotante = Usuario.objects.create_user(
+            email='adotante@exemplo.com', username='adotante', nome='Adotante', password='senha-teste-123',
+            cidade='Campinas', estado='SP',
+        )
+        pets = [
+            Pet.objects.create(
+                doador=doador, nome=f'Pet {indice}', especie=especie, porte=porte, sexo='Fêmea',
+                idade_meses=indice * 4, descricao='Pet de teste', cidade='Campinas', estado='SP',
+                status_anuncio='Aprovado',
+            )
+            for indice, (especie, porte) in enumerate(
+                [('Cão', 'Pequeno'), ('Cão', 'Médio'), ('Gato', 'Pequeno'), ('Gato', 'Grande')], start=1,
+            )
+        ]
+        # Fotos em mais de um pet para o prefetch buscar vários pets de uma vez
+        for pet in pets[:2]:
+            FotoPet.objects.create(pet=pet, imagem='pets/teste.jpg')
+        CandidaturaAdocao.objects.create(pet=pets[0], candidato=adotante, respostas_formulario={})
+        InteracaoChatIA.objects.create(
+            usuario=adotante, mensagem_usuario='Olá', resposta_ia='Olá!', contexto='InformacaoGeral',
+        )
+        cls.dados = {'doador': doador, 'adotante': adotante}
+    
+    def planos(self, executar):
+        """[(sql, [linhas do plano])] de cada SELECT executado"""
+        with CaptureQueriesContext(connection) as capturadas:
+            executar(self.dados)
+        resultado = []
+        with connection.cursor() as cursor:
+            for consulta in capturadas.captured_queries:
+                sql = consulta['sql']
+                if not sql.lstrip().upper().startswith('SELECT'):
+                    continue
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                resultado.append((sql, [linha[-1] for linha in cursor.fetchall()]))
+        return resultado
+    
+    def test_consultas_criticas_usam_indices(self):
+        for nome, executar in CONSULTAS_CRITICAS.items():
+            with self.subTest(consulta=nome):
+                proibidas = (LEITURA_COMPLETA,)
+                if nome not in ORDENACAO_ACEITA:
+                    proibidas += (ORDENACAO_TEMPORARIA,)
+                planos = self.planos(executar)
+                self.assertTrue(planos, 'Nenhuma consulta executada')
+                for sql, plano in planos:
+                    ruins = [linha for linha in plano if linha.startswith(proibidas)]
+                    self.assertFalse(ruins, f'{sql}\n' + '\n'.join(plano))
+
+
+def limpar_caches():
+    cache.clear()
+    cache_catalogo().clear()
+
+
+def criar_usuario(email, **campos):
+    return get_user_model().objects.create_user(
+        email=email, username=email, nome=email.split('@')[0], password='senha-teste-123', **campos,
+    )
+
+
+def criar_pet(doador, **campos):
+    dados = {
+        'nome': 'Rex', 'especie': 'Cão', 'porte': 'Médio', 'sexo': 'Macho', 'idade_meses': 12,
+        'descricao': 'Pet de teste', 'cidade': 'Campinas', 'estado': 'SP', 'status_anuncio': 'Aprovado',
+    }
+    dados.update(campos)
+    return Pet.objects.create(doador=doador, **dados)
+
+
+class GetCondicionalTests(TestCase):
+    """Validadores da busca e do início vêm da geração do catálogo"""
+    
+    def setUp(self):
+        limpar_caches()
+        self.doador = criar_usuario('doador@exemplo.com')
+        self.pet = criar_pet(self.doador)
+        # Última alteração um minuto atrás, para o If-Modified-Since não cair
+        # no mesmo segundo da próxima alteração
+        cache_catalogo().set(CHAVE_ALTERACAO, time.time() - 60, None)
+    
+    def test_revalidacao_sem_consultas(self):
+        resposta = self.client.get('/buscar/')
+        self.assertEqual(resposta.status_code, 200)
+        with self.assertNumQueries(0):
+            resposta = self.client.get('/buscar/', HTTP_IF_NONE_MATCH=resposta['ETag'])
+        self.assertEqual(resposta.status_code, 304)
+        # Página em cache: sem consultas também para o validador
+        with self.assertNumQueries(0):
+            resposta = self.client.get('/buscar/')
+        self.assertEqual(resposta['X-Cache'], 'HIT')
+    
+    def test_adocao_invalida_validadores(self):
+        antes = self.client.get('/buscar/')
+        self.pet.status_adocao = 'Adotado'
+        self.pet.save()
+        por_etag = self.client.get('/buscar/', HTTP_IF_NONE_MATCH=antes['ETag'])
+        self.assertEqual(por_etag.status_code, 200)
+        self.assertNotContains(por_etag, self.pet.nome)
+        por_data = self.client.get('/buscar/', HTTP_IF_MODIFIED_SINCE=antes['Last-Modified'])
+        self.assertEqual(por_data.status_code, 200)
+    
+    def test_alteracao_em_outro_processo_invalida_validadores(self):
+        antes = self.client.get('/buscar/')
+        home = self.client.get('/')
+        outro_processo = SQLiteCache(settings.CACHES['compartilhado']['LOCATION'], {})
+        outro_processo.incr(CHAVE_GERACAO)
+        outro_processo.set(CHAVE_ALTERACAO, time.time(), None)
+        self.assertEqual(self.client.get('/buscar/', HTTP_IF_NONE_MATCH=antes['ETag']).status_code, 200)
+        self.assertEqual(self.client.get('/buscar/', HTTP_IF_MODIFIED_SINCE=antes['Last-Modified']).status_code, 200)
+        self.assertEqual(self.client.get('/', HTTP_IF_NONE_MATCH=home['ETag']).status_code, 200)
+    
+    @override_settings(CATALOGO_CACHE_ALIAS='default')
+    def test_sem_validadores_com_geracao_local(self):
+        resposta = self.client.get('/buscar/')
+        self.assertNotIn('ETag', resposta)
+        self.assertNotIn('Last-Modified', resposta)
+        self.assertNotIn('ETag', self.client.get('/'))
+    
+    def test_home_muda_com_o_catalogo(self):
+        antes = self.client.get('/')
+        self.assertEqual(self.client.get('/', HTTP_IF_NONE_MATCH=antes['ETag']).status_code, 304)
+        criar_pet(self.doador, nome='Mia')
+        self.assertEqual(self.client.get('/', HTTP_IF_NONE_MATCH=antes['ETag']).status_code, 200)
+
+
+def imagem(tamanho=(300, 300), formato='JPEG'):
+    conteudo = io.BytesIO()
+    Image.new('RGB', tamanho, (200, 80, 40)).save(conteudo, formato)
+    return conteudo.getvalue()
+
+
+class ImportacaoFotosTests(TestCase):
+    """Fotos do ZIP seguem as regras das enviadas pelo formulário"""
+    
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        configuracao = override_settings(MEDIA_ROOT=self.media)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        self.doador = criar_usuario('doador@exemplo.com')
+    
+    def importar(self, fotos):
+        arquivo_zip = io.BytesIO()
+        with zipfile.ZipFile(arquivo_zip, 'w') as zip_fotos:
+            for nome, conteudo in fotos.items():
+                zip_fotos.writestr(nome, conteudo)
+        arquivo_zip.seek(0)
+        csv = (
+            'nome,especie,porte,sexo,idade_meses,descricao,cidade,estado,fotos\n'
+            f'Rex,Cão,Médio,Macho,12,Pet de teste,Campinas,SP,{";".join(fotos)};faltando.jpg\n'
+        )
+        return ImportacaoPets(self.doador, arquivo_zip).importar(io.BytesIO(csv.encode()), 'csv')
+    
+    def test_fotos_invalidas_viram_erros(self):
+        with mock.patch.object(Image, 'MAX_IMAGE_PIXELS', 100_000):
+            importacao = self.importar({
+                'valida.jpg': imagem(),
+                'pequena.jpg': imagem((50, 50)),
+                'gif.gif': imagem(formato='GIF'),
+                'texto.jpg': b'nao e imagem',
+                # Acima de 2x MAX_IMAGE_PIXELS: DecompressionBombError
+                'bomba.png': imagem((500, 500), 'PNG'),
+            })
+        self.assertEqual(importacao.importados, 1)
+        self.assertEqual(importacao.fotos_importadas, 1)
+        erros = dict((mensagem.split(':')[0], mensagem) for _, mensagem in importacao.erros)
+        self.assertEqual(
+            set(erros), {'Foto pequena.jpg', 'Foto gif.gif', 'Foto texto.jpg', 'Foto bomba.png', 'Foto faltando.jpg'},
+        )
+        self.assertIn('muito pequena', erros['Foto pequena.jpg'])
+        self.assertIn('muito grande', erros['Foto bomba.png'])
+        self.assertEqual(FotoPet.objects.count(), 1)
+
+
+class SinaisPetTests(TestCase):
+    """Os sinais do Pet também valem para os proxies (PetPendente)"""
+    
+    def setUp(self):
+        limpar_caches()
+        self.doador = criar_usuario('doador@exemplo.com')
+    
+    def test_aprovacao_pelo_proxy(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            pet = criar_pet(self.doador, status_anuncio='Pendente')
+        Tarefa.objects.all().delete()
+        geracao = geracao_catalogo()
+        pendente = PetPendente.objects.get(pk=pet.pk)
+        pendente.status_anuncio = 'Aprovado'
+        with mock.patch.object(cidades, 'ajustar') as ajustar, self.captureOnCommitCallbacks(execute=True):
+            pendente.save()
+        self.assertNotEqual(geracao_catalogo(), geracao)
+        self.assertEqual(
+            set(Tarefa.objects.values_list('nome', flat=True)),
+            {'pets.tarefas.notificar_buscas_salvas', 'pets.tarefas.atualizar_semelhantes'},
+        )
+        self.assertEqual(EstatisticaDiaria.objects.get().aprovacoes, 1)
+        ajustar.assert_called_once_with('Campinas', 'SP', 1)
+    
+    def test_remocao_pelo_proxy(self):
+        pet = criar_pet(self.doador, status_anuncio='Pendente')
+        geracao = geracao_catalogo()
+        PetPendente.objects.get(pk=pet.pk).delete()
+        self.assertNotEqual(geracao_catalogo(), geracao)
+
+
+class SemelhantesTests(TestCase):
+    """Recalcula os semelhantes só quando o vetor muda, sem montar a matriz inteira"""
+    
+    def setUp(self):
+        semelhantes.descartar()
+        self.addCleanup(semelhantes.descartar)
+        self.doador = criar_usuario('doador@exemplo.com')
+        textos = ['brincalhão e dócil', 'calmo e carinhoso', 'adora correr no parque', 'muito brincalhão']
+        self.pets = [
+            criar_pet(
+                self.doador, nome=f'Pet {indice}', especie=('Cão', 'Gato')[indice % 2],
+                idade_meses=3 + indice * 7, descricao=textos[indice % len(textos)],
+            )
+            for indice in range(10)
+        ]
+    
+    def tarefas_semelhantes(self):
+        return Tarefa.objects.filter(nome='pets.tarefas.atualizar_semelhantes').count()
+    
+    def test_so_edicoes_do_vetor_enfileiram_a_tarefa(self):
+        pet = Pet.objects.get(pk=self.pets[0].pk)
+        Tarefa.objects.all().delete()
+        pet.nome = 'Outro nome'
+        with self.captureOnCommitCallbacks(execute=True):
+            pet.save()
+        self.assertEqual(self.tarefas_semelhantes(), 0)
+        pet.descricao = 'Texto novo'
+        with self.captureOnCommitCallbacks(execute=True):
+            pet.save()
+        self.assertEqual(self.tarefas_semelhantes(), 1)
+    
+    def test_save_nao_sobrescreve_a_lista_gravada_pelo_worker(self):
+        pet = Pet.objects.get(pk=self.pets[0].pk)
+        semelhantes.recalcular_todos()
+        pet.nome = 'Outro nome'
+        pet.save()
+        pet.refresh_from_db()
+        self.assertEqual(len(pet.semelhantes), semelhantes.K_SEMELHANTES)
+    
+    def test_atualizacao_incremental_igual_ao_recalculo(self):
+        semelhantes.recalcular_todos()
+        indice = semelhantes._indice
+        alterado = Pet.objects.get(pk=self.pets[1].pk)
+        alterado.descricao = 'adora correr no parque'
+        alterado.save()
+        Pet.objects.filter(pk=self.pets[2].pk).update(status_adocao='Adotado')
+        removido = self.pets[3].pk
+        Pet.objects.filter(pk=removido).delete()
+        novo = criar_pet(self.doador, nome='Novo', descricao='calmo e carinhoso')
+        pet_ids = [alterado.pk, self.pets[2].pk, removido, novo.pk]
+        with mock.patch.object(semelhantes._Vetorizador, 'matriz', wraps=indice.vetorizador.matriz) as matriz:
+            semelhantes.atualizar(pet_ids)
+        # Só as linhas dos pets alterados foram vetorizadas de novo
+        self.assertIs(semelhantes._indice, indice)
+        self.assertEqual(len(matriz.call_args.args[0]), 3)
+        self.assertNotIn(removido, indice.ids)
+        # O recálculo completo não encontra nenhuma lista diferente
+        semelhantes.descartar()
+        self.assertEqual(semelhantes.recalcular_todos(), 0)
+
+
+class CachePaginaTests(TestCase):
+    """Páginas anônimas e cards em cache são trocados quando o catálogo muda"""
+    
+    def setUp(self):
+        limpar_caches()
+        self.doador = criar_usuario('doador@exemplo.com')
+        self.pet = criar_pet(self.doador)
+    
+    def test_pagina_anonima_invalidada_por_alteracoes_fora_do_save(self):
+        self.assertEqual(self.client.get('/buscar/')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/buscar/')['X-Cache'], 'HIT')
+        # Foto nova passa pelo sinal do FotoPet, não pelo save do Pet
+        FotoPet.objects.create(pet=self.pet, imagem='pets/teste.jpg')
+        self.assertEqual(self.client.get('/buscar/')['X-Cache'], 'MISS')
+        self.doador.verificado = True
+        self.doador.save()
+        self.assertEqual(self.client.get('/buscar/')['X-Cache'], 'MISS')
+    
+    def test_alteracao_em_outro_processo_invalida_a_pagina(self):
+        self.client.get('/buscar/')
+        self.assertEqual(self.client.get('/buscar/')['X-Cache'], 'HIT')
+        # Outro worker (ou o runworker): conexão própria ao mesmo cache compartilhado
+        outro_processo = SQLiteCache(settings.CACHES['compartilhado']['LOCATION'], {})
+        outro_processo.incr(CHAVE_GERACAO)
+        self.assertEqual(self.client.get('/buscar/')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/buscar/')['X-Cache'], 'HIT')
+    
+    def test_usuario_logado_nao_usa_o_cache(self):
+        self.client.get('/buscar/')
+        self.client.force_login(self.doador)
+        self.assertNotIn('X-Cache', self.client.get('/buscar/'))
+    
+    def test_card_muda_de_chave_com_o_pet(self):
+        antes = chave_card(Pet.objects.get(pk=self.pet.pk), 'grade')
+        FotoPet.objects.create(pet=self.pet, imagem='pets/teste.jpg')
+        depois_da_foto = chave_card(Pet.objects.get(pk=self.pet.pk), 'grade')
+        self.assertNotEqual(depois_da_foto, antes)
+        self.doador.verificado = True
+        self.doador.save()
+        self.assertNotEqual(chave_card(Pet.objects.get(pk=self.pet.pk), 'grade'), depois_da_foto)
+
+
+class SitemapTests(TestCase):
+    """Sitemap e feed guardados no cache compartilhado e refeitos quando o catálogo muda"""
+    
+    def setUp(self):
+        limpar_caches()
+        self.doador = criar_usuario('doador@exemplo.com')
+        self.pets = [criar_pet(self.doador, nome=f'Pet {indice}') for indice in range(2)]
+        cache_catalogo().set(CHAVE_ALTERACAO, time.time() - 60, None)
+    
+    def conteudo(self, resposta):
+        return b''.join(resposta.streaming_content).decode()
+    
+    def test_documentos_ficam_no_cache_compartilhado(self):
+        self.conteudo(self.client.get('/sitemap.xml'))
+        self.conteudo(self.client.get('/feed/novos-pets.atom'))
+        outro_processo = SQLiteCache(settings.CACHES['compartilhado']['LOCATION'], {})
+        for documento in ('indice', 'feed'):
+            self.assertIsNotNone(outro_processo.get(sitemap._chave(documento, 'http://testserver')), documento)
+    
+    def test_pet_adotado_sai_do_segmento_e_do_feed(self):
+        url = '/sitemap-pets-0.xml'
+        antes = self.client.get(url)
+        self.assertIn(f'/{self.pets[0].pk}/', self.conteudo(antes))
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=antes['Last-Modified']).status_code, 304)
+        self.pets[0].status_adocao = 'Adotado'
+        self.pets[0].save()
+        depois = self.client.get(url, HTTP_IF_MODIFIED_SINCE=antes['Last-Modified'])
+        self.assertEqual(depois.status_code, 200)
+        self.assertNotIn(f'/{self.pets[0].pk}/', self.conteudo(depois))
+        self.assertNotIn(f'/{self.pets[0].pk}/', self.conteudo(self.client.get('/feed/novos-pets.atom')))
+
+
+class ApiPetsTests(TestCase):
+    """API de busca: campos pedidos, paginação por cursor e pets fora do catálogo"""
+    
+    def setUp(self):
+        self.doador = criar_usuario('doador@exemplo.com')
+        self.pets = [criar_pet(self.doador, nome=f'Pet {indice}') for indice in range(5)]
+    
+    def test_cursor_percorre_todos_sem_repetir(self):
+        vistos = []
+        parametros = {'fields': 'id,nome', 'limite': 2}
+        while True:
+            dados = self.client.get('/api/pets/', parametros).json()
+            self.assertTrue(all(set(item) == {'id', 'nome'} for item in dados['results']))
+            vistos += [item['id'] for item in dados['results']]
+            if not dados['next_cursor']:
+                break
+            parametros['cursor'] = dados['next_cursor']
+        self.assertEqual(sorted(vistos), sorted(pet.pk for pet in self.pets))
+    
+    def test_pet_adotado_sai_dos_resultados(self):
+        self.pets[0].status_adocao = 'Adotado'
+        self.pets[0].save()
+        ids = [item['id'] for item in self.client.get('/api/pets/').json()['results']]
+        self.assertNotIn(self.pets[0].pk, ids)
+        self.assertEqual(len(ids), 4)
+    
+    def test_campo_invalido(self):
+        self.assertEqual(self.client.get('/api/pets/', {'fields': 'id,senha'}).status_code, 400)
+
+
+class ContadoresTests(TestCase):
+    """Contadores de candidaturas e fotos mantidos pelos sinais"""
+    
+    def setUp(self):
+        self.doador = criar_usuario('doador@exemplo.com')
+        self.adotante = criar_usuario('adotante@exemplo.com')
+        self.pet = criar_pet(self.doador)
+    
+    def contadores(self):
+        return Pet.objects.values_list('num_candidaturas', 'num_candidaturas_nao_lidas', 'num_fotos').get(pk=self.pet.pk)
+    
+    def test_candidaturas(self):
+        candidatura = CandidaturaAdocao.objects.create(pet=self.pet, candidato=self.adotante, respostas_formulario={})
+        self.assertEqual(self.contadores(), (1, 1, 0))
+        CandidaturaAdocao.objects.get(pk=candidatura.pk).marcar_como_visualizada()
+        self.assertEqual(self.contadores(), (1, 0, 0))
+        CandidaturaAdocao.objects.get(pk=candidatura.pk).delete()
+        self.assertEqual(self.contadores(), (0, 0, 0))
+    
+    def test_fotos(self):
+        foto = FotoPet.objects.create(pet=self.pet, imagem='pets/teste.jpg')
+        FotoPet.objects.create(pet=self.pet, imagem='pets/teste.jpg')
+        self.assertEqual(self.contadores(), (0, 0, 2))
+        foto.delete()
+        self.assertEqual(self.contadores(), (0, 0, 1))
+    
+    def test_save_de_instancia_antiga_nao_desfaz_incrementos(self):
+        antigo = Pet.objects.get(pk=self.pet.pk)
+        CandidaturaAdocao.objects.create(pet=self.pet, candidato=self.adotante, respostas_formulario={})
+        antigo.nome = 'Outro nome'
+        antigo.save()
+        self.assertEqual(self.contadores(), (1, 1, 0))
+    
+    def test_recalcular_corrige_divergencias(self):
+        CandidaturaAdocao.objects.create(pet=self.pet, candidato=self.adotante, respostas_formulario={})
+        outro = criar_pet(self.doador, nome='Mia')
+        Pet.objects.filter(pk=self.pet.pk).update(num_candidaturas=7, num_fotos=3)
+        self.assertEqual(recalcular_contadores(), 1)
+        self.assertEqual(self.contadores(), (1, 1, 0))
+        self.assertEqual(recalcular_contadores([self.pet.pk, outro.pk]), 0)
+
+
+class ArquivamentoTests(TestCase):
+    """Pets adotados ou rejeitados antigos vão para as tabelas de arquivo"""
+    
+    def setUp(self):
+        limpar_caches()
+        self.doador = criar_usuario('doador@exemplo.com')
+        self.adotante = criar_usuario('adotante@exemplo.com')
+        antigo = timezone.now() - timedelta(days=200)
+        self.adotado = criar_pet(self.doador, status_adocao='Adotado')
+        self.rejeitado = criar_pet(self.doador, nome='Mia', status_anuncio='Rejeitado')
+        self.recente = criar_pet(self.doador, nome='Bob', status_adocao='Adotado')
+        self.disponivel = criar_pet(self.doador, nome='Luna')
+        FotoPet.objects.create(pet=self.adotado, imagem='pets/teste.jpg')
+        CandidaturaAdocao.objects.create(pet=self.adotado, candidato=self.adotante, respostas_formulario={})
+        Pet.objects.filter(pk__in=[self.adotado.pk, self.rejeitado.pk, self.disponivel.pk]).update(
+            data_atualizacao=antigo,
+        )
+    
+    def test_arquiva_so_os_elegiveis(self):
+        geracao = geracao_catalogo()
+        self.assertEqual(arquivar_pets(dias=90, tamanho_lote=1), 2)
+        self.assertNotEqual(geracao_catalogo(), geracao)
+        self.assertEqual(
+            set(Pet.objects.values_list('pk', flat=True)), {self.recente.pk, self.disponivel.pk},
+        )
+        arquivado = PetArquivado.objects.get(pk=self.adotado.pk)
+        self.assertEqual((arquivado.num_candidaturas, arquivado.num_fotos), (1, 1))
+        self.assertEqual(FotoPetArquivada.objects.get().pet_id, self.adotado.pk)
+        self.assertEqual(CandidaturaArquivada.objects.get().pet_id, self.adotado.pk)
+        self.assertFalse(FotoPet.objects.exists())
+        self.assertFalse(CandidaturaAdocao.objects.exists())
+        self.assertTrue(PetArquivado.objects.filter(pk=self.rejeitado.pk).exists())
+    
+    def test_total_da_pagina_inicial_inclui_os_arquivados(self):
+        # Os aprovados: todos menos o rejeitado
+        self.assertEqual(self.client.get('/').context['stats']['total_pets'], 3)
+        arquivar_pets(dias=90)
+        self.assertEqual(self.client.get('/').context['stats']['total_pets'], 3)
+    
+    def test_lote_confere_de_novo_antes_de_arquivar(self):
+        # O pet voltou a ser alterado depois de selecionado
+        Pet.objects.filter(pk=self.adotado.pk).update(data_atualizacao=timezone.now())
+        self.assertEqual(arquivar_lote([self.adotado.pk], dias=90), 0)
+        self.assertTrue(Pet.objects.filter(pk=self.adotado.pk).exists())
+        self.assertFalse(PetArquivado.objects.exists())
+
+
+class EstatisticasTests(TestCase):
+    """Totais diários somados pelos sinais e recalculados por reconstruir()"""
+    
+    def setUp(self):
+        limpar_caches()
+        self.doador = criar_usuario('doador@exemplo.com')
+        self.adotante = criar_usuario('adotante@exemplo.com')
+    
+    def linhas(self):
+        return sorted(EstatisticaDiaria.objects.values_list(
+            'dia', 'estado', 'especie', 'novos', 'aprovacoes', 'adocoes', 'candidaturas', 'dias_ate_adocao',
+        ))
+    
+    def test_sinais_somam_e_reconstrucao_confere(self):
+        pendente = criar_pet(self.doador, status_anuncio='Pendente')
+        criar_pet(self.doador, nome='Mia', especie='Gato', estado='RJ', cidade='Niterói')
+        pet = Pet.objects.get(pk=pendente.pk)
+        pet.status_anuncio = 'Aprovado'
+        pet.save()
+        CandidaturaAdocao.objects.create(pet=pet, candidato=self.adotante, respostas_formulario={})
+        pet.status_adocao = 'Adotado'
+        pet.save()
+        # Salvar de novo não conta a adoção duas vezes
+        pet.save()
+        
+        hoje = timezone.localdate()
+        caes = EstatisticaDiaria.objects.get(dia=hoje, estado='SP', especie='Cão')
+        self.assertEqual(
+            (caes.novos, caes.aprovacoes, caes.adocoes, caes.candidaturas), (1, 1, 1, 1),
+        )
+        self.assertEqual(sum(caes.dias_ate_adocao), 1)
+        gatos = EstatisticaDiaria.objects.get(dia=hoje, estado='RJ', especie='Gato')
+        self.assertEqual((gatos.novos, gatos.aprovacoes), (1, 1))
+        
+        incrementais = self.linhas()
+        self.assertEqual(estatisticas.reconstruir(), 2)
+        self.assertEqual(self.linhas(), incrementais)
+    
+    def test_aprovacao_conta_no_dia_da_transicao_nos_dois_caminhos(self):
+        pendentes = [
+            criar_pet(self.doador, nome=nome, status_anuncio='Pendente') for nome in ('Rex', 'Bob')
+        ]
+        dez_dias = timezone.now() - timedelta(days=10)
+        Pet.objects.update(data_cadastro=dez_dias)
+        estatisticas.reconstruir()
+        
+        pet = Pet.objects.get(pk=pendentes[0].pk)
+        pet.status_anuncio = 'Aprovado'
+        pet.save()
+        aprovar_pets(Pet.objects.filter(pk=pendentes[1].pk))
+        pet.status_adocao = 'Adotado'
+        pet.save()
+        
+        hoje = EstatisticaDiaria.objects.get(dia=timezone.localdate())
+        self.assertEqual((hoje.novos, hoje.aprovacoes, hoje.adocoes), (0, 2, 1))
+        self.assertEqual(hoje.dias_ate_adocao[estatisticas.faixa_dias(10)], 1)
+        incrementais = self.linhas()
+        estatisticas.reconstruir()
+        self.assertEqual(self.linhas(), incrementais)
+        
+        # Voltar para pendente apaga a data de aprovação
+        pet.status_anuncio = 'Pendente'
+        pet.save()
+        self.assertIsNone(Pet.objects.get(pk=pet.pk).data_aprovacao)
+    
+    def test_painel_e_pagina_publica(self):
+        pet = criar_pet(self.doador)
+        pet.status_adocao = 'Adotado'
+        pet.save()
+        criar_pet(self.doador, nome='Mia', especie='Gato')
+        painel = estatisticas.painel()
+        self.assertEqual(painel['totais']['novos'], 2)
+        self.assertEqual(painel['totais']['adocoes'], 1)
+        self.assertIsNotNone(painel['totais']['mediana_dias_adocao'])
+        self.assertEqual({linha['especie']: linha['novos'] for linha in painel['por_especie']}, {'Cão': 1, 'Gato': 1})
+        self.assertEqual(estatisticas.painel(especie='Gato')['totais']['adocoes'], 0)
+        
+        self.assertEqual(estatisticas.impacto_publico()['totais']['adocoes'], 1)
+        # A página pública fica em cache até a próxima reconstrução
+        outro = criar_pet(self.doador, nome='Bob')
+        outro.status_adocao = 'Adotado'
+        outro.save()
+        self.assertEqual(estatisticas.impacto_publico()['totais']['adocoes'], 1)
+        estatisticas.reconstruir()
+        self.assertEqual(estatisticas.impacto_publico()['totais']['adocoes'], 2)
@@ -0,0 +1,190 @@
+"""
+Envio de várias fotos de um pet de uma vez.
+
+O ValidacaoFotosUploadHandler fica à frente dos handlers padrão do Django e
+confere cada arquivo enquanto ele é recebido: rejeita pelo Content-Length
+declarado, pelo tamanho acumulado e pelo cabeçalho da imagem (formato e
+dimensões, lidos com Image.open sobre os primeiros bytes, sem decodificar
+os pixels). Arquivos rejeitados são descartados com SkipFile assim que o
+problema aparece, sem receber o restante do conteúdo.
+
+As fotos aceitas são gravadas no storage em paralelo (hash do conteúdo,
+dHash e escrita do arquivo) e as linhas de FotoPet são criadas com um
+único bulk_create.
+"""
+import io
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import InMemoryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, StopFutureHandlers
+from django.db import transaction
+from django.db.models import Max
+from PIL import Image, UnidentifiedImageError
+
+from .duplicatas import CAMPOS_HASH, dhash, fotos_semelhantes, partes_hash
+from .models import FotoPet, nome_por_conteudo
+from .signals import tocar_pets
+from .tarefas import otimizar_fotos
+
+CAMPO_FOTOS = 'fotos'
+FORMATOS_ACEITOS = ('JPEG', 'PNG', 'WEBP')
+DIMENSAO_MINIMA = 200
+PIXELS_MAXIMOS = 40_000_000
+
+# Se o cabeçalho não for reconhecido nos primeiros bytes, o arquivo é rejeitado
+LIMITE_CABECALHO = 512 * 1024
+
+THREADS_PROCESSAMENTO = 4
+
+
+def tamanho_maximo_foto():
+    return getattr(settings, 'FOTO_TAMANHO_MAXIMO_BYTES', 10 * 1024 * 1024)
+
+
+def fotos_por_envio():
+    return getattr(settings, 'FOTOS_POR_ENVIO', 10)
+
+
+def validar_cabecalho(imagem):
+    """Mensagem de erro para formato ou dimensões inválidos (None se válida)"""
+    largura, altura = imagem.size
+    if imagem.format not in FORMATOS_ACEITOS:
+        return f'formato {imagem.format} não aceito (use JPEG, PNG ou WEBP)'
+    if min(largura, altura) < DIMENSAO_MINIMA:
+        return f'imagem muito pequena ({largura}x{altura}); o mínimo é {DIMENSAO_MINIMA}px'
+    if largura * altura > PIXELS_MAXIMOS:
+        return f'imagem muito grande ({largura}x{altura})'
+    return None
+
+
+class ValidacaoFotosUploadHandler(FileUploadHandler):
+    """
+    Recebe as fotos do campo CAMPO_FOTOS validando-as durante o upload.
+
+    As fotos ficam em SpooledTemporaryFile (em memória até
+    FILE_UPLOAD_MAX_MEMORY_SIZE) guardados pelo próprio handler: o
+    MultiPartParser fecha o atributo 'file' de todos os handlers ao
+    descartar um arquivo, e os handlers padrão ainda apontariam para a foto
+    anterior. Outros campos seguem para os handlers padrão.
+    """
+    
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.recebidas = 0
+        self.rejeitadas = []
+        # Cabeçalhos (formato, largura, altura) na ordem de request.FILES;
+        # None para arquivos cujo cabeçalho não foi reconhecido
+        self.cabecalhos = []
+        self._atual = None
+    
+    def _rejeitar(self, motivo):
+        self.rejeitadas.append((self.file_name, motivo))
+        self._atual = None
+        raise SkipFile()
+    
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self._atual = None
+        if field_name != CAMPO_FOTOS:
+            return
+        self.file = tempfile.SpooledTemporaryFile(max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+        self._atual = {'prefixo': bytearray(), 'tamanho': 0, 'cabecalho': None}
+        self.recebidas += 1
+        if self.recebidas > fotos_por_envio():
+            self._rejeitar(f'limite de {fotos_por_envio()} fotos por envio')
+        if content_length is not None and content_length > tamanho_maximo_foto():
+            self._rejeitar('arquivo maior que o permitido')
+        raise StopFutureHandlers()
+    
+    def receive_data_chunk(self, raw_data, start):
+        atual = self._atual
+        if atual is None:
+            return raw_data
+        
+        atual['tamanho'] += len(raw_data)
+        if atual['tamanho'] > tamanho_maximo_foto():
+            self._rejeitar('arquivo maior que o permitido')
+        
+        if atual['cabecalho'] is None:
+            atual['prefixo'] += raw_data
+            try:
+                # Image.open só lê o cabeçalho; os pixels não são decodificados
+                with Image.open(io.BytesIO(atual['prefixo']), formats=FORMATOS_ACEITOS) as imagem:
+                    erro = validar_cabecalho(imagem)
+                    cabecalho = (imagem.format, *imagem.size)
+            except Image.DecompressionBombError:
+                self._rejeitar('imagem muito grande')
+            except (UnidentifiedImageError, OSError, SyntaxError):
+                # Cabeçalho incompleto: tenta de novo com o próximo pedaço
+                if len(atual['prefixo']) > LIMITE_CABECALHO:
+                    self._rejeitar('o arquivo não é uma imagem JPEG, PNG ou WEBP')
+            else:
+                if erro:
+                    self._rejeitar(erro)
+                atual['cabecalho'] = cabecalho
+                atual['prefixo'] = None
+        
+        self.file.write(raw_data)
+        return None
+    
+    def file_complete(self, file_size):
+        atual, self._atual = self._atual, None
+        if atual is None:
+            return None
+        self.cabecalhos.append(atual['cabecalho'])
+        if atual['cabecalho'] is None:
+            self.rejeitadas.append((self.file_name, 'o arquivo não é uma imagem JPEG, PNG ou WEBP'))
+        self.file.seek(0)
+        return InMemoryUploadedFile(
+            file=self.file,
+            field_name=self.field_name,
+            name=self.file_name,
+            content_type=self.content_type,
+            size=file_size,
+            charset=self.charset,
+            content_type_extra=self.content_type_extra,
+        )
+
+
+def _gravar_arquivo(arquivo):
+    """Grava a foto no storage com o nome pelo hash do conteúdo; devolve (nome, partes do dHash)"""
+    valor = dhash(arquivo)
+    partes = partes_hash(valor) if valor is not None else [None] * len(CAMPOS_HASH)
+    nome = default_storage.save(nome_por_conteudo(arquivo, arquivo.name), arquivo)
+    return nome, partes
+
+
+def salvar_fotos(pet, arquivos, threads=THREADS_PROCESSAMENTO):
+    """
+    Grava as fotos aceitas em paralelo e cria os FotoPet com um bulk_create.
+
+    Devolve (fotos criadas, quantidade de fotos parecidas com as de outros pets).
+    """
+    if not arquivos:
+        return [], 0
+    with ThreadPoolExecutor(max_workers=min(threads, len(arquivos))) as executor:
+        gravados = list(executor.map(_gravar_arquivo, arquivos))
+    
+    try:
+        with transaction.atomic():
+            # As fotos novas vão para o fim, na ordem em que foram enviadas
+            maior_ordem = pet.fotos.aggregate(maior=Max('ordem'))['maior']
+            proxima_ordem = 0 if maior_ordem is None else maior_ordem + 1
+            fotos = [
+                FotoPet(pet=pet, imagem=nome, ordem=ordem, **dict(zip(CAMPOS_HASH, partes)))
+                for ordem, (nome, partes) in enumerate(gravados, start=proxima_ordem)
+            ]
+            FotoPet.objects.bulk_create(fotos)
+            # bulk_create não dispara os post_save do FotoPet
+            otimizar_fotos.enfileirar([foto.pk for foto in fotos])
+            tocar_pets({'num_fotos': len(fotos)}, pk=pet.pk)
+    except Exception:
+        for nome, _ in gravados:
+            default_storage.delete(nome)
+        raise
+    
+    semelhantes = fotos_semelhantes([foto.hash_perceptual for foto in fotos], excluir_pets=[pet.pk])
+    return fotos, sum(1 for foto in fotos if foto.hash_perceptual in semelhantes)
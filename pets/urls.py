@@ -8,16 +8,33 @@ urlpatterns = [
     path('', views.home_view, name='home'),
     path('buscar/', views.PetListView.as_view(), name='pet_list'),
     path('<int:pk>/', views.PetDetailView.as_view(), name='pet_detail'),
+    path('api/pets/', views.pets_api_view, name='pets_api'),
+    path('api/cidades/', views.cidades_api_view, name='cidades_api'),
+    path('sitemap.xml', views.sitemap_view, name='sitemap'),
+    path('sitemap-pets-<int:segmento>.xml', views.sitemap_segmento_view, name='sitemap_segmento'),
+    path('feed/novos-pets.atom', views.feed_novos_pets_view, name='feed_novos_pets'),
+    path('impacto/', views.impacto_view, name='impacto'),
     
     # Páginas do usuário logado
     path('meus-pets/', views.meus_pets_view, name='meus_pets'),
     path('cadastrar/', views.PetCreateView.as_view(), name='pet_create'),
+    path('importar/', views.importar_pets_view, name='importar_pets'),
+    path('exportar/', views.exportar_pets_view, name='exportar_pets'),
     path('<int:pk>/editar/', views.PetUpdateView.as_view(), name='pet_update'),
+    path('<int:pet_id>/fotos/', views.adicionar_fotos_view, name='adicionar_fotos'),
     path('<int:pet_id>/candidatar/', views.candidatura_adocao_view, name='candidatura_adocao'),
     path('<int:pet_id>/alterar-status/', views.alterar_status_pet_view, name='alterar_status'),
     
+    # Buscas salvas
+    path('buscas/', views.buscas_salvas_view, name='buscas_salvas'),
+    path('buscas/salvar/', views.salvar_busca_view, name='salvar_busca'),
+    path('buscas/<int:busca_id>/excluir/', views.excluir_busca_view, name='excluir_busca'),
+    
     # Candidaturas
     path('candidaturas-recebidas/', views.candidaturas_recebidas_view, name='candidaturas_recebidas'),
     path('candidatura/<int:candidatura_id>/', views.candidatura_detail_view, name='candidatura_detail'),
     path('candidatura/<int:candidatura_id>/responder/', views.responder_candidatura_view, name='responder_candidatura'),
+    
+    # Equipe
+    path('estatisticas/', views.estatisticas_view, name='estatisticas'),
 ]
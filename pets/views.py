@@ -1,16 +1,103 @@
 from django.shortcuts import render, get_object_or_404, redirect
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.paginator import Paginator
-from django.db.models import Q
+from django.db.models import Q, Count, OuterRef, Subquery, Sum
 from django.views.generic import ListView, DetailView, CreateView, UpdateView
 from django.urls import reverse_lazy, reverse
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import JsonResponse
-from .models import Pet, FotoPet, CandidaturaAdocao
-from .forms import PetForm, FotoPetForm, BuscaPetForm, CandidaturaAdocaoForm
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.core.files.storage import default_storage
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_datetime
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import condition, require_GET
+import base64
+import binascii
+import heapq
+import time
+from operator import attrgetter
+from .models import Pet, FotoPet, CandidaturaAdocao, BuscaSalva, AlertaBuscaSalva, PetArquivado
+from .forms import (
+    PetForm, FotoPetForm, BuscaPetForm, CandidaturaAdocaoForm, ImportacaoPetsForm, EnvioFotosForm,
+    EstatisticasForm,
+)
+from .importacao import (
+    ImportacaoPets, detectar_formato, exportar_csv, exportar_ndjson, exportar_fotos_zip,
+)
+from .contadores import janela_ranking, registrar_visualizacao
+from . import cidades, estatisticas, sitemap
+from .uploads import ValidacaoFotosUploadHandler, fotos_por_envio, salvar_fotos, tamanho_maximo_foto
+from .cache import (
+    PAGINA_TIMEOUT, cache_pagina_anonima, catalogo_compartilhado, condicional_publico, estado_catalogo,
+    parametros_normalizados, renderizar_cards, resumo,
+)
 
 
+# Quantos alertas recentes a página de buscas salvas mostra
+LIMITE_ALERTAS = 50
+
+
+def pets_disponiveis():
+    """Pets aprovados e disponíveis, exibidos nas páginas públicas"""
+    return Pet.objects.filter(
+        status_anuncio='Aprovado',
+        status_adocao='Disponível'
+    )
+
+
+def pets_destaque():
+    """Destaques da página inicial: mais vistos recentemente, empate pelos mais novos"""
+    return pets_disponiveis().select_related('doador').order_by('-popularidade', '-data_cadastro')[:6]
+
+
+def candidaturas_recebidas(usuario):
+    """Candidaturas para os pets do usuário, mais recentes primeiro"""
+    return CandidaturaAdocao.objects.filter(
+        pet__doador=usuario
+    ).select_related('pet', 'candidato').order_by('-data_envio')
+
+
+def validadores_listagem(request):
+    """ETag/Last-Modified da busca: filtros + geração do catálogo, sem consultas"""
+    if not catalogo_compartilhado():
+        # Sem validadores que não enxerguem alterações de outros processos
+        return None, None
+    geracao, alterado = estado_catalogo()
+    etag = resumo(parametros_normalizados(request), geracao)
+    if request.GET.get('ordenacao') == 'mais_vistos':
+        # A ordem muda com as visualizações, sem alterar a geração;
+        # sem Last-Modified para o If-Modified-Since não pular a janela
+        return resumo(etag, janela_ranking()), None
+    return etag, alterado
+
+
+def validadores_detalhe(request, pk):
+    """ETag/Last-Modified do pet; fotos novas também atualizam o data_atualizacao"""
+    linha = Pet.objects.filter(pk=pk).values_list('data_atualizacao', 'semelhantes').first()
+    if linha is None:
+        return None, None
+    ultima, semelhantes = linha
+    # A lista de semelhantes é regravada sem alterar o data_atualizacao
+    return resumo(pk, ultima, semelhantes), ultima
+
+
+def validadores_home(request):
+    """ETag da página inicial: geração do catálogo, janela do ranking e dos totais"""
+    if not catalogo_compartilhado():
+        return None, None
+    geracao, _ = estado_catalogo()
+    # Os destaques são ordenados por popularidade; os totais (usuários,
+    # adoções) podem ficar até PAGINA_TIMEOUT desatualizados, como no cache
+    # da página
+    etag = resumo(geracao, janela_ranking(), int(time.time() // PAGINA_TIMEOUT))
+    return etag, None
+
+
+@method_decorator(condicional_publico(validadores_listagem), name='dispatch')
+@method_decorator(cache_pagina_anonima(), name='dispatch')
 class PetListView(ListView):
     """View para listar pets disponíveis"""
     model = Pet
@@ -19,54 +106,21 @@ class PetListView(ListView):
     paginate_by = 12
     
     def get_queryset(self):
-        queryset = Pet.objects.filter(
-            status_anuncio='Aprovado',
-            status_adocao='Disponível'
-        ).select_related('doador').prefetch_related('fotos')
+        # As fotos só são carregadas para os cards que não estiverem em cache
+        queryset = pets_disponiveis().select_related('doador')
         
-        # Aplicar filtros de busca
+        # Aplicar filtros de busca e ordenação
         form = BuscaPetForm(self.request.GET)
-        if form.is_valid():
-            especie = form.cleaned_data.get('especie')
-            porte = form.cleaned_data.get('porte')
-            sexo = form.cleaned_data.get('sexo')
-            idade = form.cleaned_data.get('idade')
-            cidade = form.cleaned_data.get('cidade')
-            estado = form.cleaned_data.get('estado')
-            apenas_verificados = form.cleaned_data.get('apenas_verificados')
-            
-            if especie:
-                queryset = queryset.filter(especie=especie)
-            if porte:
-                queryset = queryset.filter(porte=porte)
-            if sexo:
-                queryset = queryset.filter(sexo=sexo)
-            if idade:
-                if idade == '0-6':
-                    queryset = queryset.filter(idade_meses__lte=6)
-                elif idade == '6-12':
-                    queryset = queryset.filter(idade_meses__gte=6, idade_meses__lte=12)
-                elif idade == '12-24':
-                    queryset = queryset.filter(idade_meses__gte=12, idade_meses__lte=24)
-                elif idade == '24-60':
-                    queryset = queryset.filter(idade_meses__gte=24, idade_meses__lte=60)
-                elif idade == '60+':
-                    queryset = queryset.filter(idade_meses__gte=60)
-            if cidade:
-                queryset = queryset.filter(cidade__icontains=cidade)
-            if estado:
-                queryset = queryset.filter(estado=estado)
-            if apenas_verificados:
-                queryset = queryset.filter(doador__verificado=True)
-        
-        return queryset.order_by('-data_cadastro')
+        return form.ordenar(form.filtrar(queryset))
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = BuscaPetForm(self.request.GET)
+        context['cards'] = renderizar_cards(context['pets'], variantes=('grade', 'lista'))
         return context
 
 
+@method_decorator(condicional_publico(validadores_detalhe), name='dispatch')
 class PetDetailView(DetailView):
     """View para detalhes do pet"""
     model = Pet
@@ -78,7 +132,17 @@ class PetDetailView(DetailView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        pet = self.get_object()
+        # Já carregado pelo get() com select_related/prefetch_related
+        pet = self.object
+        
+        if pet.is_aprovado() and pet.doador_id != self.request.user.pk:
+            registrar_visualizacao(pet.pk)
+        
+        # Pets semelhantes pré-calculados, na ordem de similaridade
+        if pet.semelhantes:
+            por_id = pets_disponiveis().select_related('doador').in_bulk(pet.semelhantes)
+            semelhantes = [por_id[pet_id] for pet_id in pet.semelhantes if pet_id in por_id]
+            context['cards_semelhantes'] = renderizar_cards(semelhantes)['grade']
         
         # Verificar se o usuário já se candidatou
         if self.request.user.is_authenticated:
@@ -122,7 +186,7 @@ class PetCreateView(LoginRequiredMixin, CreateView):
                 f'Pet "{pet.nome}" cadastrado! Aguarde a moderação.'
             )
         
-        return redirect('pets:pet_detail', pk=pet.pk)
+        return redirect('pets:adicionar_fotos', pet_id=pet.pk)
 
 
 class PetUpdateView(LoginRequiredMixin, UpdateView):
@@ -142,28 +206,144 @@ class PetUpdateView(LoginRequiredMixin, UpdateView):
         return super().form_valid(form)
 
 
+# Todas decrescentes: o histórico junta pets ativos e arquivados com heapq.merge
+ORDENACOES_MEUS_PETS = {
+    'recentes': ('data_cadastro',),
+    'candidaturas': ('num_candidaturas', 'data_cadastro'),
+    'nao_lidas': ('num_candidaturas_nao_lidas', 'data_cadastro'),
+}
+
+
 @login_required
 def meus_pets_view(request):
-    """View para listar pets do usuário logado"""
-    pets = Pet.objects.filter(doador=request.user).order_by('-data_cadastro')
+    """View para listar pets do usuário logado (ativos e arquivados)"""
+    ordem = request.GET.get('ordem')
+    if ordem not in ORDENACOES_MEUS_PETS:
+        ordem = 'recentes'
+    campos = ORDENACOES_MEUS_PETS[ordem]
+    ordenacao = [f'-{campo}' for campo in campos]
+    pets = Pet.objects.filter(doador=request.user).order_by(*ordenacao)
+    arquivados = PetArquivado.objects.filter(doador=request.user).order_by(*ordenacao)
     
     # Estatísticas
+    historico = arquivados.aggregate(
+        total=Count('id'),
+        aprovados=Count('id', filter=Q(status_anuncio='Aprovado')),
+        rejeitados=Count('id', filter=Q(status_anuncio='Rejeitado')),
+        adotados=Count('id', filter=Q(status_adocao='Adotado')),
+    )
     stats = {
-        'total': pets.count(),
-        'aprovados': pets.filter(status_anuncio='Aprovado').count(),
+        'total': pets.count() + historico['total'],
+        'aprovados': pets.filter(status_anuncio='Aprovado').count() + historico['aprovados'],
         'pendentes': pets.filter(status_anuncio='Pendente').count(),
-        'rejeitados': pets.filter(status_anuncio='Rejeitado').count(),
+        'rejeitados': pets.filter(status_anuncio='Rejeitado').count() + historico['rejeitados'],
         'disponiveis': pets.filter(status_adocao='Disponível').count(),
-        'adotados': pets.filter(status_adocao='Adotado').count(),
+        'adotados': pets.filter(status_adocao='Adotado').count() + historico['adotados'],
+        'arquivados': historico['total'],
+        'candidaturas_nao_lidas': pets.aggregate(total=Sum('num_candidaturas_nao_lidas'))['total'] or 0,
     }
     
     context = {
-        'pets': pets,
+        'pets': list(heapq.merge(pets, arquivados, key=attrgetter(*campos), reverse=True)),
         'stats': stats,
+        'ordem': ordem,
     }
     return render(request, 'pets/meus_pets.html', context)
 
 
+@login_required
+@csrf_exempt
+def adicionar_fotos_view(request, pet_id):
+    """Envio de várias fotos de um pet, validadas durante o upload"""
+    # O handler precisa ser instalado antes de o corpo da requisição ser
+    # lido; por isso a verificação de CSRF fica na view interna
+    validacao = ValidacaoFotosUploadHandler(request)
+    request.upload_handlers.insert(0, validacao)
+    return _adicionar_fotos(request, pet_id, validacao)
+
+
+@csrf_protect
+def _adicionar_fotos(request, pet_id, validacao):
+    pet = get_object_or_404(Pet, id=pet_id, doador=request.user)
+    
+    if request.method == 'POST':
+        arquivos = [
+            arquivo for arquivo, cabecalho in zip(request.FILES.getlist('fotos'), validacao.cabecalhos)
+            if cabecalho is not None
+        ]
+        for nome, motivo in validacao.rejeitadas:
+            messages.error(request, f'"{nome}" não foi enviada: {motivo}.')
+        if arquivos:
+            fotos, duplicadas = salvar_fotos(pet, arquivos)
+            messages.success(request, f'{len(fotos)} foto(s) adicionada(s)!')
+            if duplicadas:
+                messages.warning(
+                    request,
+                    f'{duplicadas} foto(s) parecem já ter sido usadas em outro anúncio.'
+                )
+        elif not validacao.rejeitadas:
+            messages.error(request, 'Selecione pelo menos uma foto.')
+        return redirect('pets:adicionar_fotos', pet_id=pet.id)
+    
+    context = {
+        'pet': pet,
+        'fotos': pet.fotos.all(),
+        'form': EnvioFotosForm(),
+        'fotos_por_envio': fotos_por_envio(),
+        'tamanho_maximo_mb': tamanho_maximo_foto() // (1024 * 1024),
+    }
+    return render(request, 'pets/adicionar_fotos.html', context)
+
+
+@login_required
+def importar_pets_view(request):
+    """View para importação de pets em lote (CSV/NDJSON + ZIP de fotos)"""
+    importacao = None
+    
+    if request.method == 'POST':
+        form = ImportacaoPetsForm(request.POST, request.FILES)
+        if form.is_valid():
+            arquivo = form.cleaned_data['arquivo']
+            importacao = ImportacaoPets(
+                request.user,
+                arquivo_fotos=form.cleaned_data.get('fotos'),
+            ).importar(arquivo, detectar_formato(arquivo.name))
+            
+            if importacao.importados:
+                messages.success(
+                    request,
+                    f'{importacao.importados} pet(s) e {importacao.fotos_importadas} foto(s) importados!'
+                )
+            if importacao.total_erros:
+                messages.warning(request, f'{importacao.total_erros} linha(s)/foto(s) com erro.')
+    else:
+        form = ImportacaoPetsForm()
+    
+    context = {
+        'form': form,
+        'importacao': importacao,
+    }
+    return render(request, 'pets/importar_pets.html', context)
+
+
+@login_required
+def exportar_pets_view(request):
+    """Exportação dos pets do usuário em CSV, NDJSON ou ZIP das fotos"""
+    formato = request.GET.get('formato', 'csv')
+    geradores = {
+        'csv': (exportar_csv, 'text/csv; charset=utf-8', 'meus-pets.csv'),
+        'ndjson': (exportar_ndjson, 'application/x-ndjson; charset=utf-8', 'meus-pets.ndjson'),
+        'fotos': (exportar_fotos_zip, 'application/zip', 'meus-pets-fotos.zip'),
+    }
+    if formato not in geradores:
+        formato = 'csv'
+    gerador, content_type, nome_arquivo = geradores[formato]
+    
+    response = StreamingHttpResponse(gerador(request.user), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{nome_arquivo}"'
+    return response
+
+
 @login_required
 def candidatura_adocao_view(request, pet_id):
     """View para candidatura de adoção"""
@@ -201,9 +381,7 @@ def candidatura_adocao_view(request, pet_id):
 def candidaturas_recebidas_view(request):
     """View para candidaturas recebidas pelo usuário"""
     # Buscar candidaturas dos pets do usuário
-    candidaturas = CandidaturaAdocao.objects.filter(
-        pet__doador=request.user
-    ).select_related('pet', 'candidato').order_by('-data_envio')
+    candidaturas = candidaturas_recebidas(request.user)
     
     context = {
         'candidaturas': candidaturas,
@@ -278,29 +456,269 @@ def alterar_status_pet_view(request, pet_id):
     return render(request, 'pets/alterar_status.html', context)
 
 
+@login_required
+def salvar_busca_view(request):
+    """Salva os filtros da busca atual para receber alertas de pets novos"""
+    if request.method != 'POST':
+        return redirect('pets:pet_list')
+    
+    form = BuscaPetForm(request.POST)
+    if form.is_valid():
+        busca = form.busca_salva(request.user)
+        busca.save()
+        messages.success(
+            request,
+            f'Busca salva! Você será avisado quando um pet novo combinar com: {busca.descricao()}.'
+        )
+    else:
+        messages.error(request, 'Não foi possível salvar a busca.')
+    return redirect('pets:buscas_salvas')
+
+
+@login_required
+def buscas_salvas_view(request):
+    """Buscas salvas do usuário e os alertas de pets novos"""
+    buscas = request.user.buscas_salvas.all()
+    alertas = list(
+        request.user.alertas.select_related('pet', 'busca')
+        .filter(pet__status_anuncio='Aprovado')[:LIMITE_ALERTAS]
+    )
+    nao_lidos = [alerta.pk for alerta in alertas if not alerta.lido]
+    if nao_lidos:
+        AlertaBuscaSalva.objects.filter(pk__in=nao_lidos).update(lido=True)
+    
+    context = {
+        'buscas': buscas,
+        'alertas': alertas,
+        'nao_lidos': set(nao_lidos),
+    }
+    return render(request, 'pets/buscas_salvas.html', context)
+
+
+@login_required
+def excluir_busca_view(request, busca_id):
+    """Remove uma busca salva e os seus alertas"""
+    busca = get_object_or_404(BuscaSalva, id=busca_id, usuario=request.user)
+    if request.method == 'POST':
+        busca.delete()
+        messages.success(request, 'Busca removida.')
+    return redirect('pets:buscas_salvas')
+
+
+@condicional_publico(validadores_home)
+@cache_pagina_anonima()
 def home_view(request):
     """View da página inicial"""
-    # Pets em destaque (últimos aprovados)
-    pets_destaque = Pet.objects.filter(
-        status_anuncio='Aprovado',
-        status_adocao='Disponível'
-    ).select_related('doador').prefetch_related('fotos')[:6]
+    destaques = pets_destaque()
     
     # Estatísticas gerais
     from django.contrib.auth import get_user_model
     User = get_user_model()
     
+    # Totais históricos vêm das estatísticas diárias, que incluem os pets já
+    # arquivados (ver pets/arquivo.py)
+    totais = estatisticas.impacto_publico()['totais']
     stats = {
-        'total_pets': Pet.objects.filter(status_anuncio='Aprovado').count(),
-        'pets_disponiveis': Pet.objects.filter(
-            status_anuncio='Aprovado',
-            status_adocao='Disponível'
-        ).count(),
+        'total_pets': totais['aprovacoes'],
+        'pets_disponiveis': pets_disponiveis().count(),
         'total_usuarios': User.objects.count(),
+        'total_adocoes': totais['adocoes'],
     }
     
     context = {
-        'pets_destaque': pets_destaque,
+        'pets_destaque': destaques,
+        'cards': renderizar_cards(destaques)['grade'],
         'stats': stats,
     }
     return render(request, 'home.html', context)
+
+
+# Campos que a API pode devolver: nome público -> coluna/anotação
+CAMPOS_API = {
+    'id': 'id',
+    'nome': 'nome',
+    'especie': 'especie',
+    'porte': 'porte',
+    'sexo': 'sexo',
+    'idade_meses': 'idade_meses',
+    'cidade': 'cidade',
+    'estado': 'estado',
+    'status_adocao': 'status_adocao',
+    'data_cadastro': 'data_cadastro',
+    'data_atualizacao': 'data_atualizacao',
+    'descricao': 'descricao',
+    'historia': 'historia',
+    'informacoes_saude': 'informacoes_saude',
+    'doador_verificado': 'doador__verificado',
+    'cover': 'cover',
+}
+CAMPOS_API_PADRAO = ['id', 'nome', 'especie', 'porte', 'sexo', 'idade_meses', 'cidade', 'estado', 'cover']
+LIMITE_API_PADRAO = 20
+LIMITE_API_MAXIMO = 100
+
+
+def _codificar_cursor(data_cadastro, pet_id):
+    valor = f'{data_cadastro.isoformat()}|{pet_id}'
+    return base64.urlsafe_b64encode(valor.encode()).decode().rstrip('=')
+
+
+def _decodificar_cursor(cursor):
+    """Retorna (data_cadastro, id) do último item da página anterior"""
+    try:
+        preenchido = cursor + '=' * (-len(cursor) % 4)
+        data, pet_id = base64.urlsafe_b64decode(preenchido.encode()).decode().split('|')
+        data_cadastro = parse_datetime(data)
+        if data_cadastro is None:
+            raise ValueError
+        return data_cadastro, int(pet_id)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        return None
+
+
+@require_GET
+def pets_api_view(request):
+    """
+    API JSON de busca de pets.
+
+    Aceita os mesmos filtros do BuscaPetForm, além de:
+    - fields: campos separados por vírgula (ex.: ?fields=id,nome,cover)
+    - limite: itens por página (máximo LIMITE_API_MAXIMO)
+    - cursor: valor de next_cursor da página anterior
+
+    Só as colunas pedidas são lidas do banco e cada linha é serializada direto
+    da tupla, sem instanciar modelos.
+    """
+    form = BuscaPetForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({
+            'success': False,
+            'error': 'Filtros inválidos',
+            'campos': form.errors,
+        }, status=400)
+    
+    campos = [campo for campo in request.GET.get('fields', '').split(',') if campo]
+    campos = campos or CAMPOS_API_PADRAO
+    invalidos = [campo for campo in campos if campo not in CAMPOS_API]
+    if invalidos:
+        return JsonResponse({
+            'success': False,
+            'error': f'Campos inválidos: {", ".join(invalidos)}',
+        }, status=400)
+    
+    try:
+        limite = min(int(request.GET.get('limite', LIMITE_API_PADRAO)), LIMITE_API_MAXIMO)
+    except ValueError:
+        limite = LIMITE_API_PADRAO
+    limite = max(limite, 1)
+    
+    queryset = form.filtrar(pets_disponiveis())
+    if 'cover' in campos:
+        queryset = queryset.annotate(cover=Subquery(
+            FotoPet.objects.filter(pet=OuterRef('pk')).order_by('ordem', 'data_upload').values('imagem')[:1]
+        ))
+    
+    cursor = request.GET.get('cursor')
+    if cursor:
+        posicao = _decodificar_cursor(cursor)
+        if posicao is None:
+            return JsonResponse({'success': False, 'error': 'Cursor inválido'}, status=400)
+        data_cadastro, pet_id = posicao
+        queryset = queryset.filter(
+            Q(data_cadastro__lt=data_cadastro) | Q(data_cadastro=data_cadastro, id__lt=pet_id)
+        )
+    
+    # data_cadastro e id sempre vêm no fim da tupla para montar o próximo cursor
+    colunas = [CAMPOS_API[campo] for campo in campos] + ['data_cadastro', 'id']
+    linhas = list(queryset.order_by('-data_cadastro', '-id').values_list(*colunas)[:limite + 1])
+    
+    proximo_cursor = None
+    if len(linhas) > limite:
+        linhas = linhas[:limite]
+        proximo_cursor = _codificar_cursor(linhas[-1][-2], linhas[-1][-1])
+    
+    indice_cover = campos.index('cover') if 'cover' in campos else None
+    resultados = []
+    for linha in linhas:
+        item = dict(zip(campos, linha))
+        if indice_cover is not None and item['cover']:
+            item['cover'] = default_storage.url(item['cover'])
+        resultados.append(item)
+    
+    return JsonResponse({
+        'success': True,
+        'results': resultados,
+        'next_cursor': proximo_cursor,
+    })
+
+
+@require_GET
+def cidades_api_view(request):
+    """
+    Sugestões de cidades para o autocompletar.
+
+    ?q=prefixo (acentos e maiúsculas são ignorados), ?estado=UF e ?limite=n.
+    Respondido pelo índice em memória de pets/cidades.py, sem consultar o banco.
+    """
+    try:
+        limite = min(max(int(request.GET.get('limite', cidades.LIMITE_PADRAO)), 1), cidades.LIMITE_MAXIMO)
+    except ValueError:
+        limite = cidades.LIMITE_PADRAO
+    sugestoes = cidades.obter_indice().sugerir(
+        request.GET.get('q', '')[:100],
+        request.GET.get('estado', ''),
+        limite,
+    )
+    response = JsonResponse({'cidades': sugestoes})
+    patch_cache_control(response, public=True, max_age=60)
+    return response
+
+
+def _url_base(request):
+    return f'{request.scheme}://{request.get_host()}'
+
+
+@require_GET
+@condition(last_modified_func=lambda request: sitemap.alterado_em())
+def sitemap_view(request):
+    """Índice do sitemap com um segmento por faixa de ids de pets"""
+    return StreamingHttpResponse(sitemap.gerar_indice(_url_base(request)), content_type='application/xml')
+
+
+@require_GET
+@condition(last_modified_func=lambda request, segmento: sitemap.alterado_em())
+def sitemap_segmento_view(request, segmento):
+    """Segmento do sitemap com as páginas dos pets disponíveis"""
+    if segmento not in sitemap.segmentos():
+        raise Http404
+    return StreamingHttpResponse(
+        sitemap.gerar_segmento(segmento, _url_base(request)),
+        content_type='application/xml',
+    )
+
+
+@require_GET
+@condition(last_modified_func=lambda request: sitemap.alterado_em())
+def feed_novos_pets_view(request):
+    """Feed Atom dos pets disponíveis cadastrados mais recentemente"""
+    return StreamingHttpResponse(
+        sitemap.gerar_feed(_url_base(request)),
+        content_type='application/atom+xml; charset=utf-8',
+    )
+
+
+def impacto_view(request):
+    """Página pública com os números de adoções, lidos das estatísticas diárias"""
+    return render(request, 'pets/impacto.html', {'impacto': estatisticas.impacto_publico()})
+
+
+@staff_member_required
+def estatisticas_view(request):
+    """Painel da equipe com cadastros, aprovações, adoções e candidaturas"""
+    form = EstatisticasForm(request.GET or None)
+    filtros = form.cleaned_data if form.is_valid() else {}
+    painel = estatisticas.painel(
+        meses=int(filtros.get('meses') or EstatisticasForm.MESES_PADRAO),
+        estado=filtros.get('estado', ''),
+        especie=filtros.get('especie', ''),
+    )
+    return render(request, 'pets/estatisticas.html', {'form': form, 'painel': painel})
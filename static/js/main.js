@@ -214,17 +214,36 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     });
 
-    // Search suggestions (if needed)
+    // Search suggestions (cidades)
     const searchInputs = document.querySelectorAll('input[data-suggestions]');
     searchInputs.forEach(input => {
         if (input) {
+            const datalist = document.createElement('datalist');
+            datalist.id = `${input.id}-sugestoes`;
+            input.setAttribute('list', datalist.id);
+            input.after(datalist);
+
             let timeout;
             input.addEventListener('input', function() {
                 clearTimeout(timeout);
                 timeout = setTimeout(() => {
-                    // Implement search suggestions here
-                    console.log('Searching for:', this.value);
-                }, 300);
+                    const params = new URLSearchParams({ q: this.value });
+                    const estado = document.getElementById(this.dataset.suggestionsEstado || '');
+                    if (estado && estado.value) {
+                        params.set('estado', estado.value);
+                    }
+                    fetch(`${this.dataset.suggestions}?${params}`)
+                        .then(response => response.json())
+                        .then(data => {
+                            datalist.replaceChildren(...data.cidades.map(item => {
+                                const option = document.createElement('option');
+                                option.value = item.cidade;
+                                option.label = `${item.cidade}/${item.estado} (${item.pets})`;
+                                return option;
+                            }));
+                        })
+                        .catch(() => {});
+                }, 150);
             });
         }
     });
@@ -0,0 +1,27 @@
+from django.contrib import admin
+from .models import Tarefa
+
+
+@admin.register(Tarefa)
+class TarefaAdmin(admin.ModelAdmin):
+    """Admin para o modelo Tarefa"""
+    
+    list_display = ('nome', 'status', 'prioridade', 'tentativas', 'executar_apos', 'data_criacao', 'data_conclusao')
+    list_filter = ('status', 'nome')
+    search_fields = ('nome', 'ultimo_erro')
+    ordering = ('-data_criacao',)
+    show_full_result_count = False
+    
+    readonly_fields = ('data_criacao', 'data_conclusao', 'bloqueada_ate', 'ultimo_erro')
+    actions = ['reenfileirar']
+    
+    @admin.action(description="Reenfileirar tarefas selecionadas")
+    def reenfileirar(self, request, queryset):
+        from django.utils import timezone
+        total = queryset.update(
+            status='Pendente',
+            tentativas=0,
+            executar_apos=timezone.now(),
+            bloqueada_ate=None,
+        )
+        self.message_user(request, f'{total} tarefa(s) reenfileirada(s).')
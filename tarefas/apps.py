@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class TarefasConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'tarefas'
+    verbose_name = 'Tarefas em segundo plano'
+
+    def ready(self):
+        # Registra as tarefas definidas nos módulos tarefas.py de cada app
+        from django.utils.module_loading import autodiscover_modules
+        autodiscover_modules('tarefas')
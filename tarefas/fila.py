@@ -0,0 +1,86 @@
+"""
+Fila de tarefas em segundo plano armazenada no banco do projeto.
+
+Uso:
+
+    from tarefas.fila import tarefa
+
+    @tarefa(prioridade=5)
+    def enviar_aviso(usuario_id):
+        ...
+
+    enviar_aviso.enfileirar(usuario.pk)
+
+A tarefa só é gravada quando a transação atual for confirmada
+(transaction.on_commit), então o worker nunca vê dados que ainda não
+existem. As tarefas são executadas pelo comando `python manage.py runworker`.
+"""
+import random
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Tarefa
+
+BACKOFF_BASE_SEGUNDOS = 10
+BACKOFF_MAXIMO_SEGUNDOS = 60 * 60
+
+_registro = {}
+
+
+class TarefaRegistrada:
+    """Função registrada como tarefa, com as opções padrão de execução"""
+
+    def __init__(self, func, nome, prioridade, max_tentativas, visibilidade_segundos):
+        self.func = func
+        self.nome = nome
+        self.prioridade = prioridade
+        self.max_tentativas = max_tentativas
+        self.visibilidade_segundos = visibilidade_segundos
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enfileirar(self, *args, prioridade=None, atraso_segundos=0, **kwargs):
+        """Agenda a tarefa para depois do commit da transação atual"""
+        tarefa = Tarefa(
+            nome=self.nome,
+            argumentos={'args': list(args), 'kwargs': kwargs},
+            prioridade=self.prioridade if prioridade is None else prioridade,
+            max_tentativas=self.max_tentativas,
+            visibilidade_segundos=self.visibilidade_segundos,
+            executar_apos=timezone.now() + timedelta(seconds=atraso_segundos),
+        )
+        transaction.on_commit(tarefa.save)
+        return tarefa
+
+
+def tarefa(func=None, *, nome=None, prioridade=0, max_tentativas=5, visibilidade_segundos=300):
+    """Registra uma função como tarefa em segundo plano"""
+    def decorator(func):
+        registrada = TarefaRegistrada(
+            func,
+            nome or f'{func.__module__}.{func.__name__}',
+            prioridade,
+            max_tentativas,
+            visibilidade_segundos,
+        )
+        _registro[registrada.nome] = registrada
+        return registrada
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+def obter_tarefa(nome):
+    """Tarefa registrada com o nome informado (KeyError se não existir)"""
+    return _registro[nome]
+
+
+def calcular_backoff(tentativas):
+    """Espera exponencial com variação aleatória de até 10%"""
+    atraso = min(BACKOFF_BASE_SEGUNDOS * 2 ** max(tentativas - 1, 0), BACKOFF_MAXIMO_SEGUNDOS)
+    return timedelta(seconds=atraso * (1 + random.random() * 0.1))
@@ -0,0 +1,37 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from tarefas.worker import Worker
+
+
+class Command(BaseCommand):
+    help = 'Executa as tarefas em segundo plano da fila armazenada no banco'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads', type=int, default=4,
+            help='Número de threads executando tarefas (padrão: 4)',
+        )
+        parser.add_argument(
+            '--intervalo', type=float, default=1.0,
+            help='Segundos de espera quando a fila está vazia (padrão: 1)',
+        )
+        parser.add_argument(
+            '--ate-esvaziar', action='store_true',
+            help='Encerra quando não houver mais tarefas disponíveis',
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            threads=options['threads'],
+            intervalo=options['intervalo'],
+            parar_quando_vazia=options['ate_esvaziar'],
+        )
+        signal.signal(signal.SIGTERM, lambda *_: worker.parar.set())
+
+        self.stdout.write(f"Worker iniciado com {options['threads']} thread(s). Ctrl+C para parar.")
+        worker.executar()
+        self.stdout.write(self.style.SUCCESS(
+            f'Worker encerrado: {worker.executadas} tarefa(s) executada(s), {worker.falhas} falha(s).'
+        ))
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-19 15:32
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tarefa',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=200, verbose_name='Nome da tarefa')),
+                ('argumentos', models.JSONField(default=dict, help_text='Argumentos posicionais (args) e nomeados (kwargs)', verbose_name='Argumentos')),
+                ('prioridade', models.SmallIntegerField(default=0, help_text='Tarefas com prioridade maior são executadas primeiro', verbose_name='Prioridade')),
+                ('status', models.CharField(choices=[('Pendente', 'Pendente'), ('Executando', 'Executando'), ('Concluída', 'Concluída'), ('Falhou', 'Falhou')], default='Pendente', max_length=20, verbose_name='Status')),
+                ('tentativas', models.PositiveIntegerField(default=0, verbose_name='Tentativas')),
+                ('max_tentativas', models.PositiveIntegerField(default=5, verbose_name='Máximo de tentativas')),
+                ('executar_apos', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Executar após')),
+                ('visibilidade_segundos', models.PositiveIntegerField(default=300, help_text='Se o worker não concluir nesse tempo, a tarefa volta para a fila', verbose_name='Tempo de visibilidade (s)')),
+                ('bloqueada_ate', models.DateTimeField(blank=True, null=True, verbose_name='Reservada até')),
+                ('ultimo_erro', models.TextField(blank=True, null=True, verbose_name='Último erro')),
+                ('data_criacao', models.DateTimeField(auto_now_add=True, verbose_name='Data de criação')),
+                ('data_conclusao', models.DateTimeField(blank=True, null=True, verbose_name='Data de conclusão')),
+            ],
+            options={
+                'verbose_name': 'Tarefa',
+                'verbose_name_plural': 'Tarefas',
+                'db_table': 'tarefa',
+                'ordering': ['-data_criacao'],
+                'indexes': [models.Index(fields=['status', '-prioridade', 'executar_apos'], name='tarefa_fila_idx')],
+            },
+        ),
+    ]
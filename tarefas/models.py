@@ -0,0 +1,69 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Tarefa(models.Model):
+    """Tarefa em segundo plano armazenada no banco do projeto"""
+    
+    STATUS_CHOICES = [
+        ('Pendente', 'Pendente'),
+        ('Executando', 'Executando'),
+        ('Concluída', 'Concluída'),
+        ('Falhou', 'Falhou'),
+    ]
+    
+    nome = models.CharField(max_length=200, verbose_name="Nome da tarefa")
+    argumentos = models.JSONField(
+        default=dict,
+        verbose_name="Argumentos",
+        help_text="Argumentos posicionais (args) e nomeados (kwargs)"
+    )
+    prioridade = models.SmallIntegerField(
+        default=0,
+        verbose_name="Prioridade",
+        help_text="Tarefas com prioridade maior são executadas primeiro"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='Pendente',
+        verbose_name="Status"
+    )
+    
+    # Controle de execução
+    tentativas = models.PositiveIntegerField(default=0, verbose_name="Tentativas")
+    max_tentativas = models.PositiveIntegerField(default=5, verbose_name="Máximo de tentativas")
+    executar_apos = models.DateTimeField(
+        default=timezone.now,
+        verbose_name="Executar após"
+    )
+    visibilidade_segundos = models.PositiveIntegerField(
+        default=300,
+        verbose_name="Tempo de visibilidade (s)",
+        help_text="Se o worker não concluir nesse tempo, a tarefa volta para a fila"
+    )
+    bloqueada_ate = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name="Reservada até"
+    )
+    ultimo_erro = models.TextField(blank=True, null=True, verbose_name="Último erro")
+    
+    # Metadados
+    data_criacao = models.DateTimeField(auto_now_add=True, verbose_name="Data de criação")
+    data_conclusao = models.DateTimeField(blank=True, null=True, verbose_name="Data de conclusão")
+    
+    class Meta:
+        verbose_name = "Tarefa"
+        verbose_name_plural = "Tarefas"
+        db_table = 'tarefa'
+        ordering = ['-data_criacao']
+        indexes = [
+            models.Index(
+                fields=['status', '-prioridade', 'executar_apos'],
+                name='tarefa_fila_idx',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.nome} ({self.status})"
@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from .fila import BACKOFF_BASE_SEGUNDOS, tarefa
+from .models import Tarefa
+from .worker import executar_tarefa, reservar_tarefa
+
+EXECUCOES = []
+
+
+@tarefa(nome='tarefas.tests.registrar', max_tentativas=3)
+def registrar(valor):
+    EXECUCOES.append(valor)
+
+
+@tarefa(nome='tarefas.tests.falhar', max_tentativas=2)
+def falhar():
+    raise RuntimeError('falha de teste')
+
+
+def criar(registrada, *args, **campos):
+    return Tarefa.objects.create(
+        nome=registrada.nome,
+        argumentos={'args': list(args), 'kwargs': {}},
+        max_tentativas=registrada.max_tentativas,
+        **campos,
+    )
+
+
+def vencer_reserva(tarefa_id):
+    Tarefa.objects.filter(pk=tarefa_id).update(bloqueada_ate=timezone.now() - timedelta(seconds=1))
+
+
+class ReservaTests(TestCase):
+
+    def setUp(self):
+        EXECUCOES.clear()
+
+    def test_tarefa_reservada_nao_e_reservada_de_novo(self):
+        criada = criar(registrar, 1)
+        reservada = reservar_tarefa()
+        self.assertEqual(reservada.pk, criada.pk)
+        self.assertEqual(reservada.status, 'Executando')
+        self.assertEqual(reservada.tentativas, 1)
+        self.assertIsNone(reservar_tarefa())
+
+    def test_prioridade_maior_primeiro(self):
+        criar(registrar, 'baixa')
+        alta = criar(registrar, 'alta', prioridade=5)
+        self.assertEqual(reservar_tarefa().pk, alta.pk)
+
+    def test_reserva_vencida_volta_para_a_fila(self):
+        criada = criar(registrar, 1)
+        reservar_tarefa()
+        vencer_reserva(criada.pk)
+        novamente = reservar_tarefa()
+        self.assertEqual(novamente.pk, criada.pk)
+        self.assertEqual(novamente.tentativas, 2)
+
+    def test_worker_com_reserva_vencida_nao_sobrescreve_o_resultado(self):
+        criada = criar(registrar, 1)
+        atrasado = reservar_tarefa()
+        vencer_reserva(criada.pk)
+        atual = reservar_tarefa()
+        # O worker atrasado termina depois que o outro pegou a tarefa
+        executar_tarefa(atrasado)
+        criada.refresh_from_db()
+        self.assertEqual(criada.status, 'Executando')
+        self.assertEqual(criada.bloqueada_ate, atual.bloqueada_ate)
+        self.assertTrue(executar_tarefa(atual))
+        criada.refresh_from_db()
+        self.assertEqual(criada.status, 'Concluída')
+        self.assertIsNotNone(criada.data_conclusao)
+
+
+class TentativasTests(TestCase):
+
+    def setUp(self):
+        EXECUCOES.clear()
+
+    def test_falha_reagenda_com_backoff(self):
+        criada = criar(falhar)
+        antes = timezone.now()
+        self.assertFalse(executar_tarefa(reservar_tarefa()))
+        criada.refresh_from_db()
+        self.assertEqual(criada.status, 'Pendente')
+        self.assertIsNone(criada.bloqueada_ate)
+        self.assertIn('falha de teste', criada.ultimo_erro)
+        self.assertGreaterEqual(criada.executar_apos, antes + timedelta(seconds=BACKOFF_BASE_SEGUNDOS))
+        # Ainda no backoff
+        self.assertIsNone(reservar_tarefa())
+
+    def test_falha_na_ultima_tentativa_encerra(self):
+        criada = criar(falhar)
+        executar_tarefa(reservar_tarefa())
+        Tarefa.objects.filter(pk=criada.pk).update(executar_apos=timezone.now())
+        self.assertFalse(executar_tarefa(reservar_tarefa()))
+        criada.refresh_from_db()
+        self.assertEqual(criada.status, 'Falhou')
+        self.assertEqual(criada.tentativas, 2)
+        self.assertIsNone(reservar_tarefa())
+
+    def test_tarefa_envenenada_nao_volta_para_a_fila(self):
+        # A tarefa derrubou o worker em todas as tentativas: a reserva venceu
+        # na última delas
+        criada = criar(
+            registrar, 1,
+            status='Executando',
+            tentativas=registrar.max_tentativas,
+            bloqueada_ate=timezone.now() - timedelta(seconds=1),
+        )
+        self.assertIsNone(reservar_tarefa())
+        criada.refresh_from_db()
+        self.assertEqual(criada.status, 'Falhou')
+        self.assertIsNone(criada.bloqueada_ate)
+        self.assertEqual(criada.tentativas, registrar.max_tentativas)
+        self.assertEqual(EXECUCOES, [])
@@ -0,0 +1,153 @@
+import logging
+import threading
+import traceback
+from datetime import timedelta
+
+from django.db import close_old_connections, connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .fila import calcular_backoff, obter_tarefa
+from .models import Tarefa
+
+logger = logging.getLogger(__name__)
+
+# Quantas candidatas cada thread tenta reservar por consulta
+CANDIDATAS_POR_CONSULTA = 10
+
+
+def _disponiveis(agora):
+    """
+    Pendentes já liberadas ou em execução com a reserva vencida. Uma reserva
+    vencida conta como tentativa (o worker morreu ou passou do tempo), então
+    só volta para a fila se ainda houver tentativas.
+    """
+    return Q(status='Pendente', executar_apos__lte=agora) | Q(
+        status='Executando', bloqueada_ate__lt=agora, tentativas__lt=F('max_tentativas'),
+    )
+
+
+def encerrar_esgotadas(agora=None):
+    """Marca como Falhou as tarefas com a reserva vencida e sem tentativas restantes"""
+    agora = agora or timezone.now()
+    encerradas = Tarefa.objects.filter(
+        status='Executando', bloqueada_ate__lt=agora, tentativas__gte=F('max_tentativas'),
+    ).update(
+        status='Falhou',
+        ultimo_erro='Reserva vencida na última tentativa (o worker parou ou passou do tempo de visibilidade)',
+        bloqueada_ate=None,
+    )
+    if encerradas:
+        logger.error('%s tarefa(s) falharam definitivamente por reserva vencida', encerradas)
+    return encerradas
+
+
+def reservar_tarefa():
+    """
+    Reserva a próxima tarefa da fila.
+
+    A reserva é um UPDATE condicional: se outra thread ou processo reservar a
+    mesma tarefa antes, o UPDATE não altera nenhuma linha e a próxima
+    candidata é tentada. O bloqueada_ate gravado identifica a reserva; o
+    resultado só é gravado enquanto ela for a atual (ver _finalizar).
+    """
+    agora = timezone.now()
+    candidatas = list(
+        Tarefa.objects.filter(_disponiveis(agora))
+        .order_by('-prioridade', 'executar_apos', 'id')
+        .values_list('id', 'visibilidade_segundos')[:CANDIDATAS_POR_CONSULTA]
+    )
+    for tarefa_id, visibilidade_segundos in candidatas:
+        reservadas = Tarefa.objects.filter(_disponiveis(agora), pk=tarefa_id).update(
+            status='Executando',
+            bloqueada_ate=agora + timedelta(seconds=visibilidade_segundos),
+            tentativas=F('tentativas') + 1,
+        )
+        if reservadas:
+            return Tarefa.objects.get(pk=tarefa_id)
+    if not candidatas:
+        # Fila vazia: aproveita para encerrar as tarefas envenenadas
+        encerrar_esgotadas(agora)
+    return None
+
+
+def _finalizar(tarefa, **campos):
+    """
+    Grava o resultado só se a tarefa ainda estiver com a reserva deste
+    worker; se a reserva venceu e outro worker a pegou, o resultado é
+    descartado para não sobrescrever o dele.
+    """
+    gravadas = Tarefa.objects.filter(
+        pk=tarefa.pk, status='Executando', bloqueada_ate=tarefa.bloqueada_ate,
+    ).update(bloqueada_ate=None, **campos)
+    if not gravadas:
+        logger.warning('Tarefa %s (%s): reserva vencida; resultado descartado', tarefa.pk, tarefa.nome)
+    return bool(gravadas)
+
+
+def executar_tarefa(tarefa):
+    """Executa uma tarefa reservada e registra o resultado"""
+    try:
+        registrada = obter_tarefa(tarefa.nome)
+        registrada(*tarefa.argumentos.get('args', []), **tarefa.argumentos.get('kwargs', {}))
+    except Exception:
+        erro = traceback.format_exc()
+        if tarefa.tentativas >= tarefa.max_tentativas:
+            logger.error('Tarefa %s (%s) falhou definitivamente', tarefa.pk, tarefa.nome)
+            _finalizar(tarefa, status='Falhou', ultimo_erro=erro)
+        else:
+            logger.warning('Tarefa %s (%s) falhou; nova tentativa agendada', tarefa.pk, tarefa.nome)
+            _finalizar(
+                tarefa,
+                status='Pendente',
+                ultimo_erro=erro,
+                executar_apos=timezone.now() + calcular_backoff(tarefa.tentativas),
+            )
+        return False
+
+    _finalizar(tarefa, status='Concluída', data_conclusao=timezone.now())
+    return True
+
+
+class Worker:
+    """Executa tarefas da fila em várias threads"""
+
+    def __init__(self, threads=4, intervalo=1.0, parar_quando_vazia=False):
+        self.threads = threads
+        self.intervalo = intervalo
+        self.parar_quando_vazia = parar_quando_vazia
+        self.parar = threading.Event()
+        self.executadas = 0
+        self.falhas = 0
+        self._lock = threading.Lock()
+
+    def _loop(self):
+        while not self.parar.is_set():
+            close_old_connections()
+            tarefa = reservar_tarefa()
+            if tarefa is None:
+                if self.parar_quando_vazia:
+                    break
+                self.parar.wait(self.intervalo)
+                continue
+            sucesso = executar_tarefa(tarefa)
+            with self._lock:
+                self.executadas += 1
+                self.falhas += 0 if sucesso else 1
+        connections.close_all()
+
+    def executar(self):
+        threads = [
+            threading.Thread(target=self._loop, name=f'worker-{numero}', daemon=True)
+            for numero in range(self.threads)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            self.parar.set()
+            for thread in threads:
+                thread.join()